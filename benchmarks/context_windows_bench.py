@@ -0,0 +1,56 @@
+"""Benchmark: context windows for many occurrences in one long document.
+
+Compares the original per-occurrence context_window(), which encodes the whole
+document and decodes the prefix for every occurrence, against
+context_windows() (one pass over the document) and context_window_bytes() on
+the pre-encoded bytes.
+
+Usage:
+    python benchmarks/context_windows_bench.py [--doc-chars 1000000] [--n-occ 1000]
+"""
+
+import argparse
+import random
+import time
+
+from alfs.encoding import context_window_bytes, context_windows
+
+
+def _legacy_context_window(
+    text: str, byte_offset: int, form: str, context_chars: int
+) -> tuple[str, int]:
+    encoded = text.encode()
+    char_offset = len(encoded[:byte_offset].decode(errors="ignore"))
+    start = max(0, char_offset - context_chars)
+    end = char_offset + len(form) + context_chars
+    return text[start:end], char_offset - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--doc-chars", type=int, default=1_000_000)
+    parser.add_argument("--n-occ", type=int, default=1_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # Mostly ASCII with some accented words, like a typical Gutenberg book.
+    words = ["the", "word", "of", "and", "café", "naïve", "text", "rôle"]
+    text = " ".join(rng.choice(words) for _ in range(args.doc_chars // 5))
+    data = text.encode()
+    offsets = sorted(rng.randrange(len(data)) for _ in range(args.n_occ))
+
+    print(f"{len(text):,} chars, {args.n_occ} occurrences")
+    start = time.perf_counter()
+    legacy = [_legacy_context_window(text, b, "word", 150) for b in offsets]
+    print(f"  per-occurrence encode  {time.perf_counter() - start:8.3f}s")
+    start = time.perf_counter()
+    batch = context_windows(text, offsets, "word", 150)
+    print(f"  context_windows        {time.perf_counter() - start:8.3f}s")
+    start = time.perf_counter()
+    from_bytes = [context_window_bytes(data, b, "word", 150) for b in offsets]
+    print(f"  context_window_bytes   {time.perf_counter() - start:8.3f}s")
+    assert legacy == batch == from_bytes
+
+
+if __name__ == "__main__":
+    main()
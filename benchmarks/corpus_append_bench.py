@@ -0,0 +1,72 @@
+"""Benchmark: appending a batch of docs to a growing corpus.
+
+Grows a corpus by --batch docs at a time and times each append: the original
+append_docs, which reads the whole docs.parquet and rewrites it, against the
+partitioned corpus, which writes one new part and replaces the manifest.
+
+Usage:
+    python benchmarks/corpus_append_bench.py [--batches 10] [--batch 10000]
+"""
+
+import argparse
+from pathlib import Path
+import random
+import tempfile
+import time
+
+import polars as pl
+
+from alfs.data_models.doc import Doc
+from alfs.etl.corpus import append_docs
+
+
+def _legacy_append(new_docs: list[Doc], corpus_path: Path) -> None:
+    new_df = pl.DataFrame([d.model_dump() for d in new_docs])
+    if corpus_path.exists():
+        combined = pl.concat([pl.read_parquet(corpus_path), new_df])
+    else:
+        combined = new_df
+    combined.write_parquet(corpus_path)
+
+
+def _batch(rng: random.Random, start: int, n: int, doc_chars: int) -> list[Doc]:
+    alphabet = bytes(range(97, 123)) + b" " * 6
+    table = bytes(alphabet[b % len(alphabet)] for b in range(256))
+    return [
+        Doc(
+            doc_id=f"{i:08x}",
+            text=rng.randbytes(doc_chars).translate(table).decode(),
+            title=f"Page {i}",
+            author="someone",
+            year=2020,
+            source="wikibooks",
+        )
+        for i in range(start, start + n)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--doc-chars", type=int, default=5_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "legacy.parquet"
+        parts = Path(tmp) / "docs.parquet"
+        print(f"{'corpus docs':>12} {'rewrite':>9} {'new part':>9}")
+        for b in range(args.batches):
+            docs = _batch(rng, b * args.batch, args.batch, args.doc_chars)
+            start = time.perf_counter()
+            _legacy_append(docs, legacy)
+            legacy_s = time.perf_counter() - start
+            start = time.perf_counter()
+            append_docs(docs, parts)
+            part_s = time.perf_counter() - start
+            print(f"{(b + 1) * args.batch:>12,} {legacy_s:>8.2f}s {part_s:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
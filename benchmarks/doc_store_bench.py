@@ -0,0 +1,127 @@
+"""Benchmark: random-access context fetch from docs.parquet vs DocStore.
+
+Fetches context windows for a random sample of (doc_id, byte_offset)
+occurrences three ways: reading all of docs.parquet (as the viewer compile
+and POS tagging did), scanning it for the needed doc_ids (as the labeling and
+induction callers did), and reading the windows out of DocStore's
+memory-mapped texts. Each variant runs in a fresh process so peak RSS is
+measured independently.
+
+Usage:
+    python benchmarks/doc_store_bench.py [--n-docs 20000] [--n-samples 2000]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from pathlib import Path
+import random
+import resource
+import tempfile
+import time
+
+import polars as pl
+
+from alfs.data_models.doc_store import DocStore
+from alfs.encoding import context_window
+
+
+def _parquet(docs: Path, sample: list[tuple[str, int]], scan: bool) -> int:
+    if scan:
+        needed = list({doc_id for doc_id, _ in sample})
+        docs_df = (
+            pl.scan_parquet(str(docs))
+            .filter(pl.col("doc_id").is_in(needed))
+            .collect(engine="streaming")
+        )
+    else:
+        docs_df = pl.read_parquet(docs)
+    docs_map = dict(
+        zip(docs_df["doc_id"].to_list(), docs_df["text"].to_list(), strict=False)
+    )
+    n = 0
+    for doc_id, byte_offset in sample:
+        text = docs_map.get(doc_id, "")
+        if text:
+            n += len(context_window(text, byte_offset, "word", 150)[0])
+    return n
+
+
+def _doc_store(docs: Path, sample: list[tuple[str, int]]) -> int:
+    store = DocStore.open(docs)
+    n = 0
+    for doc_id, byte_offset in sample:
+        window = store.context_window(doc_id, byte_offset, "word", 150)
+        if window is not None:
+            n += len(window[0])
+    return n
+
+
+def _run(
+    variant: str, docs: Path, sample: list[tuple[str, int]]
+) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    if variant == "DocStore":
+        n = _doc_store(docs, sample)
+    else:
+        n = _parquet(docs, sample, scan=variant == "parquet scan")
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return elapsed, peak_kib, n
+
+
+def _write_corpus(docs: Path, n_docs: int, doc_chars: int) -> float:
+    """Write a random corpus to docs and build its DocStore; returns build time."""
+    rng = random.Random(0)
+    # Random lowercase words so the parquet does not compress unrealistically.
+    alphabet = bytes(range(97, 123)) + b" " * 6
+    table = bytes(alphabet[b % len(alphabet)] for b in range(256))
+    pl.DataFrame(
+        {
+            "doc_id": [f"doc{i:07d}" for i in range(n_docs)],
+            "text": [
+                rng.randbytes(doc_chars).translate(table).decode()
+                for _ in range(n_docs)
+            ],
+        }
+    ).write_parquet(docs)
+    start = time.perf_counter()
+    DocStore.open(docs)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-docs", type=int, default=20_000)
+    parser.add_argument("--doc-chars", type=int, default=20_000)
+    parser.add_argument("--n-samples", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    sample = [
+        (f"doc{rng.randrange(args.n_docs):07d}", rng.randrange(args.doc_chars))
+        for _ in range(args.n_samples)
+    ]
+    # Every step runs in a fresh process: ru_maxrss survives exec, so a parent
+    # that had held the corpus would inflate every child's peak RSS.
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = Path(tmp) / "docs.parquet"
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            build_s = pool.submit(
+                _write_corpus, docs, args.n_docs, args.doc_chars
+            ).result()
+        print(f"DocStore build: {build_s:.2f}s (one-off per docs.parquet)")
+
+        print(f"{'variant':<14} {'samples':>8} {'seconds':>9} {'peak RSS MiB':>13}")
+        for variant in ("parquet read", "parquet scan", "DocStore"):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                elapsed, peak_kib, _ = pool.submit(_run, variant, docs, sample).result()
+            print(
+                f"{variant:<14} {len(sample):>8} {elapsed:>9.3f}"
+                f" {peak_kib / 1024:>13.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
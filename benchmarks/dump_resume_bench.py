@@ -0,0 +1,85 @@
+"""Benchmark: resuming deep into a multistream dump, page skip vs stream seek.
+
+Builds a synthetic multistream dump (100 pages per bz2 stream, as Wikimedia
+does), then times how long it takes to get the first page after resuming at a
+given depth: the original cursor re-streams the dump and discards
+pages_consumed pages, the stream-position cursor seeks to the page's bz2 stream.
+Also times a full read against the original bz2.open + iterparse reader.
+
+Usage:
+    python benchmarks/dump_resume_bench.py [--n-pages 100000]
+"""
+
+import argparse
+import bz2
+import itertools
+from pathlib import Path
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from alfs.etl.stream_dump import NS, _page_dict, stream_pages
+
+
+def _legacy_count(dump_path: Path) -> int:
+    n = 0
+    with bz2.open(dump_path) as f:
+        for _event, elem in ET.iterparse(f, events=["end"]):
+            if elem.tag == f"{{{NS}}}page":
+                n += _page_dict(elem, "x") is not None
+                elem.clear()
+    return n
+
+
+def _write_dump(path: Path, n_pages: int, per_stream: int = 100) -> None:
+    body = " ".join(f"word{j} [[link{j}]]" for j in range(150))
+    with open(path, "wb") as f:
+        f.write(bz2.compress(f'<mediawiki xmlns="{NS}">\n'.encode()))
+        for start in range(0, n_pages, per_stream):
+            pages = "".join(
+                f"<page><title>Page {i}</title><ns>0</ns><revision>"
+                f"<timestamp>2020-01-01T00:00:00Z</timestamp>"
+                f"<text>{i} {body}</text></revision></page>\n"
+                for i in range(start, min(start + per_stream, n_pages))
+            )
+            f.write(bz2.compress(pages.encode()))
+        f.write(bz2.compress(b"</mediawiki>\n"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-pages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = Path(tmp) / "dump.xml.bz2"
+        _write_dump(dump, args.n_pages)
+        print(f"{args.n_pages:,} pages, {dump.stat().st_size / 2**20:.0f} MiB bz2")
+
+        start = time.perf_counter()
+        n_legacy = _legacy_count(dump)
+        legacy_s = time.perf_counter() - start
+        start = time.perf_counter()
+        positions = [
+            (p["stream_offset"], p["stream_page"]) for p in stream_pages(dump, "x")
+        ]
+        new_s = time.perf_counter() - start
+        assert n_legacy == len(positions)
+        print(
+            f"full read: bz2.open+iterparse {legacy_s:.2f}s, stream_pages {new_s:.2f}s"
+        )
+
+        print(f"{'resume at':>10} {'page skip':>10} {'seek':>8}")
+        for depth in (args.n_pages // 10, args.n_pages // 2, args.n_pages - 1):
+            start = time.perf_counter()
+            skipped = next(itertools.islice(stream_pages(dump, "x"), depth, None))
+            skip_s = time.perf_counter() - start
+            start = time.perf_counter()
+            sought = next(stream_pages(dump, "x", *positions[depth]))
+            seek_s = time.perf_counter() - start
+            assert skipped == sought
+            print(f"{depth:>10,} {skip_s:>9.2f}s {seek_s:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Benchmark: stream_pages() throughput on a multistream dump by read workers.
+
+Builds a synthetic multistream dump (100 pages per bz2 stream, as Wikimedia
+does) and times reading every page with stream_pages() at each worker count.
+workers=1 is the sequential reader.
+
+Usage:
+    python benchmarks/multistream_read_bench.py [--n-pages 50000] [--workers 1 2 4]
+"""
+
+import argparse
+import os
+from pathlib import Path
+import tempfile
+import time
+
+from dump_resume_bench import _write_dump
+
+from alfs.etl.stream_dump import stream_pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-pages", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = Path(tmp) / "dump.xml.bz2"
+        _write_dump(dump, args.n_pages)
+        size_mib = dump.stat().st_size / 2**20
+        print(f"{args.n_pages:,} pages, {size_mib:.0f} MiB bz2, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'seconds':>9} {'pages/s':>9}")
+        expected = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            titles = [p["title"] for p in stream_pages(dump, "x", workers=workers)]
+            elapsed = time.perf_counter() - start
+            if expected is None:
+                expected = titles
+            assert titles == expected
+            print(f"{workers:>8} {elapsed:>9.2f} {len(titles) / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
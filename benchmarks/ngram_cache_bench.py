@@ -0,0 +1,112 @@
+"""Benchmark: NgramCache load time, peak RSS, queries and 8-gram hashing.
+
+Compares the original cache, a Python set of SHA256-derived hashes built from
+np.load(...).tolist(), against the sorted int64 array that NgramCache now
+memory-maps. Each variant loads a cache of --n-hashes random hashes and checks
+--n-queries documents against it in a fresh process, so peak RSS is measured
+independently. Also times hashing the 8-grams of documents both ways.
+
+Usage:
+    python benchmarks/ngram_cache_bench.py [--n-hashes 20000000] [--n-queries 1000]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import multiprocessing
+from pathlib import Path
+import random
+import resource
+import tempfile
+import time
+
+import numpy as np
+
+from alfs.etl.ngram_cache import NgramCache
+
+
+def _legacy_gram_hashes(text: str) -> list[int]:
+    words = text.split()
+    grams = [" ".join(words[i : i + 8]) for i in range(len(words) - 7)]
+    return [
+        int.from_bytes(hashlib.sha256(g.encode()).digest()[:8], "little", signed=True)
+        for g in grams
+    ]
+
+
+def _docs(n: int, words: int = 2_000) -> list[str]:
+    rng = random.Random(0)
+    vocab = [f"w{i}" for i in range(20_000)]
+    return [" ".join(rng.choices(vocab, k=words)) for _ in range(n)]
+
+
+def _run(variant: str, path: Path, n_queries: int) -> tuple[float, float, int]:
+    queries = [NgramCache.gram_hashes(t) for t in _docs(n_queries)]
+    start = time.perf_counter()
+    if variant == "set":
+        hashes = set(np.load(path).tolist())
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        hits = sum(sum(1 for h in q.tolist() if h in hashes) for q in queries)
+    else:
+        cache = NgramCache.load(path)
+        load_s = time.perf_counter() - start
+        start = time.perf_counter()
+        hits = sum(int(np.count_nonzero(cache._contains(q))) for q in queries)
+    query_s = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(
+        f"{variant:<14} {load_s:>8.2f}s {query_s:>9.3f}s {peak_kib / 1024:>9.0f}",
+        flush=True,
+    )
+    return load_s, query_s, hits
+
+
+def _write_caches(tmp: Path, n_hashes: int) -> tuple[Path, Path]:
+    rng = np.random.default_rng(0)
+    hashes = np.unique(rng.integers(-(2**63), 2**63 - 1, n_hashes, dtype=np.int64))
+    legacy = tmp / "legacy.npy"
+    np.save(legacy, rng.permutation(hashes))
+    current = tmp / "ngram_cache.npy"
+    NgramCache(hashes).save(current)
+    return legacy, current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-hashes", type=int, default=20_000_000)
+    parser.add_argument("--n-queries", type=int, default=1_000)
+    parser.add_argument("--n-hash-docs", type=int, default=500)
+    args = parser.parse_args()
+
+    docs = _docs(args.n_hash_docs)
+    start = time.perf_counter()
+    legacy = [_legacy_gram_hashes(t) for t in docs]
+    legacy_s = time.perf_counter() - start
+    start = time.perf_counter()
+    current = [NgramCache.gram_hashes(t) for t in docs]
+    current_s = time.perf_counter() - start
+    assert [len(h) for h in legacy] == [len(h) for h in current]
+    print(
+        f"hashing {args.n_hash_docs} docs: sha256 per gram {legacy_s:.2f}s, "
+        f"gram_hashes {current_s:.2f}s"
+    )
+
+    # Fresh processes: ru_maxrss survives exec, so the parent must stay small.
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            legacy_path, current_path = pool.submit(
+                _write_caches, Path(tmp), args.n_hashes
+            ).result()
+        print(f"{args.n_hashes:,} hashes, {args.n_queries} query docs")
+        print(f"{'variant':<14} {'load':>9} {'queries':>10} {'peak MiB':>9}")
+        hits = []
+        for variant, path in (("set", legacy_path), ("sorted mmap", current_path)):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                hits.append(pool.submit(_run, variant, path, args.n_queries).result())
+        assert hits[0][2] == hits[1][2]
+
+
+if __name__ == "__main__":
+    main()
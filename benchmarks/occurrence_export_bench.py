@@ -0,0 +1,81 @@
+"""Benchmark: OccurrenceStore.to_polars() export time and peak RSS.
+
+Compares the original fetchall() + orient="row" export against the streaming
+Arrow export, each in a fresh process so peak RSS is measured independently.
+
+Usage:
+    python benchmarks/occurrence_export_bench.py [--n-rows 2000000]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from pathlib import Path
+import resource
+import sqlite3
+import tempfile
+import time
+
+import polars as pl
+
+from alfs.data_models.occurrence_store import _SCHEMA, OccurrenceStore
+
+
+def _legacy_to_polars(db_path: Path) -> pl.DataFrame:
+    con = sqlite3.connect(db_path)
+    rows = con.execute(
+        "SELECT l.form, l.doc_id, l.byte_offset, l.sense_key, l.rating, "
+        "m.name as model, l.updated_at, l.synonyms, "
+        "l.last_critic_date, mc.name as last_critic_model "
+        "FROM labeled l "
+        "LEFT JOIN models m ON l.model_id = m.id "
+        "LEFT JOIN models mc ON l.last_critic_model_id = mc.id"
+    ).fetchall()
+    con.close()
+    return pl.DataFrame(rows, schema=_SCHEMA, orient="row")
+
+
+def _run(variant: str, db_path: Path) -> tuple[float, int, int]:
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if variant == "legacy":
+        df = _legacy_to_polars(db_path)
+    elif variant == "arrow":
+        df = OccurrenceStore(db_path).to_polars()
+    else:
+        df = OccurrenceStore(db_path).to_polars(
+            columns=["form", "doc_id", "byte_offset"], where={"rating": [1, 2]}
+        )
+    elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_rss
+    return elapsed, peak_kib, len(df)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "labeled.db"
+        store = OccurrenceStore(db_path)
+        chunk = 100_000
+        for start in range(0, args.n_rows, chunk):
+            store.upsert_many(
+                (
+                    (f"form{i % 5000}", f"doc{i // 100}", i, str(i % 7), i % 3, None)
+                    for i in range(start, min(start + chunk, args.n_rows))
+                ),
+                model="bench",
+            )
+
+        print(f"{'variant':<22} {'rows':>10} {'seconds':>9} {'peak RSS MiB':>13}")
+        ctx = multiprocessing.get_context("spawn")
+        for variant in ("legacy", "arrow", "arrow+projection"):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                elapsed, peak_kib, n = pool.submit(_run, variant, db_path).result()
+            print(f"{variant:<22} {n:>10} {elapsed:>9.2f} {peak_kib / 1024:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
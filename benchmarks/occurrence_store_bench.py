@@ -0,0 +1,67 @@
+"""Microbenchmark: OccurrenceStore calls/sec with and without connection pooling.
+
+Usage:
+    python benchmarks/occurrence_store_bench.py [--n-forms 200] [--n-calls 2000]
+"""
+
+import argparse
+from collections.abc import Callable
+from pathlib import Path
+import tempfile
+import time
+
+from alfs.data_models.occurrence_store import OccurrenceStore
+
+
+def _calls_per_sec(fn: Callable[[int], object], n_calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(n_calls):
+        fn(i)
+    return n_calls / (time.perf_counter() - start)
+
+
+def _bench(store: OccurrenceStore, n_forms: int, n_calls: int) -> dict[str, float]:
+    return {
+        "upsert_many": _calls_per_sec(
+            lambda i: store.upsert_many(
+                [(f"form{i % n_forms}", f"doc{i}", 0, "1", 1, None)], model="bench"
+            ),
+            n_calls,
+        ),
+        "query_form": _calls_per_sec(
+            lambda i: store.query_form(f"form{i % n_forms}"), n_calls
+        ),
+        "mark_critic_reviewed": _calls_per_sec(
+            lambda i: store.mark_critic_reviewed(
+                [(f"form{i % n_forms}", f"doc{i}", 0)], "2026-01-01T00:00:00Z", "critic"
+            ),
+            n_calls,
+        ),
+        "count_by_form": _calls_per_sec(
+            lambda i: store.count_by_form(), max(1, n_calls // 20)
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-forms", type=int, default=200)
+    parser.add_argument("--n-calls", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, pool_size in (("unpooled", 0), ("pooled", args.pool_size)):
+            store = OccurrenceStore(Path(tmp) / f"{label}.db", pool_size=pool_size)
+            results[label] = _bench(store, args.n_forms, args.n_calls)
+            store.close()
+
+    print(f"{'method':<22} {'unpooled/s':>12} {'pooled/s':>12} {'speedup':>8}")
+    for method, before in results["unpooled"].items():
+        after = results["pooled"][method]
+        print(f"{method:<22} {before:>12.0f} {after:>12.0f} {after / before:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: etl.augment.parse_pages() throughput in pages/sec by worker count.
+
+Parses synthetic wikitext pages (links, templates, bold, refs) and hashes their
+8-grams, as the augment loop does for every dump page.
+
+Usage:
+    python benchmarks/parse_pages_bench.py [--n-pages 4000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from alfs.etl.augment import parse_pages
+
+
+def _page(rng: random.Random, i: int) -> dict:
+    words = ["alpha", "beta", "gamma", "delta", "river", "stone", "light", "field"]
+    parts = []
+    for _ in range(400):
+        w = rng.choice(words)
+        r = rng.random()
+        if r < 0.05:
+            parts.append(f"[[{w.title()} {i}|{w}]]")
+        elif r < 0.08:
+            parts.append(f"{{{{cite|title={w}|year=19{rng.randrange(100):02d}}}}}")
+        elif r < 0.12:
+            parts.append(f"'''{w}'''")
+        elif r < 0.14:
+            parts.append(f"<ref>{w} {rng.randrange(1000)}</ref>")
+        else:
+            parts.append(w)
+    return {
+        "title": f"Page {i}",
+        "wikitext": " ".join(parts),
+        "year": 2020,
+        "author": None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-pages", type=int, default=4_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pages = [_page(rng, i) for i in range(args.n_pages)]
+    print(f"{args.n_pages} pages, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>9} {'pages/s':>9}")
+    expected = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        results = [
+            None if r is None else (r[0], r[1].tolist())
+            for r in parse_pages(pages, "wikibooks", 200, workers)
+        ]
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = results
+        assert results == expected
+        print(f"{workers:>8} {elapsed:>9.2f} {args.n_pages / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
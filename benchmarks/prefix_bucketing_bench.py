@@ -0,0 +1,73 @@
+"""Benchmark: prefix bucketing and segment writes in aggregate_occurrences.
+
+Compares the original per-token map_elements(prefix) + one filter per prefix
+against prefix_expr() + a single partition_by, then times the full
+TokenStore.write with one writer thread vs several.
+
+Usage:
+    python benchmarks/prefix_bucketing_bench.py [--n-tokens 5000000] [--workers 4]
+"""
+
+import argparse
+import contextlib
+import io
+from pathlib import Path
+import tempfile
+import time
+
+import polars as pl
+from token_store_bench import _corpus
+
+from alfs.seg.sharding import prefix, prefix_expr
+from alfs.seg.token_store import TokenStore
+
+
+def _bucket_legacy(df: pl.DataFrame) -> dict[str, pl.DataFrame]:
+    df = df.with_columns(
+        pl.col("form").map_elements(prefix, return_dtype=pl.String).alias("prefix")
+    )
+    return {
+        pfx: df.filter(pl.col("prefix") == pfx).drop("prefix")
+        for pfx in df["prefix"].unique().sort().to_list()
+    }
+
+
+def _bucket_vectorized(df: pl.DataFrame) -> dict[str, pl.DataFrame]:
+    groups = df.with_columns(prefix_expr()).partition_by(
+        "prefix", as_dict=True, include_key=False
+    )
+    return {str(pfx): rows for (pfx,), rows in groups.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-tokens", type=int, default=5_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    df = _corpus(args.n_tokens, 200_000, 100_000)
+
+    start = time.perf_counter()
+    legacy = _bucket_legacy(df)
+    legacy_s = time.perf_counter() - start
+    start = time.perf_counter()
+    vectorized = _bucket_vectorized(df)
+    vectorized_s = time.perf_counter() - start
+    assert {k: len(v) for k, v in legacy.items()} == {
+        k: len(v) for k, v in vectorized.items()
+    }
+    print(f"{'step':<28} {'seconds':>9}")
+    print(f"{'bucket: map_elements+filter':<28} {legacy_s:>9.2f}")
+    print(f"{'bucket: expr+partition_by':<28} {vectorized_s:>9.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in (1, args.workers):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                TokenStore(Path(tmp) / f"w{workers}").write(df, workers=workers)
+            label = f"write: {workers} worker(s)"
+            print(f"{label:<28} {time.perf_counter() - start:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: per-form occurrence lookup latency.
+
+Compares the original lookup (read the whole prefix parquet, then filter on
+str.to_lowercase()) against SegIndex.occurrences(), which reads only the row
+groups named by the prefix's sidecar index.
+
+Usage:
+    python benchmarks/seg_index_bench.py [--n-tokens 5000000] [--n-lookups 200]
+"""
+
+import argparse
+from collections.abc import Callable
+from pathlib import Path
+import random
+import statistics
+import tempfile
+import time
+
+import polars as pl
+from token_store_bench import _corpus, _write_legacy
+
+from alfs.seg.sharding import prefix
+from alfs.seg.token_store import SegIndex, TokenStore
+
+
+def _legacy_lookup(seg_dir: Path, form: str) -> pl.DataFrame:
+    occ_path = seg_dir / prefix(form) / "occurrences.parquet"
+    return pl.read_parquet(str(occ_path)).filter(
+        pl.col("form").str.to_lowercase() == form.lower()
+    )
+
+
+def _latencies_ms(fn: Callable[[str], object], forms: list[str]) -> list[float]:
+    out = []
+    for form in forms:
+        start = time.perf_counter()
+        fn(form)
+        out.append((time.perf_counter() - start) * 1000)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-tokens", type=int, default=5_000_000)
+    parser.add_argument("--n-forms", type=int, default=200_000)
+    parser.add_argument("--n-docs", type=int, default=20_000)
+    parser.add_argument("--n-lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    df = _corpus(args.n_tokens, args.n_forms, args.n_docs)
+    vocab = df["form"].unique().sort().to_list()
+    forms = random.Random(0).sample(vocab, min(args.n_lookups, len(vocab)))
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir, indexed_dir = Path(tmp) / "legacy", Path(tmp) / "indexed"
+        _write_legacy(df, legacy_dir)
+        TokenStore(indexed_dir).write(df)
+        seg_index = SegIndex(indexed_dir)
+        seg_index.occurrences(forms[0])  # load dictionaries once
+
+        print(f"{len(forms)} lookups over {args.n_tokens:,} tokens")
+        print(f"{'lookup':<22} {'median ms':>10} {'p95 ms':>10}")
+        for label, fn in (
+            ("read+filter prefix", lambda f: _legacy_lookup(legacy_dir, f)),
+            ("SegIndex.occurrences", seg_index.occurrences),
+        ):
+            ms = sorted(_latencies_ms(fn, forms))
+            p95 = ms[int(0.95 * (len(ms) - 1))]
+            print(f"{label:<22} {statistics.median(ms):>10.2f} {p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
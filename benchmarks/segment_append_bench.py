@@ -0,0 +1,65 @@
+"""Benchmark: cost of merging a small batch into an existing by_prefix layout.
+
+Compares appending delta segments (TokenStore.write with merge=True) against
+the previous behaviour of reading, concatenating and rewriting every touched
+prefix, and reports the read cost of the resulting multi-segment layout.
+
+Usage:
+    python benchmarks/segment_append_bench.py [--n-tokens 5000000] [--batch 20000]
+"""
+
+import argparse
+import contextlib
+import io
+from pathlib import Path
+import tempfile
+import time
+
+import polars as pl
+from token_store_bench import _corpus
+
+from alfs.seg.token_store import TokenStore
+
+
+def _rewrite(store: TokenStore, batch: pl.DataFrame) -> None:
+    combined = pl.concat(
+        [store.scan(pfx).collect() for pfx in store.prefixes()] + [batch]
+    )
+    store.write(combined.unique(["form", "doc_id", "byte_offset"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-tokens", type=int, default=5_000_000)
+    parser.add_argument("--batch", type=int, default=20_000)
+    parser.add_argument("--n-batches", type=int, default=5)
+    args = parser.parse_args()
+
+    df = _corpus(args.n_tokens + args.batch * args.n_batches, 200_000, 100_000)
+    base = df.head(args.n_tokens)
+    batches = [
+        df.slice(args.n_tokens + i * args.batch, args.batch)
+        for i in range(args.n_batches)
+    ]
+
+    print(f"{'variant':<10} {'append s/batch':>15} {'full scan s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for variant in ("rewrite", "delta"):
+            store = TokenStore(Path(tmp) / variant)
+            with contextlib.redirect_stdout(io.StringIO()):
+                store.write(base)
+                start = time.perf_counter()
+                for batch in batches:
+                    if variant == "delta":
+                        store.write(batch, merge=True)
+                    else:
+                        _rewrite(store, batch)
+                per_batch = (time.perf_counter() - start) / len(batches)
+            start = time.perf_counter()
+            store.scan().select(pl.len()).collect()
+            scan = time.perf_counter() - start
+            print(f"{variant:<10} {per_batch:>15.3f} {scan:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark: per-token byte-offset computation on long documents.
+
+Compares re-encoding the text prefix for every token (the original approach)
+against ByteOffsetMapper, using spaCy's blank English tokenizer on a synthetic
+document with a sprinkling of non-ASCII characters.
+
+Usage:
+    python benchmarks/segment_offsets_bench.py [--n-chars 800000]
+"""
+
+import argparse
+import random
+import time
+
+import spacy
+
+from alfs.encoding import ByteOffsetMapper
+
+_WORDS = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "café"]
+
+
+def _prefix_offsets(text: str, idxs: list[int]) -> list[int]:
+    return [len(text[:i].encode()) for i in idxs]
+
+
+def _mapper_offsets(text: str, idxs: list[int]) -> list[int]:
+    mapper = ByteOffsetMapper(text)
+    return [mapper.byte_offset(i) for i in idxs]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-chars", type=int, default=800_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    parts: list[str] = []
+    n = 0
+    while n < args.n_chars:
+        word = rng.choice(_WORDS)
+        parts.append(word)
+        n += len(word) + 1
+    text = " ".join(parts)[: args.n_chars]
+    idxs = [token.idx for token in spacy.blank("en")(text)]
+
+    print(f"{len(text):,} chars, {len(idxs):,} tokens")
+    results: dict[str, float] = {}
+    expected: list[int] | None = None
+    for label, fn in (
+        ("prefix re-encode", _prefix_offsets),
+        ("mapper", _mapper_offsets),
+    ):
+        start = time.perf_counter()
+        offsets = fn(text, idxs)
+        results[label] = time.perf_counter() - start
+        assert expected is None or offsets == expected
+        expected = offsets
+        print(f"{label:<18} {results[label]:>9.3f}s")
+    speedup = results["prefix re-encode"] / results["mapper"]
+    print(f"speedup: {speedup:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark: legacy string by_prefix layout vs the interned TokenStore layout.
+
+Writes the same synthetic Zipfian corpus in both layouts and reports disk usage
+and load time for the whole-corpus reads used by select_targets /
+enqueue_new_forms (form counts), load_all_seg_data (full scan) and split_docs
+(segmented doc ids).
+
+Usage:
+    python benchmarks/token_store_bench.py [--n-tokens 5000000]
+"""
+
+import argparse
+from collections.abc import Callable
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+import polars as pl
+
+from alfs.seg.sharding import prefix
+from alfs.seg.token_store import TokenStore
+
+
+def _corpus(n_tokens: int, n_forms: int, n_docs: int) -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    vocab = [
+        "".join(rng.choice(letters, size=int(rng.integers(2, 12))))
+        for _ in range(n_forms)
+    ]
+    form_idx = np.minimum(rng.zipf(1.2, size=n_tokens) - 1, n_forms - 1)
+    doc_idx = np.sort(rng.integers(0, n_docs, size=n_tokens))
+    return pl.DataFrame(
+        {
+            "form": pl.Series(vocab).gather(form_idx),
+            "doc_id": [f"{i:08x}" for i in doc_idx],
+            "byte_offset": np.arange(n_tokens, dtype=np.int64) * 6,
+        }
+    )
+
+
+def _write_legacy(df: pl.DataFrame, seg_dir: Path) -> None:
+    df = df.with_columns(
+        pl.col("form").map_elements(prefix, return_dtype=pl.String).alias("prefix")
+    )
+    for (pfx,), group in df.partition_by("prefix", as_dict=True).items():
+        (seg_dir / str(pfx)).mkdir(parents=True)
+        group.drop("prefix").sort(["form", "doc_id", "byte_offset"]).write_parquet(
+            seg_dir / str(pfx) / "occurrences.parquet"
+        )
+
+
+def _disk_mib(seg_dir: Path) -> float:
+    return sum(p.stat().st_size for p in seg_dir.rglob("*.parquet")) / 2**20
+
+
+def _seconds(fn: Callable[[Path], object], seg_dir: Path) -> float:
+    start = time.perf_counter()
+    fn(seg_dir)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-tokens", type=int, default=5_000_000)
+    parser.add_argument("--n-forms", type=int, default=200_000)
+    parser.add_argument("--n-docs", type=int, default=20_000)
+    args = parser.parse_args()
+
+    df = _corpus(args.n_tokens, args.n_forms, args.n_docs)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_dir, interned_dir = Path(tmp) / "legacy", Path(tmp) / "interned"
+        _write_legacy(df, legacy_dir)
+        TokenStore(interned_dir).write(df)
+
+        print(f"{args.n_tokens:,} tokens")
+        print(f"{'':<18} {'legacy':>10} {'interned':>10}")
+        sizes = [_disk_mib(d) for d in (legacy_dir, interned_dir)]
+        print(f"{'disk MiB':<18} {sizes[0]:>10.1f} {sizes[1]:>10.1f}")
+        reads: list[tuple[str, Callable[[Path], object]]] = [
+            ("form_counts s", lambda d: TokenStore(d).form_counts()),
+            ("full scan s", lambda d: TokenStore(d).scan().collect()),
+            ("doc_ids s", lambda d: TokenStore(d).doc_ids()),
+        ]
+        for label, fn in reads:
+            times = [_seconds(fn, d) for d in (legacy_dir, interned_dir)]
+            print(f"{label:<18} {times[0]:>10.3f} {times[1]:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
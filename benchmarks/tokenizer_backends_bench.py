@@ -0,0 +1,53 @@
+"""Benchmark: segmentation tokenizer backends, startup time and throughput.
+
+Each backend runs in a fresh process so load time includes imports and model
+deserialization, as a segmentation worker would see it. Backends whose model
+is not installed are reported as unavailable.
+
+Usage:
+    python benchmarks/tokenizer_backends_bench.py [--n-docs 2000]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import time
+
+
+def _run(tokenizer: str, n_docs: int) -> tuple[float, int, float]:
+    start = time.perf_counter()
+    from alfs.seg.segment_docs import load_nlp, segment
+
+    nlp = load_nlp(tokenizer)
+    load_s = time.perf_counter() - start
+
+    sentence = "Mr. Smith's well-known café isn't open on Sundays, is it? "
+    docs = [(f"d{i}", sentence * 50) for i in range(n_docs)]
+    start = time.perf_counter()
+    n_tokens = sum(t.num_rows for t in segment(nlp, docs))
+    return load_s, n_tokens, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-docs", type=int, default=2000)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'tokenizer':<10} {'load s':>8} {'tokens':>10} {'tokens/sec':>12}")
+    for tokenizer in ("blank", "model"):
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            try:
+                load_s, n_tokens, seg_s = pool.submit(
+                    _run, tokenizer, args.n_docs
+                ).result()
+            except OSError as e:
+                print(f"{tokenizer:<10} unavailable ({e.__class__.__name__})")
+                continue
+        print(
+            f"{tokenizer:<10} {load_s:>8.2f} {n_tokens:>10} {n_tokens / seg_s:>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ nextflow.enable.dsl = 2
 params.docs         = "${launchDir}/../text_data/docs.parquet"
 params.seg_data_dir = "${launchDir}/../seg_data/by_prefix"
 params.shard_size   = 1000
+params.tokenizer    = "blank"
 
 process SPLIT_DOCS {
     input:
@@ -25,7 +26,8 @@ process SEGMENT_SHARD {
     """
     uv run --project ${launchDir} --no-sync python -m alfs.seg.segment_docs \
         --docs ${shard_file} \
-        --output raw_${shard_file.baseName}.parquet
+        --output raw_${shard_file.baseName}.parquet \
+        --tokenizer ${params.tokenizer}
     """
 }
 
@@ -39,7 +41,8 @@ process AGGREGATE {
     uv run --project ${launchDir} --no-sync python -m alfs.seg.aggregate_occurrences \
         --occurrences "\${files[@]}" \
         --output-dir ${seg_data_dir} \
-        --merge
+        --merge \
+        --tokenizer ${params.tokenizer}
     """
 }
 
@@ -59,7 +59,11 @@ def main() -> None:
     )
 
     sense_store = SenseStore(Path(args.senses_db))
-    occ_store = OccurrenceStore(Path(args.labeled_db)) if args.labeled_db else None
+    occ_store = (
+        OccurrenceStore(Path(args.labeled_db), pool_size=args.workers)
+        if args.labeled_db
+        else None
+    )
     instance_log = Path(args.instance_log) if args.instance_log else None
 
     if args.watch:
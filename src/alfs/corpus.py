@@ -5,13 +5,21 @@ from typing import Literal, overload
 
 import polars as pl
 
-from alfs.encoding import context_window as _context_window
+from alfs.data_models.doc_store import DocStore
 
 
 def _extract_context(
-    text: str, byte_offset: int, form: str, context_chars: int, bold_form: bool = False
-) -> str:
-    snippet, wp = _context_window(text, byte_offset, form, context_chars)
+    docs: DocStore,
+    doc_id: str,
+    byte_offset: int,
+    form: str,
+    context_chars: int,
+    bold_form: bool = False,
+) -> str | None:
+    window = docs.context_window(doc_id, byte_offset, form, context_chars)
+    if window is None:
+        return None
+    snippet, wp = window
     if bold_form:
         return (
             _html.escape(snippet[:wp])
@@ -28,7 +36,7 @@ def fetch_instances(
     form: str,
     sense_key: str,
     labeled: pl.DataFrame,
-    docs: pl.DataFrame,
+    docs: DocStore,
     *,
     min_rating: int = ...,
     context_chars: int = ...,
@@ -43,7 +51,7 @@ def fetch_instances(
     form: str,
     sense_key: str,
     labeled: pl.DataFrame,
-    docs: pl.DataFrame,
+    docs: DocStore,
     *,
     min_rating: int = ...,
     context_chars: int = ...,
@@ -57,7 +65,7 @@ def fetch_instances(
     form: str,
     sense_key: str,
     labeled: pl.DataFrame,
-    docs: pl.DataFrame,
+    docs: DocStore,
     *,
     min_rating: int = 2,
     context_chars: int = 150,
@@ -82,33 +90,13 @@ def fetch_instances(
     )
     if filtered.is_empty():
         return []
-    needed_ids = filtered["doc_id"].unique().to_list()
-    docs_subset = docs.filter(pl.col("doc_id").is_in(needed_ids))
-    docs_map = dict(
-        zip(
-            docs_subset["doc_id"].to_list(), docs_subset["text"].to_list(), strict=False
-        )
-    )
     results: list = []
     for row in filtered.iter_rows(named=True):
-        text = docs_map.get(row["doc_id"], "")
+        text = _extract_context(
+            docs, row["doc_id"], row["byte_offset"], form, context_chars, bold_form
+        )
         if include_rating:
-            if text:
-                results.append(
-                    {
-                        "text": _extract_context(
-                            text, row["byte_offset"], form, context_chars, bold_form
-                        ),
-                        "rating": row["rating"],
-                    }
-                )
-            else:
-                results.append({"text": None, "rating": row["rating"]})
-        else:
-            if text:
-                results.append(
-                    _extract_context(
-                        text, row["byte_offset"], form, context_chars, bold_form
-                    )
-                )
+            results.append({"text": text, "rating": row["rating"]})
+        elif text is not None:
+            results.append(text)
     return results
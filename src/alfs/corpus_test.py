@@ -1,6 +1,7 @@
 import polars as pl
 
 from alfs.corpus import fetch_instances
+from alfs.data_models.doc_store import DocStore
 
 
 def _labeled(rows: list[tuple]) -> pl.DataFrame:
@@ -26,11 +27,15 @@ def _labeled(rows: list[tuple]) -> pl.DataFrame:
     )
 
 
-def _docs(rows: list[tuple]) -> pl.DataFrame:
+def _docs(rows: list[tuple]) -> DocStore:
     if not rows:
-        return pl.DataFrame(schema={"doc_id": pl.String, "text": pl.String})
+        return DocStore.from_frame(
+            pl.DataFrame(schema={"doc_id": pl.String, "text": pl.String})
+        )
     doc_ids, texts = zip(*rows, strict=False)
-    return pl.DataFrame({"doc_id": list(doc_ids), "text": list(texts)})
+    return DocStore.from_frame(
+        pl.DataFrame({"doc_id": list(doc_ids), "text": list(texts)})
+    )
 
 
 def test_returns_context_snippets():
@@ -0,0 +1,102 @@
+"""Partitioned layout of the docs corpus (docs.parquet).
+
+The corpus is a directory of immutable part files plus a manifest:
+
+    docs.parquet/manifest.json
+    docs.parquet/part-000000.parquet
+    docs.parquet/part-000001.parquet
+
+    {"version": 1, "next_seq": 2, "parts": [
+        {"file": "part-000000.parquet", "source": "wikibooks", "n_docs": 10000,
+         "min_doc_id": "0003a1f2", "max_doc_id": "fffa0c1d"}, ...]}
+
+Each append writes one new part and replaces the manifest, so its cost is
+proportional to the docs added rather than to the corpus (see
+alfs.etl.corpus). Readers treat the listed parts, in order, as one table; part
+files not listed in the manifest (e.g. left by an interrupted write) are
+ignored. "source" is null for a part holding docs from several sources.
+
+A docs.parquet that is a plain parquet file (the original layout) is read as a
+single part. The first append adopts it as part-000000: the new layout is
+assembled in docs.parquet.adopt/ and then swapped in. If a crash lands between
+removing the file and the swap, readers use the complete .adopt directory and
+the next write moves it into place.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+
+MANIFEST_FILE = "manifest.json"
+DOCS_SCHEMA = {
+    "doc_id": pl.String,
+    "text": pl.String,
+    "title": pl.String,
+    "author": pl.String,
+    "year": pl.Int64,
+    "source_url": pl.String,
+    "source": pl.String,
+}
+
+
+def load_manifest(docs_path: Path) -> dict[str, Any]:
+    """The corpus manifest, or an empty one if docs_path holds no parts yet."""
+    path = Path(docs_path) / MANIFEST_FILE
+    if path.exists():
+        manifest: dict[str, Any] = json.loads(path.read_text())
+        return manifest
+    return {"version": 1, "next_seq": 0, "parts": []}
+
+
+def adopt_path(docs_path: Path) -> Path:
+    """Where a single-file corpus is rebuilt as a directory before the swap."""
+    return docs_path.with_name(docs_path.name + ".adopt")
+
+
+def _layout_path(docs_path: Path) -> Path:
+    """docs_path, or its complete .adopt directory if the swap was interrupted."""
+    if not docs_path.exists():
+        staged = adopt_path(docs_path)
+        if (staged / MANIFEST_FILE).exists():
+            return staged
+    return docs_path
+
+
+def part_paths(docs_path: Path) -> list[Path]:
+    """Parquet files making up the corpus, in append order."""
+    docs_path = _layout_path(Path(docs_path))
+    if docs_path.is_file():
+        return [docs_path]
+    return [docs_path / part["file"] for part in load_manifest(docs_path)["parts"]]
+
+
+def version_file(docs_path: Path) -> Path:
+    """The file replaced on every change to the corpus."""
+    docs_path = _layout_path(Path(docs_path))
+    return docs_path if docs_path.is_file() else docs_path / MANIFEST_FILE
+
+
+def scan_docs(docs_path: Path) -> pl.LazyFrame:
+    """All parts of the corpus as one lazy table.
+
+    Parts written by older code may lack columns or hold all-null ones; they
+    are relaxed to a common schema.
+    """
+    paths = part_paths(docs_path)
+    if not paths:
+        return pl.LazyFrame(schema=DOCS_SCHEMA)
+    if len(paths) == 1:
+        return pl.scan_parquet(paths[0])
+    return pl.concat([pl.scan_parquet(path) for path in paths], how="diagonal_relaxed")
+
+
+def read_docs(docs_path: Path, columns: list[str] | None = None) -> pl.DataFrame:
+    """Read the corpus (or just columns of it) into memory."""
+    lf = scan_docs(docs_path)
+    if columns is not None:
+        lf = lf.select(columns)
+    return lf.collect(engine="streaming")
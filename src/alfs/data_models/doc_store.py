@@ -0,0 +1,207 @@
+"""Memory-mapped doc text store for random-access context lookups.
+
+A store is a directory next to its source corpus (docs.textstore/ for
+docs.parquet; see alfs.data_models.doc_corpus) holding:
+
+    texts.bin      every doc's text as UTF-8, concatenated
+    index.parquet  doc_id -> (offset, length) into texts.bin, sorted by doc_id
+    source.json    size and mtime of the corpus manifest it was built from
+
+texts.bin is memory-mapped, so looking up a context window touches only the
+pages around the occurrence instead of loading or decoding whole documents.
+DocStore.open() builds the store on first use and rebuilds it when the corpus
+changes; the build streams each part in record batches and swaps the finished
+directory into place.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import json
+import mmap
+import os
+from pathlib import Path
+import shutil
+import tempfile
+
+import polars as pl
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+from alfs.data_models.doc_corpus import part_paths, version_file
+from alfs.encoding import context_window_bytes
+
+TEXTS_FILE = "texts.bin"
+INDEX_FILE = "index.parquet"
+SOURCE_FILE = "source.json"
+
+
+def store_path(docs_path: Path) -> Path:
+    return docs_path.with_name(docs_path.stem + ".textstore")
+
+
+def _source_stamp(docs_path: Path) -> dict[str, int]:
+    stat = version_file(docs_path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _is_fresh(docs_path: Path, path: Path) -> bool:
+    """Whether the store at path was built from docs_path as it is now."""
+    source = path / SOURCE_FILE
+    return source.exists() and json.loads(source.read_text()) == _source_stamp(
+        docs_path
+    )
+
+
+def _index(doc_ids: list[str], lengths: list[int]) -> pl.DataFrame:
+    """(doc_id, offset, length) for texts laid end to end, sorted by doc_id.
+
+    Duplicate doc_ids keep their first text.
+    """
+    sizes = pl.Series("length", lengths, dtype=pl.Int64)
+    return (
+        pl.DataFrame(
+            {
+                "doc_id": pl.Series(doc_ids, dtype=pl.String),
+                "offset": sizes.cum_sum() - sizes,
+                "length": sizes,
+            }
+        )
+        .unique("doc_id", keep="first", maintain_order=True)
+        .sort("doc_id")
+    )
+
+
+class DocStore:
+    """Read-only doc_id -> text access over concatenated UTF-8 texts.
+
+    index has one (doc_id, offset, length) row per doc, sorted by doc_id;
+    texts is the concatenated bytes it points into.
+    """
+
+    def __init__(self, index: pl.DataFrame, texts: bytes | mmap.mmap) -> None:
+        self._doc_ids = index["doc_id"]
+        self._offsets = index["offset"].to_numpy()
+        self._lengths = index["length"].to_numpy()
+        self._texts = texts
+        self._view = memoryview(texts)
+
+    @classmethod
+    def load(cls, path: Path) -> DocStore:
+        """Open a built store directory, memory-mapping its texts."""
+        index = pl.read_parquet(path / INDEX_FILE)
+        with open(path / TEXTS_FILE, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return cls(index, b"")
+            return cls(index, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def open(cls, docs_path: Path) -> DocStore:
+        """Open the store for docs_path, building it if missing or stale.
+
+        Symlinks are resolved first, so pipeline tasks that stage docs.parquet
+        as a link share the store next to the real file. Concurrent openers
+        (e.g. parallel compile tasks) take a lock around the build, so one
+        builds while the others wait and then load its store.
+        """
+        docs_path = Path(docs_path).resolve()
+        path = store_path(docs_path)
+        if not _is_fresh(docs_path, path):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            lock_path = path.with_name(path.name + ".lock")
+            with open(lock_path, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    if not _is_fresh(docs_path, path):
+                        cls.build(docs_path, path)
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+        return cls.load(path)
+
+    @classmethod
+    def from_frame(cls, docs: pl.DataFrame) -> DocStore:
+        """In-memory store over a (doc_id, text) frame."""
+        encoded = [(text or "").encode() for text in docs["text"].to_list()]
+        lengths = [len(data) for data in encoded]
+        return cls(_index(docs["doc_id"].to_list(), lengths), b"".join(encoded))
+
+    @staticmethod
+    def build(docs_path: Path, path: Path) -> None:
+        """Write a store for docs_path's (doc_id, text) columns to path.
+
+        The store is assembled in a sibling temp directory and renamed into
+        place, so readers never see a partial store. Duplicate doc_ids keep
+        their first text.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stamp = _source_stamp(docs_path)
+        tmp = Path(tempfile.mkdtemp(prefix=path.name + ".", dir=path.parent))
+        try:
+            doc_ids: list[str] = []
+            lengths: list[int] = []
+            with open(tmp / TEXTS_FILE, "wb") as out:
+                for part in part_paths(docs_path):
+                    parquet = pq.ParquetFile(part)
+                    for batch in parquet.iter_batches(columns=["doc_id", "text"]):
+                        for doc_id, text in zip(
+                            batch.column("doc_id").to_pylist(),
+                            batch.column("text").to_pylist(),
+                            strict=True,
+                        ):
+                            data = (text or "").encode()
+                            out.write(data)
+                            doc_ids.append(doc_id)
+                            lengths.append(len(data))
+            _index(doc_ids, lengths).write_parquet(tmp / INDEX_FILE)
+            (tmp / SOURCE_FILE).write_text(json.dumps(stamp))
+            # A directory can only be renamed over an empty one, so move any
+            # existing store aside first. Open stores keep their mapped files.
+            old = tmp.with_name(tmp.name + ".old")
+            with contextlib.suppress(FileNotFoundError):
+                os.replace(path, old)
+            try:
+                os.replace(tmp, path)
+            except OSError:
+                # A concurrent build installed its store first; keep that one.
+                if not (path / SOURCE_FILE).exists():
+                    raise
+            shutil.rmtree(old, ignore_errors=True)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return isinstance(doc_id, str) and self._find(doc_id) is not None
+
+    def _find(self, doc_id: str) -> int | None:
+        i = self._doc_ids.search_sorted(doc_id, side="left")
+        if i < len(self._doc_ids) and self._doc_ids[i] == doc_id:
+            return int(i)
+        return None
+
+    def _bytes(self, doc_id: str) -> memoryview | None:
+        i = self._find(doc_id)
+        if i is None:
+            return None
+        start = int(self._offsets[i])
+        return self._view[start : start + int(self._lengths[i])]
+
+    def text(self, doc_id: str) -> str | None:
+        """Return the full text of doc_id, or None if it is not in the store."""
+        data = self._bytes(doc_id)
+        return None if data is None else bytes(data).decode()
+
+    def context_window(
+        self, doc_id: str, byte_offset: int, form: str, context_chars: int
+    ) -> tuple[str, int] | None:
+        """alfs.encoding.context_window() for an occurrence, read in place.
+
+        Returns None when doc_id is missing or its text is empty, the cases in
+        which callers previously skipped the occurrence.
+        """
+        data = self._bytes(doc_id)
+        if not data:
+            return None
+        return context_window_bytes(data, byte_offset, form, context_chars)
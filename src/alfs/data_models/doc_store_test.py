@@ -0,0 +1,137 @@
+"""Tests for DocStore."""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+from pathlib import Path
+import time
+
+import polars as pl
+import pytest
+
+from alfs.data_models.doc import Doc
+from alfs.data_models.doc_store import DocStore, store_path
+from alfs.encoding import context_window
+from alfs.etl.corpus import append_docs
+
+
+def _write_docs(path: Path, rows: list[tuple[str, str | None]]) -> Path:
+    pl.DataFrame(
+        {"doc_id": [r[0] for r in rows], "text": [r[1] for r in rows]},
+        schema={"doc_id": pl.String, "text": pl.String},
+    ).write_parquet(path)
+    return path
+
+
+def test_open_builds_store_next_to_docs(tmp_path: Path):
+    docs = _write_docs(tmp_path / "docs.parquet", [("b", "beta"), ("a", "alpha")])
+    store = DocStore.open(docs)
+    assert store_path(docs) == tmp_path / "docs.textstore"
+    assert store_path(docs).is_dir()
+    assert len(store) == 2
+    assert store.text("a") == "alpha"
+    assert store.text("b") == "beta"
+
+
+def test_missing_doc(tmp_path: Path):
+    store = DocStore.open(_write_docs(tmp_path / "docs.parquet", [("a", "alpha")]))
+    assert "zz" not in store
+    assert store.text("zz") is None
+    assert store.context_window("zz", 0, "alpha", 10) is None
+
+
+def test_empty_and_null_texts_have_no_context(tmp_path: Path):
+    docs = _write_docs(tmp_path / "docs.parquet", [("a", ""), ("b", None)])
+    store = DocStore.open(docs)
+    assert "a" in store
+    assert store.text("b") == ""
+    assert store.context_window("a", 0, "x", 10) is None
+    assert store.context_window("b", 0, "x", 10) is None
+
+
+def test_empty_corpus(tmp_path: Path):
+    store = DocStore.open(_write_docs(tmp_path / "docs.parquet", []))
+    assert len(store) == 0
+    assert store.text("a") is None
+
+
+def test_duplicate_doc_ids_keep_first(tmp_path: Path):
+    docs = _write_docs(tmp_path / "docs.parquet", [("a", "first"), ("a", "second")])
+    store = DocStore.open(docs)
+    assert len(store) == 1
+    assert store.text("a") == "first"
+
+
+def test_open_rebuilds_when_source_changes(tmp_path: Path):
+    docs = _write_docs(tmp_path / "docs.parquet", [("a", "old text")])
+    assert DocStore.open(docs).text("a") == "old text"
+    _write_docs(docs, [("a", "new text"), ("b", "more")])
+    os.utime(docs, ns=(0, 0))
+    store = DocStore.open(docs)
+    assert store.text("a") == "new text"
+    assert store.text("b") == "more"
+    # The previous store is replaced, not left beside the new one.
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "docs.parquet",
+        "docs.textstore",
+        "docs.textstore.lock",
+    ]
+
+
+def test_open_through_symlink_uses_real_location(tmp_path: Path):
+    docs = _write_docs(tmp_path / "docs.parquet", [("a", "alpha")])
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "docs.parquet").symlink_to(docs)
+    assert DocStore.open(work / "docs.parquet").text("a") == "alpha"
+    assert store_path(docs).is_dir()
+    assert not (work / "docs.textstore").exists()
+
+
+def test_open_reuses_fresh_store(tmp_path: Path):
+    docs = _write_docs(tmp_path / "docs.parquet", [("a", "alpha")])
+    DocStore.open(docs)
+    index = store_path(docs) / "index.parquet"
+    mtime = index.stat().st_mtime_ns
+    DocStore.open(docs)
+    assert index.stat().st_mtime_ns == mtime
+
+
+def test_context_window_matches_encoding(tmp_path: Path):
+    texts = {
+        "d1": "The quick brown fox jumps over the lazy dog",
+        "d2": "naïve café — 日本語 fox 🙂 end",
+    }
+    docs = _write_docs(tmp_path / "docs.parquet", list(texts.items()))
+    for store in (DocStore.open(docs), DocStore.from_frame(pl.read_parquet(docs))):
+        for doc_id, text in texts.items():
+            for byte_offset in range(len(text.encode()) + 1):
+                assert store.context_window(
+                    doc_id, byte_offset, "fox", 5
+                ) == context_window(text, byte_offset, "fox", 5)
+
+
+def test_open_partitioned_corpus_rebuilds_after_append(tmp_path: Path):
+    docs = tmp_path / "docs.parquet"
+    append_docs([Doc(doc_id="a", text="alpha")], docs)
+    assert DocStore.open(docs).text("a") == "alpha"
+    append_docs([Doc(doc_id="b", text="beta")], docs)
+    store = DocStore.open(docs)
+    assert store.text("a") == "alpha"
+    assert store.text("b") == "beta"
+
+
+def test_concurrent_opens_build_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    docs = _write_docs(tmp_path / "docs.parquet", [("a", "alpha")])
+    build = DocStore.build
+    builds = []
+
+    def slow_build(docs_path: Path, path: Path) -> None:
+        builds.append(docs_path)
+        time.sleep(0.2)
+        build(docs_path, path)
+
+    monkeypatch.setattr(DocStore, "build", staticmethod(slow_build))
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        stores = list(pool.map(lambda _: DocStore.open(docs), range(4)))
+    assert len(builds) == 1
+    assert all(store.text("a") == "alpha" for store in stores)
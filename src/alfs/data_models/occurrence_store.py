@@ -1,12 +1,16 @@
 """SQLite-backed store for labeled occurrence data (WAL mode)."""
 
-from collections.abc import Iterable
+from collections.abc import Generator, Iterable, Iterator, Mapping, Sequence
 import contextlib
+from contextlib import contextmanager
 import json
 from pathlib import Path
+import queue
 import sqlite3
 
 import polars as pl
+from polars.io.plugins import register_io_source
+import pyarrow as pa  # type: ignore[import-untyped]
 
 _SCHEMA = {
     "form": pl.String,
@@ -21,6 +25,20 @@ _SCHEMA = {
     "last_critic_model": pl.String,  # FK-resolved name of model used for critic review
 }
 
+# SQL expression for each exported column; model names are resolved via joins.
+_COLUMN_SQL = {
+    "form": "l.form",
+    "doc_id": "l.doc_id",
+    "byte_offset": "l.byte_offset",
+    "sense_key": "l.sense_key",
+    "rating": "l.rating",
+    "model": "m.name",
+    "updated_at": "l.updated_at",
+    "synonyms": "l.synonyms",
+    "last_critic_date": "l.last_critic_date",
+    "last_critic_model": "mc.name",
+}
+
 _COUNT_SCHEMA = {
     "form": pl.String,
     "n_total": pl.Int64,
@@ -28,9 +46,165 @@ _COUNT_SCHEMA = {
     "n_excellent": pl.Int64,
 }
 
+_SENSE_COUNT_SCHEMA = {
+    "form": pl.String,
+    "sense_key": pl.String,
+    "n_total": pl.Int64,
+    "n_bad": pl.Int64,
+    "n_excellent": pl.Int64,
+}
+
+# Secondary indexes: (form, sense_key) serves delete_by_sense_id, (form, rating)
+# covers the per-form aggregate that rebuilds form_counts, and last_critic_date
+# serves critic selection.
+_INDEXES = {
+    "labeled_form_sense": "labeled (form, sense_key)",
+    "labeled_form_rating": "labeled (form, rating)",
+    "labeled_critic": "labeled (last_critic_date, rating)",
+}
+
+_COUNT_BY_FORM_SQL = (
+    "SELECT form, COUNT(*) as n_total, "
+    "SUM(CASE WHEN rating = 0 THEN 1 ELSE 0 END) as n_bad, "
+    "SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END) as n_excellent "
+    "FROM labeled GROUP BY form"
+)
+
+_COUNT_BY_SENSE_SQL = (
+    "SELECT form, sense_key, COUNT(*) as n_total, "
+    "SUM(CASE WHEN rating = 0 THEN 1 ELSE 0 END) as n_bad, "
+    "SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END) as n_excellent "
+    "FROM labeled GROUP BY form, sense_key"
+)
+
+_DELETE_BY_SENSE_SQL = "DELETE FROM labeled WHERE form = ? AND sense_key = ?"
+
+# form_counts / sense_counts are materialized aggregates of labeled, kept
+# current by the triggers below so count_by_form() is O(forms), not O(labels).
+# Rows are created with INSERT ... WHERE NOT EXISTS because an OR IGNORE inside
+# a trigger is overridden by the outer statement's conflict policy.
+_COUNT_TABLES = (
+    "CREATE TABLE IF NOT EXISTS form_counts ("
+    "form        TEXT    PRIMARY KEY, "
+    "n_total     INTEGER NOT NULL DEFAULT 0, "
+    "n_bad       INTEGER NOT NULL DEFAULT 0, "
+    "n_excellent INTEGER NOT NULL DEFAULT 0"
+    ") WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS sense_counts ("
+    "form        TEXT    NOT NULL, "
+    "sense_key   TEXT    NOT NULL, "
+    "n_total     INTEGER NOT NULL DEFAULT 0, "
+    "n_bad       INTEGER NOT NULL DEFAULT 0, "
+    "n_excellent INTEGER NOT NULL DEFAULT 0, "
+    "PRIMARY KEY (form, sense_key)"
+    ") WITHOUT ROWID",
+)
+
+_ADD_COUNTS = (
+    "INSERT INTO form_counts (form) SELECT NEW.form WHERE NOT EXISTS "
+    "(SELECT 1 FROM form_counts WHERE form = NEW.form); "
+    "UPDATE form_counts SET n_total = n_total + 1, "
+    "n_bad = n_bad + (NEW.rating = 0), n_excellent = n_excellent + (NEW.rating = 2) "
+    "WHERE form = NEW.form; "
+    "INSERT INTO sense_counts (form, sense_key) SELECT NEW.form, NEW.sense_key "
+    "WHERE NOT EXISTS (SELECT 1 FROM sense_counts "
+    "WHERE form = NEW.form AND sense_key = NEW.sense_key); "
+    "UPDATE sense_counts SET n_total = n_total + 1, "
+    "n_bad = n_bad + (NEW.rating = 0), n_excellent = n_excellent + (NEW.rating = 2) "
+    "WHERE form = NEW.form AND sense_key = NEW.sense_key; "
+)
+
+_SUBTRACT_COUNTS = (
+    "UPDATE form_counts SET n_total = n_total - 1, "
+    "n_bad = n_bad - (OLD.rating = 0), n_excellent = n_excellent - (OLD.rating = 2) "
+    "WHERE form = OLD.form; "
+    "DELETE FROM form_counts WHERE form = OLD.form AND n_total = 0; "
+    "UPDATE sense_counts SET n_total = n_total - 1, "
+    "n_bad = n_bad - (OLD.rating = 0), n_excellent = n_excellent - (OLD.rating = 2) "
+    "WHERE form = OLD.form AND sense_key = OLD.sense_key; "
+    "DELETE FROM sense_counts "
+    "WHERE form = OLD.form AND sense_key = OLD.sense_key AND n_total = 0; "
+)
+
+_COUNT_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS labeled_counts_insert AFTER INSERT ON labeled "
+    f"BEGIN {_ADD_COUNTS}END",
+    "CREATE TRIGGER IF NOT EXISTS labeled_counts_delete AFTER DELETE ON labeled "
+    f"BEGIN {_SUBTRACT_COUNTS}END",
+    "CREATE TRIGGER IF NOT EXISTS labeled_counts_update "
+    "AFTER UPDATE OF form, sense_key, rating ON labeled "
+    f"BEGIN {_SUBTRACT_COUNTS}{_ADD_COUNTS}END",
+)
+
+# Applied once per pooled connection; unpooled connections keep SQLite defaults.
+_POOL_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA cache_size=-65536",  # 64 MiB (negative = KiB)
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class _ConnectionPool:
+    """Bounded pool of tuned, reusable connections shared across threads.
+
+    Each thread checks out a connection for the duration of one store call, so
+    a connection is never used by two threads at once.  Connections are created
+    lazily; at most ``size`` idle connections are retained between calls, and
+    extras are closed on release.  Reusing connections keeps sqlite3's
+    per-connection statement cache warm across calls.
+    """
+
+    def __init__(self, db_path: Path, size: int, cached_statements: int) -> None:
+        self._db_path = db_path
+        self._cached_statements = cached_statements
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=size)
+
+    def _open(self) -> sqlite3.Connection:
+        con = sqlite3.connect(
+            self._db_path,
+            timeout=30,
+            check_same_thread=False,
+            cached_statements=self._cached_statements,
+        )
+        con.execute("PRAGMA journal_mode=WAL")
+        for pragma in _POOL_PRAGMAS:
+            con.execute(pragma)
+        return con
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def release(self, con: sqlite3.Connection) -> None:
+        if con.in_transaction:
+            con.rollback()
+        try:
+            self._idle.put_nowait(con)
+        except queue.Full:
+            con.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
 
 class OccurrenceStore:
-    def __init__(self, db_path: Path) -> None:
+    def __init__(
+        self, db_path: Path, pool_size: int = 0, cached_statements: int = 128
+    ) -> None:
+        """Open (and migrate) labeled.db.
+
+        pool_size > 0 opts in to a pool of persistent connections with tuned
+        pragmas (see _POOL_PRAGMAS), worthwhile for long-lived multi-threaded
+        callers such as the clerk worker.  The default opens a fresh connection
+        per call.
+        """
         self._db_path = db_path
         db_path.parent.mkdir(parents=True, exist_ok=True)
         with sqlite3.connect(db_path, timeout=30) as con:
@@ -66,12 +240,76 @@ class OccurrenceStore:
                     "ALTER TABLE labeled ADD COLUMN"
                     " last_critic_model_id INTEGER REFERENCES models(id)"
                 )
+            existing_indexes = {
+                row[0]
+                for row in con.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                ).fetchall()
+            }
+            missing = {k: v for k, v in _INDEXES.items() if k not in existing_indexes}
+            for name, target in missing.items():
+                con.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+            if missing:
+                # One-off full scan so the planner has stats for the new indexes.
+                con.execute("ANALYZE labeled")
             con.commit()
+            has_counts = con.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'form_counts'"
+            ).fetchone()
+            if not has_counts:
+                con.execute("BEGIN IMMEDIATE")
+                for ddl in _COUNT_TABLES + _COUNT_TRIGGERS:
+                    con.execute(ddl)
+                self._rebuild_counts(con)
+                con.commit()
+        self._pool = (
+            _ConnectionPool(db_path, pool_size, cached_statements)
+            if pool_size > 0
+            else None
+        )
 
-    def _connect(self) -> sqlite3.Connection:
-        con = sqlite3.connect(self._db_path, timeout=30)
-        con.execute("PRAGMA journal_mode=WAL")
-        return con
+    @contextmanager
+    def _connect(self) -> Generator[sqlite3.Connection]:
+        if self._pool is None:
+            # Never shared, but a streaming scan may be resumed from another
+            # thread by the Polars engine.
+            con = sqlite3.connect(self._db_path, timeout=30, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            try:
+                with con:
+                    yield con
+            finally:
+                con.close()
+        else:
+            con = self._pool.acquire()
+            try:
+                with con:
+                    yield con
+            finally:
+                self._pool.release(con)
+
+    def close(self) -> None:
+        """Close idle pooled connections (no-op when pooling is disabled)."""
+        if self._pool is not None:
+            self._pool.close()
+
+    @staticmethod
+    def _rebuild_counts(con: sqlite3.Connection) -> None:
+        con.execute("DELETE FROM form_counts")
+        con.execute("DELETE FROM sense_counts")
+        con.execute(f"INSERT INTO form_counts {_COUNT_BY_FORM_SQL}")
+        con.execute(f"INSERT INTO sense_counts {_COUNT_BY_SENSE_SQL}")
+
+    def rebuild_counts(self) -> None:
+        """Recompute form_counts/sense_counts from scratch with a full scan.
+
+        Only needed if labeled was modified with the triggers bypassed (e.g. by
+        hand with an older schema); tables created on open are already populated.
+        """
+        with self._connect() as con:
+            con.execute("BEGIN IMMEDIATE")
+            self._rebuild_counts(con)
+            con.commit()
 
     def _get_or_create_model_id(self, con: sqlite3.Connection, model: str) -> int:
         con.execute("INSERT OR IGNORE INTO models (name) VALUES (?)", (model,))
@@ -85,11 +323,19 @@ class OccurrenceStore:
     ) -> None:
         with self._connect() as con:
             model_id = self._get_or_create_model_id(con, model)
+            # ON CONFLICT DO UPDATE rather than INSERT OR REPLACE: REPLACE's
+            # implicit delete skips delete triggers and would double-count
+            # form_counts. The critic stamp is reset, as a replace would do.
             con.executemany(
-                "INSERT OR REPLACE INTO labeled "
+                "INSERT INTO labeled "
                 "(form, doc_id, byte_offset, sense_key, rating, model_id, updated_at,"
                 " synonyms) "
-                "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?)",
+                "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?) "
+                "ON CONFLICT (form, doc_id, byte_offset) DO UPDATE SET "
+                "sense_key = excluded.sense_key, rating = excluded.rating, "
+                "model_id = excluded.model_id, updated_at = excluded.updated_at, "
+                "synonyms = excluded.synonyms, "
+                "last_critic_date = NULL, last_critic_model_id = NULL",
                 (
                     (
                         f,
@@ -121,27 +367,130 @@ class OccurrenceStore:
             return pl.DataFrame(schema=_SCHEMA)
         return pl.DataFrame(rows, schema=_SCHEMA, orient="row")
 
-    def to_polars(self) -> pl.DataFrame:
+    def _iter_frames(
+        self,
+        columns: Sequence[str] | None,
+        where: Mapping[str, Iterable[object]] | None,
+        batch_size: int,
+    ) -> Iterator[pl.DataFrame]:
+        columns = list(_SCHEMA) if columns is None else list(columns)
+        filters = dict(where or {})
+        unknown = (set(columns) | set(filters)) - set(_SCHEMA)
+        if unknown:
+            raise ValueError(f"Unknown labeled columns: {sorted(unknown)}")
+
+        clauses: list[str] = []
+        params: list[object] = []
+        for col, values in filters.items():
+            values = list(values)
+            non_null = [v for v in values if v is not None]
+            # json_each keeps the statement to one bound parameter per filter,
+            # however long the value list.
+            alternatives = [f"{_COLUMN_SQL[col]} IN (SELECT value FROM json_each(?))"]
+            params.append(json.dumps(non_null))
+            if len(non_null) < len(values):
+                alternatives.append(f"{_COLUMN_SQL[col]} IS NULL")
+            clauses.append("(" + " OR ".join(alternatives) + ")")
+
+        referenced = set(columns) | set(filters)
+        sql = (
+            "SELECT "
+            + ", ".join(_COLUMN_SQL[c] for c in columns)
+            + " FROM labeled l"
+            + (
+                " LEFT JOIN models m ON l.model_id = m.id"
+                if "model" in referenced
+                else ""
+            )
+            + (
+                " LEFT JOIN models mc ON l.last_critic_model_id = mc.id"
+                if "last_critic_model" in referenced
+                else ""
+            )
+            + (" WHERE " + " AND ".join(clauses) if clauses else "")
+        )
+        schema = {c: _SCHEMA[c] for c in columns}
         with self._connect() as con:
-            rows = con.execute(
-                "SELECT l.form, l.doc_id, l.byte_offset, l.sense_key, l.rating, "
-                "m.name as model, l.updated_at, l.synonyms, "
-                "l.last_critic_date, mc.name as last_critic_model "
-                "FROM labeled l "
-                "LEFT JOIN models m ON l.model_id = m.id "
-                "LEFT JOIN models mc ON l.last_critic_model_id = mc.id"
-            ).fetchall()
-        if not rows:
-            return pl.DataFrame(schema=_SCHEMA)
-        return pl.DataFrame(rows, schema=_SCHEMA, orient="row")
+            cur = con.execute(sql, params)
+            # Only one batch of row tuples is alive at a time; each is transposed
+            # straight into typed columns.
+            while rows := cur.fetchmany(batch_size):
+                yield pl.DataFrame(
+                    dict(zip(columns, zip(*rows, strict=True), strict=True)),
+                    schema=schema,
+                )
+
+    def iter_batches(
+        self,
+        columns: Sequence[str] | None = None,
+        where: Mapping[str, Iterable[object]] | None = None,
+        batch_size: int = 65_536,
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream labeled rows as Arrow record batches of at most batch_size rows.
+
+        columns: subset of _SCHEMA to read (default: all).
+        where: {column: allowed values}, ANDed together and evaluated in SQL as
+            IN filters; a None among the values also matches NULL.
+
+        Peak memory is bounded by batch_size rather than by the table size.
+        """
+        for frame in self._iter_frames(columns, where, batch_size):
+            yield from frame.to_arrow().to_batches()
+
+    def scan(
+        self,
+        columns: Sequence[str] | None = None,
+        where: Mapping[str, Iterable[object]] | None = None,
+    ) -> pl.LazyFrame:
+        """Lazily scan labeled; nothing is read until the frame is collected.
+
+        columns/where are pushed down into SQL as in iter_batches. Polars'
+        own projection pushdown narrows the SELECT further; other predicates and
+        row limits are applied batch by batch as rows stream in.
+        """
+        columns = list(_SCHEMA) if columns is None else list(columns)
+        where = {col: list(values) for col, values in (where or {}).items()}
+
+        def source(
+            with_columns: list[str] | None,
+            predicate: pl.Expr | None,
+            n_rows: int | None,
+            batch_size: int | None,
+        ) -> Iterator[pl.DataFrame]:
+            wanted = columns if with_columns is None else with_columns
+            read = list(wanted)
+            if predicate is not None:
+                read += [c for c in predicate.meta.root_names() if c not in read]
+            for frame in self._iter_frames(read, where, batch_size or 65_536):
+                if predicate is not None:
+                    frame = frame.filter(predicate)
+                if n_rows is not None:
+                    frame = frame.head(n_rows)
+                    n_rows -= frame.height
+                yield frame.select(wanted)
+                if n_rows == 0:
+                    return
+
+        return register_io_source(
+            source, schema={c: _SCHEMA[c] for c in columns}, is_pure=True
+        )
+
+    def to_polars(
+        self,
+        columns: Sequence[str] | None = None,
+        where: Mapping[str, Iterable[object]] | None = None,
+    ) -> pl.DataFrame:
+        """Return labeled rows as a DataFrame; see iter_batches for arguments."""
+        frames = list(self._iter_frames(columns, where, batch_size=65_536))
+        if not frames:
+            columns = list(_SCHEMA) if columns is None else list(columns)
+            return pl.DataFrame(schema={c: _SCHEMA[c] for c in columns})
+        return pl.concat(frames)
 
     def delete_by_sense_id(self, form: str, sense_id: str) -> None:
         """Delete all occurrences for a sense."""
         with self._connect() as con:
-            con.execute(
-                "DELETE FROM labeled WHERE form = ? AND sense_key = ?",
-                (form, sense_id),
-            )
+            con.execute(_DELETE_BY_SENSE_SQL, (form, sense_id))
             con.commit()
 
     def delete_by_form(self, form: str) -> None:
@@ -181,11 +530,18 @@ class OccurrenceStore:
     def count_by_form(self) -> pl.DataFrame:
         with self._connect() as con:
             rows = con.execute(
-                "SELECT form, COUNT(*) as n_total, "
-                "SUM(CASE WHEN rating = 0 THEN 1 ELSE 0 END) as n_bad, "
-                "SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END) as n_excellent "
-                "FROM labeled GROUP BY form"
+                "SELECT form, n_total, n_bad, n_excellent FROM form_counts"
             ).fetchall()
         if not rows:
             return pl.DataFrame(schema=_COUNT_SCHEMA)
         return pl.DataFrame(rows, schema=_COUNT_SCHEMA, orient="row")
+
+    def count_by_sense(self) -> pl.DataFrame:
+        """Per-(form, sense_key) label counts, read from sense_counts."""
+        with self._connect() as con:
+            rows = con.execute(
+                "SELECT form, sense_key, n_total, n_bad, n_excellent FROM sense_counts"
+            ).fetchall()
+        if not rows:
+            return pl.DataFrame(schema=_SENSE_COUNT_SCHEMA)
+        return pl.DataFrame(rows, schema=_SENSE_COUNT_SCHEMA, orient="row")
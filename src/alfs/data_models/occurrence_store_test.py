@@ -1,9 +1,16 @@
 from pathlib import Path
+import sqlite3
+import threading
 
 import polars as pl
 import pytest
 
-from alfs.data_models.occurrence_store import OccurrenceStore
+from alfs.data_models.occurrence_store import (
+    _COUNT_BY_FORM_SQL,
+    _COUNT_BY_SENSE_SQL,
+    _DELETE_BY_SENSE_SQL,
+    OccurrenceStore,
+)
 
 
 @pytest.fixture
@@ -188,3 +195,289 @@ def test_upsert_synonyms_round_trip(store: OccurrenceStore) -> None:
     assert json.loads(df["synonyms"][0]) == ["sprint", "dash"]
     assert json.loads(df["synonyms"][1]) == []
     assert df["synonyms"][2] is None
+
+
+@pytest.fixture
+def pooled_store(tmp_path: Path) -> OccurrenceStore:
+    return OccurrenceStore(tmp_path / "labeled.db", pool_size=2)
+
+
+def test_pooled_round_trip(pooled_store: OccurrenceStore) -> None:
+    pooled_store.upsert_many(
+        [("run", "doc1", 0, "1", 2, None), ("run", "doc1", 10, "1", 0, None)],
+        model="test-model",
+    )
+    pooled_store.mark_critic_reviewed(
+        reviewed=[("run", "doc1", 0)],
+        timestamp="2026-04-06T12:00:00Z",
+        model="critic-model",
+    )
+    df = pooled_store.query_form("run").sort("byte_offset")
+    assert df["last_critic_model"][0] == "critic-model"
+    counts = pooled_store.count_by_form().row(0, named=True)
+    assert counts == {"form": "run", "n_total": 2, "n_bad": 1, "n_excellent": 1}
+
+
+def test_pooled_reuses_connection(pooled_store: OccurrenceStore) -> None:
+    with pooled_store._connect() as con:
+        first = con
+    with pooled_store._connect() as con:
+        assert con is first
+        assert con.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_pooled_rollback_on_error(pooled_store: OccurrenceStore) -> None:
+    with pytest.raises(sqlite3.IntegrityError):
+        pooled_store.upsert_many(
+            [("run", "doc1", 0, "1", 2, None), ("run", "doc1", 10, "1", 7, None)],
+            model="test-model",
+        )
+    assert len(pooled_store.query_form("run")) == 0
+
+
+def test_pooled_concurrent_upserts(pooled_store: OccurrenceStore) -> None:
+    def work(i: int) -> None:
+        for j in range(20):
+            pooled_store.upsert_many(
+                [(f"form{i}", "doc1", j, "1", 1, None)], model="test-model"
+            )
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(pooled_store.to_polars()) == 120
+    pooled_store.close()
+
+
+def _query_plan(db_path: Path, sql: str, params: tuple = ()) -> str:
+    con = sqlite3.connect(db_path)
+    try:
+        rows = con.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    finally:
+        con.close()
+    return "\n".join(r[3] for r in rows)
+
+
+def test_count_by_form_uses_covering_index(tmp_path: Path) -> None:
+    OccurrenceStore(tmp_path / "labeled.db")
+    plan = _query_plan(tmp_path / "labeled.db", _COUNT_BY_FORM_SQL)
+    assert "USING COVERING INDEX labeled_form_rating" in plan
+
+
+def test_delete_by_sense_id_uses_index(tmp_path: Path) -> None:
+    OccurrenceStore(tmp_path / "labeled.db")
+    plan = _query_plan(tmp_path / "labeled.db", _DELETE_BY_SENSE_SQL, ("run", "1"))
+    assert "INDEX labeled_form_sense (form=? AND sense_key=?)" in plan
+
+
+def test_critic_date_lookup_uses_index(tmp_path: Path) -> None:
+    OccurrenceStore(tmp_path / "labeled.db")
+    plan = _query_plan(
+        tmp_path / "labeled.db",
+        "SELECT form FROM labeled WHERE last_critic_date < ?",
+        ("2026-01-01",),
+    )
+    assert "INDEX labeled_critic" in plan
+
+
+def test_indexes_added_to_existing_db(tmp_path: Path) -> None:
+    """Databases created before the indexes existed are migrated on open."""
+    db_path = tmp_path / "labeled.db"
+    OccurrenceStore(db_path)
+    con = sqlite3.connect(db_path)
+    for name in ("labeled_form_sense", "labeled_form_rating", "labeled_critic"):
+        con.execute(f"DROP INDEX {name}")
+    con.commit()
+    con.close()
+
+    OccurrenceStore(db_path)
+    con = sqlite3.connect(db_path)
+    names = {
+        r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    }
+    has_stats = con.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()[0]
+    con.close()
+    assert {"labeled_form_sense", "labeled_form_rating", "labeled_critic"} <= names
+    assert has_stats == 1
+
+
+def _aggregate_counts(db_path: Path) -> tuple[list, list]:
+    con = sqlite3.connect(db_path)
+    try:
+        by_form = con.execute(f"{_COUNT_BY_FORM_SQL} ORDER BY form").fetchall()
+        by_sense = con.execute(
+            f"{_COUNT_BY_SENSE_SQL} ORDER BY form, sense_key"
+        ).fetchall()
+    finally:
+        con.close()
+    return by_form, by_sense
+
+
+def _materialized_counts(store: OccurrenceStore) -> tuple[list, list]:
+    by_form = store.count_by_form().sort("form").rows()
+    by_sense = store.count_by_sense().sort(["form", "sense_key"]).rows()
+    return by_form, by_sense
+
+
+def test_form_counts_track_every_write_path(tmp_path: Path) -> None:
+    db_path = tmp_path / "labeled.db"
+    store = OccurrenceStore(db_path)
+    store.upsert_many(
+        [
+            ("run", "doc1", 0, "a", 2, None),
+            ("run", "doc1", 10, "a", 1, None),
+            ("run", "doc1", 20, "b", 0, None),
+            ("walk", "doc2", 0, "c", 2, None),
+        ],
+        model="test-model",
+    )
+    assert _materialized_counts(store) == _aggregate_counts(db_path)
+
+    # Re-upsert same PK with a different sense and rating
+    store.upsert_many([("run", "doc1", 0, "b", 0, None)], model="test-model")
+    assert _materialized_counts(store) == _aggregate_counts(db_path)
+
+    store.mark_critic_reviewed(
+        reviewed=[("run", "doc1", 10)],
+        timestamp="2026-04-06T12:00:00Z",
+        model="critic-model",
+        bad=[("run", "doc1", 10)],
+    )
+    assert _materialized_counts(store) == _aggregate_counts(db_path)
+
+    store.delete_by_sense_id("run", "b")
+    assert _materialized_counts(store) == _aggregate_counts(db_path)
+
+    store.delete_by_form("walk")
+    by_form, by_sense = _materialized_counts(store)
+    assert (by_form, by_sense) == _aggregate_counts(db_path)
+    assert by_form == [("run", 1, 1, 0)]
+    assert by_sense == [("run", "a", 1, 1, 0)]
+
+
+def test_form_counts_backfilled_for_existing_db(tmp_path: Path) -> None:
+    """Opening a database that predates form_counts populates it from labeled."""
+    db_path = tmp_path / "labeled.db"
+    store = OccurrenceStore(db_path)
+    store.upsert_many(
+        [("run", "doc1", 0, "a", 2, None), ("run", "doc1", 10, "a", 0, None)],
+        model="test-model",
+    )
+    con = sqlite3.connect(db_path)
+    for trigger in ("insert", "delete", "update"):
+        con.execute(f"DROP TRIGGER labeled_counts_{trigger}")
+    con.execute("DROP TABLE form_counts")
+    con.execute("DROP TABLE sense_counts")
+    con.commit()
+    con.close()
+
+    reopened = OccurrenceStore(db_path)
+    assert reopened.count_by_form().rows() == [("run", 2, 1, 1)]
+    reopened.upsert_many([("walk", "doc2", 0, "c", 1, None)], model="test-model")
+    assert _materialized_counts(reopened) == _aggregate_counts(db_path)
+
+
+def test_rebuild_counts(store: OccurrenceStore, tmp_path: Path) -> None:
+    store.upsert_many([("run", "doc1", 0, "a", 2, None)], model="test-model")
+    con = sqlite3.connect(tmp_path / "labeled.db")
+    con.execute("UPDATE form_counts SET n_total = 99")
+    con.commit()
+    con.close()
+    store.rebuild_counts()
+    assert store.count_by_form().rows() == [("run", 1, 0, 1)]
+
+
+def test_to_polars_projection_and_filters(store: OccurrenceStore) -> None:
+    store.upsert_many(
+        [
+            ("run", "doc1", 0, "1", 2, None),
+            ("run", "doc1", 10, "1", 0, None),
+            ("walk", "doc2", 0, "1", 1, None),
+            ("talk", "doc3", 0, "1", 1, None),
+        ],
+        model="test-model",
+    )
+    df = store.to_polars(
+        columns=["form", "byte_offset", "model"],
+        where={"rating": [1, 2], "form": ["run", "walk"]},
+    )
+    assert df.schema == {
+        "form": pl.String,
+        "byte_offset": pl.Int64,
+        "model": pl.String,
+    }
+    assert sorted(df.rows()) == [
+        ("run", 0, "test-model"),
+        ("walk", 0, "test-model"),
+    ]
+
+
+def test_to_polars_filter_none_matches_null(store: OccurrenceStore) -> None:
+    store.upsert_many(
+        [("run", "doc1", 0, "1", 2, None), ("run", "doc1", 10, "1", 2, None)],
+        model="test-model",
+    )
+    store.mark_critic_reviewed(
+        reviewed=[("run", "doc1", 0)],
+        timestamp="2026-04-06T12:00:00Z",
+        model="critic-model",
+    )
+    never = store.to_polars(["byte_offset"], where={"last_critic_date": [None]})
+    assert never["byte_offset"].to_list() == [10]
+    by_critic = store.to_polars(
+        ["byte_offset"], where={"last_critic_model": ["critic-model"]}
+    )
+    assert by_critic["byte_offset"].to_list() == [0]
+
+
+def test_to_polars_empty_projection_keeps_schema(store: OccurrenceStore) -> None:
+    df = store.to_polars(columns=["form", "rating"], where={"form": ["nope"]})
+    assert len(df) == 0
+    assert df.schema == {"form": pl.String, "rating": pl.Int64}
+
+
+def test_iter_batches_respects_batch_size(store: OccurrenceStore) -> None:
+    store.upsert_many(
+        [("run", "doc1", i, "1", 1, None) for i in range(25)], model="test-model"
+    )
+    batches = list(store.iter_batches(["byte_offset"], batch_size=10))
+    assert [b.num_rows for b in batches] == [10, 10, 5]
+
+
+def test_to_polars_unknown_column_raises(store: OccurrenceStore) -> None:
+    with pytest.raises(ValueError, match="Unknown labeled columns"):
+        store.to_polars(columns=["form", "bogus"])
+
+
+def test_scan_is_lazy_and_pushes_down(store: OccurrenceStore) -> None:
+    store.upsert_many(
+        [
+            ("run", "doc1", 0, "1", 2, None),
+            ("run", "doc1", 10, "2", 0, None),
+            ("walk", "doc2", 0, "1", 1, None),
+        ],
+        model="test-model",
+    )
+    lf = store.scan(
+        columns=["form", "byte_offset", "sense_key"], where={"rating": [1, 2]}
+    )
+    assert isinstance(lf, pl.LazyFrame)
+    store.upsert_many([("talk", "doc3", 0, "1", 2, None)], model="test-model")
+    df = lf.filter(pl.col("sense_key") == "1").select("form").collect()
+    assert sorted(df["form"].to_list()) == ["run", "talk", "walk"]
+    assert lf.collect_schema() == {
+        "form": pl.String,
+        "byte_offset": pl.Int64,
+        "sense_key": pl.String,
+    }
+
+
+def test_scan_head(store: OccurrenceStore) -> None:
+    store.upsert_many(
+        [("run", "doc1", i, "1", 1, None) for i in range(10)], model="test-model"
+    )
+    assert store.scan(columns=["byte_offset"]).head(3).collect().height == 3
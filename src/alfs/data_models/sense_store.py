@@ -1,17 +1,79 @@
 """SQLite-backed store for Alf sense entries."""
 
-from collections import defaultdict
-from collections.abc import Callable, Generator
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Generator, Iterable, Mapping
 from contextlib import contextmanager
+import json
 from pathlib import Path
 import sqlite3
+import threading
+from typing import cast
 
 from alfs.data_models.alf import Alf, Sense
 from alfs.data_models.pos import PartOfSpeech
 
 
+class _ReadCache:
+    """Bounded LRU of read results, dropped wholesale when the database changes.
+
+    Staleness is detected with PRAGMA data_version on a dedicated connection,
+    which changes whenever any other connection commits — including the clerk
+    worker in another process and this store's own write connections.  A
+    result is only cached if no commit happened while it was being read.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], object] = OrderedDict()
+        self._lock = threading.Lock()
+        self._probe = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._version = self._probe.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync(self) -> int:
+        version = self._probe.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        return version
+
+    def get(self, key: tuple[str, str]) -> tuple[bool, object, int]:
+        """Return (hit, value, version); pass version back to put()."""
+        with self._lock:
+            version = self._sync()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return True, self._entries[key], version
+            return False, None, version
+
+    def put(self, key: tuple[str, str], value: object, version: int) -> None:
+        with self._lock:
+            if self._sync() != version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *forms: str) -> None:
+        with self._lock:
+            for form in forms:
+                self._entries.pop(("form", form), None)
+                self._entries.pop(("lower", form.lower()), None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._probe.close()
+
+
 class SenseStore:
-    def __init__(self, db_path: Path) -> None:
+    def __init__(self, db_path: Path, cache_size: int = 0) -> None:
+        """Open (and migrate) senses.db.
+
+        cache_size > 0 enables an in-process LRU of up to that many entries for
+        read, read_many and read_case_variants.  Cached Alf objects are shared
+        between callers and must not be mutated in place.
+        """
         self._db_path = db_path
         db_path.parent.mkdir(parents=True, exist_ok=True)
         with self._connect() as con:
@@ -29,6 +91,21 @@ class SenseStore:
                 con.execute("ALTER TABLE wordforms ADD COLUMN spelling_variant_of TEXT")
             if "redirect" in existing_cols:
                 con.execute("ALTER TABLE wordforms DROP COLUMN redirect")
+            # form_lower is filled in Python: SQLite's lower() only folds ASCII.
+            if "form_lower" not in existing_cols:
+                con.execute("ALTER TABLE wordforms ADD COLUMN form_lower TEXT")
+            unfilled = con.execute(
+                "SELECT form FROM wordforms WHERE form_lower IS NULL"
+            ).fetchall()
+            if unfilled:
+                con.executemany(
+                    "UPDATE wordforms SET form_lower = ? WHERE form = ?",
+                    [(r[0].lower(), r[0]) for r in unfilled],
+                )
+            con.execute(
+                "CREATE INDEX IF NOT EXISTS wordforms_form_lower"
+                " ON wordforms (form_lower)"
+            )
             con.execute(
                 "CREATE TABLE IF NOT EXISTS senses ("
                 "id TEXT PRIMARY KEY, "
@@ -49,6 +126,12 @@ class SenseStore:
             if "subsenses" in existing_sense_cols:
                 con.execute("ALTER TABLE senses DROP COLUMN subsenses")
             con.commit()
+        self._cache = _ReadCache(db_path, cache_size) if cache_size > 0 else None
+
+    def close(self) -> None:
+        """Close the read cache's probe connection (no-op without a cache)."""
+        if self._cache is not None:
+            self._cache.close()
 
     @contextmanager
     def _connect(self) -> Generator[sqlite3.Connection]:
@@ -64,41 +147,58 @@ class SenseStore:
             con.close()
 
     def _assemble(self, con: sqlite3.Connection, form: str) -> Alf | None:
-        wf = con.execute(
-            "SELECT spelling_variant_of FROM wordforms WHERE form = ?",
-            (form,),
-        ).fetchone()
-        if wf is None:
-            return None
-        rows = con.execute(
-            "SELECT id, definition, pos, morph_base, morph_relation,"
+        return self._assemble_many(con, [form]).get(form)
+
+    def _assemble_many(
+        self, con: sqlite3.Connection, forms: Iterable[str]
+    ) -> dict[str, Alf]:
+        """Build entries for forms with one query per table; missing forms omitted."""
+        forms_json = json.dumps(list(dict.fromkeys(forms)))
+        wf_rows = con.execute(
+            "SELECT form, spelling_variant_of FROM wordforms"
+            " WHERE form IN (SELECT value FROM json_each(?)) ORDER BY rowid",
+            (forms_json,),
+        ).fetchall()
+        if not wf_rows:
+            return {}
+        sense_rows = con.execute(
+            "SELECT form, id, definition, pos, morph_base, morph_relation,"
             " updated_by_model, updated_at"
-            " FROM senses WHERE form = ? ORDER BY position",
-            (form,),
+            " FROM senses WHERE form IN (SELECT value FROM json_each(?))"
+            " ORDER BY form, position",
+            (forms_json,),
         ).fetchall()
-        senses = [
-            Sense(
-                id=r[0],
-                definition=r[1],
-                pos=PartOfSpeech(r[2]) if r[2] else None,
-                morph_base=r[3],
-                morph_relation=r[4],
-                updated_by_model=r[5],
-                updated_at=r[6],
+        senses_by_form: dict[str, list[Sense]] = defaultdict(list)
+        for r in sense_rows:
+            senses_by_form[r[0]].append(
+                Sense(
+                    id=r[1],
+                    definition=r[2],
+                    pos=PartOfSpeech(r[3]) if r[3] else None,
+                    morph_base=r[4],
+                    morph_relation=r[5],
+                    updated_by_model=r[6],
+                    updated_at=r[7],
+                )
             )
-            for r in rows
-        ]
-        return Alf(form=form, senses=senses, spelling_variant_of=wf[0])
+        return {
+            form: Alf(
+                form=form,
+                senses=senses_by_form.get(form, []),
+                spelling_variant_of=spelling_variant_of,
+            )
+            for form, spelling_variant_of in wf_rows
+        }
 
     def _write_entry(self, con: sqlite3.Connection, entry: Alf) -> None:
         """Write entry within an already-open transaction."""
         con.execute(
-            "INSERT INTO wordforms (form, spelling_variant_of, updated_at)"
-            " VALUES (?, ?, CURRENT_TIMESTAMP)"
+            "INSERT INTO wordforms (form, spelling_variant_of, updated_at, form_lower)"
+            " VALUES (?, ?, CURRENT_TIMESTAMP, ?)"
             " ON CONFLICT(form) DO UPDATE SET"
             " spelling_variant_of=excluded.spelling_variant_of,"
             " updated_at=CURRENT_TIMESTAMP",
-            (entry.form, entry.spelling_variant_of),
+            (entry.form, entry.spelling_variant_of, entry.form.lower()),
         )
         existing = {
             r[0]: r[1:]
@@ -116,6 +216,10 @@ class SenseStore:
             con.executemany(
                 "DELETE FROM senses WHERE id = ?", [(sid,) for sid in removed]
             )
+        # Survivors are repositioned before new senses are inserted, so an
+        # insert never lands on a position a survivor still occupies.
+        updates: list[tuple[object, ...]] = []
+        inserts: list[tuple[object, ...]] = []
         for pos_idx, sense in enumerate(entry.senses):
             pos_val = sense.pos.value if sense.pos else None
             if sense.id in existing:
@@ -127,11 +231,7 @@ class SenseStore:
                     sense.morph_relation,
                     sense.updated_by_model,
                 )
-                con.execute(
-                    "UPDATE senses SET form=?, position=?, definition=?, pos=?, "
-                    "morph_base=?, morph_relation=?, updated_by_model=?"
-                    + (", updated_at=CURRENT_TIMESTAMP" if content_changed else "")
-                    + " WHERE id=?",
+                updates.append(
                     (
                         entry.form,
                         pos_idx,
@@ -140,21 +240,12 @@ class SenseStore:
                         sense.morph_base,
                         sense.morph_relation,
                         sense.updated_by_model,
+                        content_changed,
                         sense.id,
-                    ),
+                    )
                 )
             else:
-                con.execute(
-                    "INSERT INTO senses (id, form, position, definition, pos, "
-                    "morph_base, morph_relation, updated_by_model, updated_at) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP) "
-                    "ON CONFLICT(id) DO UPDATE SET "
-                    "form=excluded.form, position=excluded.position, "
-                    "definition=excluded.definition, pos=excluded.pos, "
-                    "morph_base=excluded.morph_base, "
-                    "morph_relation=excluded.morph_relation, "
-                    "updated_by_model=excluded.updated_by_model, "
-                    "updated_at=CURRENT_TIMESTAMP",
+                inserts.append(
                     (
                         sense.id,
                         entry.form,
@@ -164,18 +255,62 @@ class SenseStore:
                         sense.morph_base,
                         sense.morph_relation,
                         sense.updated_by_model,
-                    ),
+                    )
                 )
+        con.executemany(
+            "UPDATE senses SET form=?, position=?, definition=?, pos=?, "
+            "morph_base=?, morph_relation=?, updated_by_model=?, "
+            "updated_at=CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE updated_at END "
+            "WHERE id=?",
+            updates,
+        )
+        con.executemany(
+            "INSERT INTO senses (id, form, position, definition, pos, "
+            "morph_base, morph_relation, updated_by_model, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP) "
+            "ON CONFLICT(id) DO UPDATE SET "
+            "form=excluded.form, position=excluded.position, "
+            "definition=excluded.definition, pos=excluded.pos, "
+            "morph_base=excluded.morph_base, "
+            "morph_relation=excluded.morph_relation, "
+            "updated_by_model=excluded.updated_by_model, "
+            "updated_at=CURRENT_TIMESTAMP",
+            inserts,
+        )
 
     def read(self, form: str) -> Alf | None:
-        with self._connect() as con:
-            return self._assemble(con, form)
+        return self.read_many([form]).get(form)
+
+    def read_many(self, forms: Iterable[str]) -> dict[str, Alf]:
+        """Return {form: Alf} for every form that exists, read in one transaction."""
+        forms = list(dict.fromkeys(forms))
+        if self._cache is None:
+            with self._connect() as con:
+                return self._assemble_many(con, forms)
+        cached: dict[str, Alf | None] = {}
+        misses: list[str] = []
+        version = 0
+        for form in forms:
+            hit, value, version = self._cache.get(("form", form))
+            if hit:
+                cached[form] = cast(Alf | None, value)
+            else:
+                misses.append(form)
+        if misses:
+            with self._connect() as con:
+                fetched = self._assemble_many(con, misses)
+            for form in misses:
+                cached[form] = fetched.get(form)
+                self._cache.put(("form", form), cached[form], version)
+        return {form: alf for form in forms if (alf := cached[form]) is not None}
 
     def write(self, entry: Alf) -> None:
         with self._connect() as con:
             con.execute("BEGIN IMMEDIATE")
             self._write_entry(con, entry)
             con.commit()
+        if self._cache is not None:
+            self._cache.invalidate(entry.form)
 
     def update(self, form: str, fn: Callable[[Alf | None], Alf]) -> None:
         """Read-modify-write under BEGIN IMMEDIATE to prevent write-write races."""
@@ -185,11 +320,44 @@ class SenseStore:
             updated = fn(existing)
             self._write_entry(con, updated)
             con.commit()
+        if self._cache is not None:
+            self._cache.invalidate(form, updated.form)
+
+    def update_many(
+        self, fns: Mapping[str, Callable[[Alf | None], Alf]]
+    ) -> dict[str, Exception]:
+        """Apply update()-style read-modify-write functions in one transaction.
+
+        Each form runs inside its own savepoint: if its fn or write raises, only
+        that form's changes are rolled back and the rest still commit.  Returns
+        {form: exception} for the forms that failed.
+        """
+        failed: dict[str, Exception] = {}
+        written: list[str] = []
+        with self._connect() as con:
+            con.execute("BEGIN IMMEDIATE")
+            for form, fn in fns.items():
+                con.execute("SAVEPOINT update_form")
+                try:
+                    updated = fn(self._assemble(con, form))
+                    self._write_entry(con, updated)
+                except Exception as e:
+                    con.execute("ROLLBACK TO update_form")
+                    failed[form] = e
+                else:
+                    written += [form, updated.form]
+                con.execute("RELEASE update_form")
+            con.commit()
+        if self._cache is not None:
+            self._cache.invalidate(*written)
+        return failed
 
     def delete(self, form: str) -> None:
         with self._connect() as con:
             con.execute("DELETE FROM wordforms WHERE form = ?", (form,))
             con.commit()
+        if self._cache is not None:
+            self._cache.invalidate(form)
 
     def all_forms(self) -> list[str]:
         with self._connect() as con:
@@ -240,16 +408,24 @@ class SenseStore:
 
     def read_case_variants(self, form: str) -> list[Alf]:
         """Return all entries whose form lowercases to the same string as form."""
-        form_lower = form.lower()
+        key = ("lower", form.lower())
+        if self._cache is not None:
+            hit, value, version = self._cache.get(key)
+            if hit:
+                variant_forms = cast(tuple[str, ...], value)
+                entries = self.read_many(variant_forms)
+                return [entries[f] for f in variant_forms if f in entries]
         with self._connect() as con:
-            rows = con.execute("SELECT form FROM wordforms").fetchall()
-        variants = [r[0] for r in rows if r[0].lower() == form_lower]
-        result = []
-        for variant_form in variants:
-            entry = self.read(variant_form)
-            if entry is not None:
-                result.append(entry)
-        return result
+            rows = con.execute(
+                "SELECT form FROM wordforms WHERE form_lower = ? ORDER BY rowid",
+                (form.lower(),),
+            ).fetchall()
+            variants = list(self._assemble_many(con, [r[0] for r in rows]).values())
+        if self._cache is not None:
+            self._cache.put(key, tuple(v.form for v in variants), version)
+            for v in variants:
+                self._cache.put(("form", v.form), v, version)
+        return variants
 
     def sense_id_to_form(self) -> dict[str, str]:
         """Return {sense_id: form} for every sense in the store."""
@@ -1,4 +1,6 @@
+from collections.abc import Iterator
 from pathlib import Path
+import sqlite3
 import threading
 
 import pytest
@@ -86,6 +88,51 @@ def test_update_missing_form(store: SenseStore) -> None:
     assert result.senses[0].definition == "a new entry"
 
 
+def test_update_many(store: SenseStore) -> None:
+    store.write(_alf("run", "to move quickly", "to manage"))
+
+    def reorder(existing: Alf | None) -> Alf:
+        assert existing is not None
+        return Alf(
+            form="run",
+            senses=[Sense(definition="a score")] + list(reversed(existing.senses)),
+        )
+
+    failed = store.update_many(
+        {"run": reorder, "new": lambda existing: _alf("new", "a new entry")}
+    )
+    assert failed == {}
+    run = store.read("run")
+    assert run is not None
+    assert [s.definition for s in run.senses] == [
+        "a score",
+        "to manage",
+        "to move quickly",
+    ]
+    assert store.read("new") is not None
+
+
+def test_update_many_rolls_back_only_failing_form(store: SenseStore) -> None:
+    store.write(_alf("run", "to move quickly"))
+    store.write(_alf("cat", "a feline"))
+
+    def boom(existing: Alf | None) -> Alf:
+        raise ValueError("bad entry")
+
+    failed = store.update_many(
+        {
+            "run": boom,
+            "cat": lambda existing: _alf("cat", "a pet"),
+        }
+    )
+    assert set(failed) == {"run"}
+    assert isinstance(failed["run"], ValueError)
+    run = store.read("run")
+    cat = store.read("cat")
+    assert run is not None and run.senses[0].definition == "to move quickly"
+    assert cat is not None and cat.senses[0].definition == "a pet"
+
+
 def test_max_sense_updated_at_by_form(store: SenseStore) -> None:
     store.write(_alf("cat", "a feline"))
     store.write(_alf("dog", "a canine"))
@@ -142,3 +189,104 @@ def test_concurrent_rmw(tmp_path: Path) -> None:
     result = store.read("word")
     assert result is not None
     assert len(result.senses) == 5
+
+
+def test_read_many(store: SenseStore) -> None:
+    store.write(_alf("cat", "a feline", "to vomit"))
+    store.write(_alf("dog", "a canine"))
+    result = store.read_many(["dog", "cat", "missing", "cat"])
+    assert set(result) == {"cat", "dog"}
+    assert [s.definition for s in result["cat"].senses] == ["a feline", "to vomit"]
+    assert store.read_many([]) == {}
+
+
+def test_read_case_variants(store: SenseStore) -> None:
+    store.write(_alf("pots", "cooking vessels"))
+    store.write(_alf("POTS", "a medical condition"))
+    store.write(_alf("Éclair", "a pastry"))
+    store.write(_alf("pot", "a vessel"))
+    variants = store.read_case_variants("Pots")
+    assert [v.form for v in variants] == ["pots", "POTS"]
+    # Non-ASCII case folding uses Python's lower(), not SQLite's ASCII-only one.
+    assert [v.form for v in store.read_case_variants("éclair")] == ["Éclair"]
+
+
+def test_form_lower_backfilled_for_existing_db(tmp_path: Path) -> None:
+    db_path = tmp_path / "senses.db"
+    SenseStore(db_path).write(_alf("POTS", "a medical condition"))
+    con = sqlite3.connect(db_path)
+    con.execute("DROP INDEX wordforms_form_lower")
+    con.execute("ALTER TABLE wordforms DROP COLUMN form_lower")
+    con.commit()
+    con.close()
+
+    store = SenseStore(db_path)
+    assert [v.form for v in store.read_case_variants("pots")] == ["POTS"]
+
+
+@pytest.fixture
+def cached_store(tmp_path: Path) -> Iterator[SenseStore]:
+    store = SenseStore(tmp_path / "senses.db", cache_size=2)
+    yield store
+    store.close()
+
+
+def test_cache_returns_same_object(cached_store: SenseStore) -> None:
+    cached_store.write(_alf("run", "to move quickly"))
+    first = cached_store.read("run")
+    assert first is not None
+    assert cached_store.read("run") is first
+
+
+def test_cache_invalidated_by_own_write(cached_store: SenseStore) -> None:
+    cached_store.write(_alf("run", "to move quickly"))
+    assert cached_store.read("run") is not None
+    cached_store.update(
+        "run",
+        lambda e: e.model_copy(update={"senses": [Sense(definition="to manage")]}),  # type: ignore[union-attr]
+    )
+    result = cached_store.read("run")
+    assert result is not None
+    assert result.senses[0].definition == "to manage"
+    cached_store.delete("run")
+    assert cached_store.read("run") is None
+
+
+def test_cache_invalidated_by_update_many(cached_store: SenseStore) -> None:
+    cached_store.write(_alf("run", "to move quickly"))
+    assert cached_store.read("run") is not None
+    cached_store.update_many({"run": lambda existing: _alf("run", "to manage")})
+    result = cached_store.read("run")
+    assert result is not None
+    assert result.senses[0].definition == "to manage"
+
+
+def test_cache_sees_writes_from_other_connections(
+    cached_store: SenseStore, tmp_path: Path
+) -> None:
+    assert cached_store.read("run") is None  # cached miss
+    assert cached_store.read_case_variants("run") == []
+    other = SenseStore(tmp_path / "senses.db")
+    other.write(_alf("run", "to move quickly"))
+    other.write(_alf("RUN", "an acronym"))
+    result = cached_store.read("run")
+    assert result is not None
+    assert [v.form for v in cached_store.read_case_variants("run")] == ["run", "RUN"]
+
+
+def test_cache_is_bounded(cached_store: SenseStore) -> None:
+    for form in ("a", "b", "c"):
+        cached_store.write(_alf(form, "a letter"))
+    cached_store.read_many(["a", "b", "c"])
+    assert cached_store._cache is not None
+    assert list(cached_store._cache._entries) == [("form", "b"), ("form", "c")]
+
+
+def test_close_closes_cache_probe(tmp_path: Path) -> None:
+    store = SenseStore(tmp_path / "senses.db", cache_size=2)
+    assert store._cache is not None
+    probe = store._cache._probe
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        probe.execute("SELECT 1")
+    SenseStore(tmp_path / "senses.db").close()  # no cache: no-op
@@ -11,6 +11,8 @@ from pathlib import Path
 from flask import Flask, abort, render_template, request
 import polars as pl
 
+from alfs.data_models.doc_corpus import read_docs
+
 PAGE_SIZE = 50
 
 app = Flask(__name__)
@@ -77,7 +79,7 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="ETL data viewer")
     parser.add_argument("--docs", required=True, type=Path, help="Path to docs.parquet")
     args = parser.parse_args()
-    _df = pl.read_parquet(args.docs)
+    _df = read_docs(args.docs)
     app.run(host="localhost", port=5003, debug=False)
 
 
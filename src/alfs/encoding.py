@@ -1,5 +1,7 @@
 """Shared text utilities."""
 
+from collections.abc import Sequence
+
 
 def context_window(
     text: str, byte_offset: int, form: str, context_chars: int
@@ -10,14 +12,93 @@ def context_window(
     the occurrence.  ``word_start_in_snippet`` is the index within ``snippet``
     where ``form`` begins, so callers can apply their own formatting.
 
-    Uses ``errors='ignore'`` when decoding the byte prefix so that mid-character
-    byte offsets and any corpus encoding issues degrade gracefully instead of
-    raising.
+    A byte offset in the middle of a UTF-8 character counts as the start of
+    that character, so mid-character offsets and any corpus encoding issues
+    degrade gracefully instead of raising.  For many occurrences in one
+    document use context_windows(), which encodes the text once.
+    """
+    return context_windows(text, [byte_offset], form, context_chars)[0]
+
+
+def char_offsets(text: str, byte_offsets: Sequence[int]) -> list[int]:
+    """Map UTF-8 byte offsets into ``text`` to char offsets in one pass.
+
+    Offsets may come in any order; each is clamped to the text and a
+    mid-character offset maps to the start of its character.
+    """
+    if text.isascii():
+        return [min(max(b, 0), len(text)) for b in byte_offsets]
+    data = text.encode()
+    n = len(data)
+    result = [0] * len(byte_offsets)
+    byte = char = 0
+    for i in sorted(range(len(byte_offsets)), key=byte_offsets.__getitem__):
+        offset = min(max(byte_offsets[i], 0), n)
+        while 0 < offset < n and data[offset] & 0xC0 == 0x80:
+            offset -= 1
+        char += len(data[byte:offset].decode())
+        byte = offset
+        result[i] = char
+    return result
+
+
+def context_windows(
+    text: str, byte_offsets: Sequence[int], form: str, context_chars: int
+) -> list[tuple[str, int]]:
+    """context_window() for every byte offset of ``form`` in one document."""
+    windows = []
+    for char_offset in char_offsets(text, byte_offsets):
+        start = max(0, char_offset - context_chars)
+        end = char_offset + len(form) + context_chars
+        windows.append((text[start:end], char_offset - start))
+    return windows
+
+
+def context_window_bytes(
+    data: bytes | memoryview, byte_offset: int, form: str, context_chars: int
+) -> tuple[str, int]:
+    """context_window() over a document's UTF-8 bytes, decoding only the window.
+
+    Returns the same (snippet, word_start_in_snippet) as
+    ``context_window(data.decode(), ...)`` for valid UTF-8 ``data``.  A UTF-8
+    character is at most 4 bytes, so the ``context_chars`` characters on either
+    side lie within ``4 * context_chars`` bytes of the occurrence.
     """
-    encoded = text.encode()
-    char_offset = len(encoded[:byte_offset].decode(errors="ignore"))
-    start = max(0, char_offset - context_chars)
-    end = char_offset + len(form) + context_chars
-    snippet = text[start:end]
-    word_start = char_offset - start
-    return snippet, word_start
+    n = len(data)
+    offset = min(max(byte_offset, 0), n)
+    # A mid-character offset counts as the start of that character, as the
+    # errors="ignore" prefix decode in context_window() does.
+    while 0 < offset < n and data[offset] & 0xC0 == 0x80:
+        offset -= 1
+    left = bytes(data[max(0, offset - 4 * context_chars) : offset])
+    left_text = left.decode(errors="ignore")
+    before = left_text[max(0, len(left_text) - context_chars) :]
+    n_after = len(form) + context_chars
+    right = bytes(data[offset : offset + 4 * n_after])
+    snippet = before + right.decode(errors="ignore")[:n_after]
+    return snippet, len(before)
+
+
+class ByteOffsetMapper:
+    """Map char offsets into ``text`` to UTF-8 byte offsets.
+
+    Each call encodes only the span since the previous call, so mapping
+    non-decreasing offsets (e.g. every token of a document) is linear in the
+    text length rather than quadratic.  An offset smaller than the previous one
+    restarts the walk from the beginning of the text.
+    """
+
+    def __init__(self, text: str) -> None:
+        self._text = text
+        self._ascii = text.isascii()
+        self._char = 0
+        self._byte = 0
+
+    def byte_offset(self, char_offset: int) -> int:
+        if self._ascii:
+            return char_offset
+        if char_offset < self._char:
+            self._char = self._byte = 0
+        self._byte += len(self._text[self._char : char_offset].encode())
+        self._char = char_offset
+        return self._byte
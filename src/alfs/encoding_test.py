@@ -1,6 +1,12 @@
 """Tests for shared text utilities."""
 
-from alfs.encoding import context_window
+from alfs.encoding import (
+    ByteOffsetMapper,
+    char_offsets,
+    context_window,
+    context_window_bytes,
+    context_windows,
+)
 
 
 def test_context_window_basic() -> None:
@@ -45,3 +51,56 @@ def test_context_window_multibyte_alignment() -> None:
     snippet, word_start = context_window(text, byte_offset, "test", 10)
     assert "test" in snippet
     assert snippet[word_start : word_start + 4] == "test"
+
+
+def test_context_window_bytes_matches_context_window() -> None:
+    text = "naïve café — 日本語 text 🙂 end"
+    data = text.encode()
+    for byte_offset in range(len(data) + 1):
+        for context_chars in (0, 1, 3, 50):
+            assert context_window_bytes(
+                memoryview(data), byte_offset, "text", context_chars
+            ) == context_window(text, byte_offset, "text", context_chars)
+
+
+def test_char_offsets_any_order() -> None:
+    text = "naïve café — 日本語 text"
+    chars = [17, 0, 8, 3, len(text)]
+    byte_offsets = [len(text[:c].encode()) for c in chars]
+    assert char_offsets(text, byte_offsets) == chars
+
+
+def test_char_offsets_mid_character_and_out_of_range() -> None:
+    text = "日本語"
+    # Bytes 1 and 2 fall inside "日"; 4 inside "本"; 99 is past the end.
+    assert char_offsets(text, [1, 2, 4, 99, -1]) == [0, 0, 1, 3, 0]
+
+
+def test_context_windows_matches_context_window() -> None:
+    text = "naïve café — 日本語 text 🙂 end, text again"
+    data = text.encode()
+    byte_offsets = [data.index(b"text"), 0, data.rindex(b"text"), 5]
+    assert context_windows(text, byte_offsets, "text", 4) == [
+        context_window(text, b, "text", 4) for b in byte_offsets
+    ]
+
+
+def test_byte_offset_mapper_matches_prefix_encoding() -> None:
+    text = "naïve café — 日本語 text 🙂 end"
+    mapper = ByteOffsetMapper(text)
+    for i in range(len(text) + 1):
+        assert mapper.byte_offset(i) == len(text[:i].encode())
+
+
+def test_byte_offset_mapper_backwards_restarts() -> None:
+    text = "über alles"
+    mapper = ByteOffsetMapper(text)
+    assert mapper.byte_offset(6) == 7
+    assert mapper.byte_offset(1) == 2
+    assert mapper.byte_offset(1) == 2
+
+
+def test_byte_offset_mapper_ascii() -> None:
+    mapper = ByteOffsetMapper("plain ascii")
+    assert mapper.byte_offset(6) == 6
+    assert mapper.byte_offset(0) == 0
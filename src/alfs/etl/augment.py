@@ -6,38 +6,135 @@ Usage:
         --corpus ../text_data/docs.parquet \
         --cache-dir ../text_data/cache \
         --ngram-cache ../text_data/ngram_cache.npy \
-        [--n-docs 10000]
+        [--n-docs 10000] [--workers 8] [--read-workers 4]
 
 Each source tracks a cursor in {cache_dir}/{source}_cursor.json so successive
 runs pick up from where the previous run stopped.  Run until "0 new docs" is
-printed to signal that the dump has been fully consumed.
+printed to signal that the dump has been fully consumed.  For MediaWiki dumps the
+cursor also records the bz2 stream position of the next page (see
+alfs.etl.stream_dump), so a resume seeks to it instead of re-reading skipped
+pages; other sources skip pages_consumed pages.
+
+The dump is decompressed in this process, or by --read-workers processes for a
+multistream dump; wikitext parsing and 8-gram hashing are fanned out to
+--workers processes in chunks of PARSE_CHUNK pages (see
+alfs.etl.ordered_pool).  Results come back in dump order, so dedup decisions
+and the cursor are the same as a serial run.
 """
 
 import argparse
-from collections.abc import Iterator
+from collections import deque
+from collections.abc import Generator, Iterable, Iterator
+import contextlib
+import functools
+import itertools
 import json
 from pathlib import Path
+import time
+
+import numpy as np
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
 
+from alfs.data_models.doc import Doc
+from alfs.data_models.doc_corpus import part_paths
 from alfs.etl.corpus import append_docs, get_doc_ids
 from alfs.etl.ngram_cache import NgramCache
+from alfs.etl.ordered_pool import imap_ordered
 from alfs.etl.parse_dump import parse_page
 from alfs.etl.sources import SOURCES, Source
 from alfs.etl.stream_dump import stream_pages
 
+PARSE_CHUNK = 64
+
+ParsedPage = tuple[Doc, np.ndarray] | None
 
-def get_streamer(source: Source, dump_path: Path) -> Iterator[dict]:
+
+def get_streamer(
+    source: Source, dump_path: Path, cursor: dict | None = None, read_workers: int = 1
+) -> Iterator[dict]:
+    """Pages of source after the position recorded in cursor.
+
+    A stream position is only used if the cursor was saved against the same
+    dump file; otherwise pages_consumed pages are skipped.
+    """
+    cursor = cursor or {}
+    if (
+        source.type == "mediawiki"
+        and "stream_offset" in cursor
+        and cursor.get("dump") == dump_path.name
+    ):
+        return stream_pages(
+            dump_path,
+            source.name,
+            cursor["stream_offset"],
+            cursor["stream_page"],
+            workers=read_workers,
+        )
     if source.type == "mediawiki":
-        return stream_pages(dump_path, source.name)
+        pages = stream_pages(dump_path, source.name, workers=read_workers)
     elif source.type == "gutenberg":
         from alfs.etl.stream_gutenberg import stream_gutenberg
 
-        return stream_gutenberg(dump_path)
+        pages = stream_gutenberg(dump_path)
     elif source.type == "hf":
         from alfs.etl.stream_hf import stream_hf
 
-        return stream_hf(source.hf_dataset)
+        pages = stream_hf(source.hf_dataset)
     else:
         raise ValueError(f"Unknown source type: {source.type!r}")
+    return itertools.islice(pages, cursor.get("pages_consumed", 0), None)
+
+
+def _track_positions(
+    pages: Iterable[dict], positions: deque[tuple[int, int]]
+) -> Iterator[dict]:
+    """Pass pages through, queueing the stream position of each that has one."""
+    for page in pages:
+        if "stream_offset" in page:
+            positions.append((page["stream_offset"], page["stream_page"]))
+        yield page
+
+
+def _parse_chunk(
+    pages: tuple[dict, ...], source: str, min_text_len: int
+) -> list[ParsedPage]:
+    """Parse pages and hash their 8-grams; None for pages below min_text_len."""
+    results: list[ParsedPage] = []
+    for page in pages:
+        doc = parse_page(page, source)
+        if len(doc.text) < min_text_len:
+            results.append(None)
+        else:
+            results.append((doc, NgramCache.gram_hashes(doc.text)))
+    return results
+
+
+def rebuild_ngram_cache(corpus_path: Path) -> NgramCache:
+    """An ngram cache indexing every doc in the corpus, as augment runs built it."""
+    cache = NgramCache()
+    for part in part_paths(corpus_path):
+        for batch in pq.ParquetFile(part).iter_batches(columns=["text"]):
+            cache.add_docs([text or "" for text in batch.column("text").to_pylist()])
+    return cache
+
+
+def parse_pages(
+    pages: Iterable[dict],
+    source: str,
+    min_text_len: int,
+    workers: int,
+    chunk_size: int = PARSE_CHUNK,
+) -> Generator[ParsedPage]:
+    """Yield one _parse_chunk() result per page, in page order.
+
+    Pages are only pulled from the iterator as pool capacity frees up, so
+    closing the generator early leaves the rest of the stream unread.
+    """
+    chunks = itertools.batched(pages, chunk_size, strict=False)
+    parse = functools.partial(_parse_chunk, source=source, min_text_len=min_text_len)
+    with contextlib.closing(imap_ordered(parse, chunks, workers)) as results:
+        for result in results:
+            yield from result
 
 
 def main() -> None:
@@ -61,6 +158,15 @@ def main() -> None:
         default=200,
         help="Skip docs with fewer than this many chars of text (filters stubs)",
     )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Number of parse worker processes"
+    )
+    parser.add_argument(
+        "--read-workers",
+        type=int,
+        default=4,
+        help="Worker processes decompressing a multistream dump",
+    )
     args = parser.parse_args()
 
     source_name = args.source
@@ -79,48 +185,64 @@ def main() -> None:
 
     # 1. Load existing doc_ids
     existing_ids: set[str] = set()
-    if corpus_path.exists():
+    if part_paths(corpus_path):
         existing_ids = get_doc_ids(corpus_path)
         print(f"Corpus has {len(existing_ids)} existing docs")
     else:
         print("No existing corpus — starting fresh")
 
     # 2. Load ngram cache
-    if ngram_cache_path.exists():
+    if ngram_cache_path.exists() and NgramCache.is_current(ngram_cache_path):
         cache = NgramCache.load(ngram_cache_path)
-        print(f"Loaded ngram cache ({len(cache._hashes):,} hashes)")
+        print(f"Loaded ngram cache ({len(cache):,} hashes)")
+    elif ngram_cache_path.exists():
+        print("Ngram cache uses an older gram hash — rebuilding from the corpus")
+        cache = rebuild_ngram_cache(corpus_path)
+        print(f"Rebuilt ngram cache ({len(cache):,} hashes)")
     else:
         cache = NgramCache()
         print("Starting with empty ngram cache")
 
     # 3. Read cursor
     cursor_path = cache_dir / f"{source_name}_cursor.json"
+    cursor: dict = {}
     pages_consumed = 0
     if cursor_path.exists():
         with open(cursor_path) as f:
-            pages_consumed = json.load(f)["pages_consumed"]
+            cursor = json.load(f)
+        pages_consumed = cursor["pages_consumed"]
         print(f"Cursor: resuming after {pages_consumed:,} pages")
+        if "stream_offset" in cursor and cursor.get("dump") == dump_path.name:
+            print(f"  seeking to byte {cursor['stream_offset']:,} of {dump_path}")
     else:
         print("No cursor found — starting from beginning of dump")
 
-    # 4-6. Stream, skip, parse, dedup, collect
+    # 4-6. Stream, skip, parse + hash in the pool, dedup, collect
     new_docs = []
-    pages_skipped = 0
     pages_processed = 0
     exact_dupes = 0
     ngram_dupes = 0
 
-    for page in get_streamer(source, dump_path):
-        if pages_skipped < pages_consumed:
-            pages_skipped += 1
-            continue
-
+    # Positions of pages handed to the pool, popped as their results arrive.
+    positions: deque[tuple[int, int]] = deque()
+    next_position: tuple[int, int] | None = None
+    pages = _track_positions(
+        get_streamer(source, dump_path, cursor, args.read_workers), positions
+    )
+    start = time.perf_counter()
+    parsed_pages = parse_pages(pages, source_name, args.min_text_len, args.workers)
+    for parsed in parsed_pages:
         pages_processed += 1
+        if positions:
+            stream_offset, stream_page = positions.popleft()
+            next_position = (stream_offset, stream_page + 1)
+        if pages_processed % 10_000 == 0:
+            rate = pages_processed / (time.perf_counter() - start)
+            print(f"  Scanned {pages_processed:,} pages ({rate:,.0f} pages/s)...")
 
-        doc = parse_page(page, source_name)
-
-        if len(doc.text) < args.min_text_len:
+        if parsed is None:
             continue
+        doc, gram_hashes = parsed
 
         # exact dedup
         if doc.doc_id in existing_ids:
@@ -129,24 +251,31 @@ def main() -> None:
         existing_ids.add(doc.doc_id)
 
         # ngram near-dedup
-        if cache.is_near_duplicate(doc.text):
+        if cache.is_near_duplicate_hashes(gram_hashes):
             ngram_dupes += 1
             continue
-        cache.add_doc(doc.text)
+        cache.add_hashes(gram_hashes)
 
         new_docs.append(doc)
         if len(new_docs) >= args.n_docs:
             break
+    parsed_pages.close()
+    elapsed = time.perf_counter() - start
 
     print(
-        f"Scanned {pages_processed} pages: "
+        f"Scanned {pages_processed} pages in {elapsed:.1f}s "
+        f"({pages_processed / max(elapsed, 1e-9):,.0f} pages/s): "
         f"{len(new_docs)} new, {exact_dupes} exact dupes, {ngram_dupes} near dupes"
     )
 
     # 7. Save updated cursor
     new_pages_consumed = pages_consumed + pages_processed
+    cursor["pages_consumed"] = new_pages_consumed
+    if next_position is not None:
+        cursor["dump"] = dump_path.name
+        cursor["stream_offset"], cursor["stream_page"] = next_position
     with open(cursor_path, "w") as f:
-        json.dump({"pages_consumed": new_pages_consumed}, f)
+        json.dump(cursor, f)
     print(f"Cursor saved: {new_pages_consumed:,} total pages consumed")
 
     # 8. Append docs + save ngram cache
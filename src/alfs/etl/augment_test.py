@@ -0,0 +1,122 @@
+import bz2
+from pathlib import Path
+
+from alfs.data_models.doc import Doc
+from alfs.etl.augment import get_streamer, parse_pages, rebuild_ngram_cache
+from alfs.etl.corpus import append_docs
+from alfs.etl.ngram_cache import NgramCache
+from alfs.etl.sources import SOURCES
+
+
+def _page(i: int, words: int = 40) -> dict:
+    body = " ".join(f"'''page{i}''' word{j}" for j in range(words))
+    return {"title": f"Page {i}", "wikitext": body, "year": 2020, "author": None}
+
+
+def test_parse_pages_parallel_matches_serial_order():
+    pages = [_page(i, words=1 if i % 5 == 0 else 40) for i in range(50)]
+    serial = list(parse_pages(pages, "wikibooks", 100, workers=1))
+    parallel = list(parse_pages(pages, "wikibooks", 100, workers=2, chunk_size=3))
+    assert len(serial) == len(pages)
+    for par, ser in zip(parallel, serial, strict=True):
+        assert (par is None) == (ser is None)
+        if par is not None and ser is not None:
+            assert par[0] == ser[0]
+            assert par[1].tolist() == ser[1].tolist()
+
+
+def test_parse_pages_short_pages_yield_none():
+    results = list(parse_pages([_page(0, words=1), _page(1)], "wikibooks", 100, 1))
+    assert results[0] is None
+    assert results[1] is not None
+    doc, gram_hashes = results[1]
+    assert doc.title == "Page 1"
+    assert "'''" not in doc.text
+    assert len(gram_hashes) == len(doc.text.split()) - 7
+
+
+def test_parse_pages_reads_lazily():
+    pulled: list[int] = []
+
+    def stream():
+        for i in range(10_000):
+            pulled.append(i)
+            yield _page(i)
+
+    parsed = parse_pages(stream(), "wikibooks", 0, workers=2, chunk_size=4)
+    for _ in range(5):
+        next(parsed)
+    parsed.close()
+    # Only the in-flight window was read, not the whole stream.
+    assert len(pulled) <= 4 * 2 * 4 + 4
+
+
+def _write_dump(path: Path, n_pages: int, per_stream: int) -> None:
+    ns = "http://www.mediawiki.org/xml/export-0.11/"
+    pages = [
+        f"<page><title>Page {i}</title><ns>0</ns><revision>"
+        f"<timestamp>2020-01-01T00:00:00Z</timestamp>"
+        f"<text>Text {i}</text></revision></page>"
+        for i in range(n_pages)
+    ]
+    with open(path, "wb") as f:
+        f.write(bz2.compress(f'<mediawiki xmlns="{ns}">'.encode()))
+        for i in range(0, n_pages, per_stream):
+            f.write(bz2.compress("".join(pages[i : i + per_stream]).encode()))
+        f.write(bz2.compress(b"</mediawiki>"))
+
+
+def test_get_streamer_resumes_from_stream_position(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    _write_dump(dump, 20, per_stream=3)
+    source = SOURCES["wikibooks"]
+    pages = list(get_streamer(source, dump))
+    for k in (0, 4, 19):
+        position = {
+            "pages_consumed": k,
+            "dump": dump.name,
+            "stream_offset": pages[k]["stream_offset"],
+            "stream_page": pages[k]["stream_page"],
+        }
+        assert list(get_streamer(source, dump, position)) == pages[k:]
+        # Cursors written before stream positions existed skip by count.
+        assert list(get_streamer(source, dump, {"pages_consumed": k})) == pages[k:]
+
+
+def test_get_streamer_ignores_stream_position_from_other_dump(tmp_path: Path):
+    old_dump = tmp_path / "old.xml.bz2"
+    _write_dump(old_dump, 20, per_stream=3)
+    new_dump = tmp_path / "new.xml.bz2"
+    _write_dump(new_dump, 20, per_stream=5)
+    source = SOURCES["wikibooks"]
+    old_pages = list(get_streamer(source, old_dump))
+    new_pages = list(get_streamer(source, new_dump))
+    cursor = {
+        "pages_consumed": 7,
+        "dump": old_dump.name,
+        "stream_offset": old_pages[7]["stream_offset"],
+        "stream_page": old_pages[7]["stream_page"],
+    }
+    assert list(get_streamer(source, new_dump, cursor)) == new_pages[7:]
+
+
+def test_get_streamer_parallel_read_matches_serial(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    _write_dump(dump, 20, per_stream=3)
+    source = SOURCES["wikibooks"]
+    pages = list(get_streamer(source, dump))
+    assert list(get_streamer(source, dump, read_workers=2)) == pages
+
+
+def test_rebuild_ngram_cache_indexes_every_corpus_doc(tmp_path: Path):
+    corpus = tmp_path / "docs.parquet"
+    texts = [" ".join(f"w{i}_{j}" for j in range(60)) for i in range(4)]
+    append_docs([Doc(doc_id=str(i), text=t) for i, t in enumerate(texts[:2])], corpus)
+    append_docs(
+        [Doc(doc_id=str(i), text=t) for i, t in enumerate(texts[2:], 2)], corpus
+    )
+    expected = NgramCache()
+    expected.add_docs(texts)
+    rebuilt = rebuild_ngram_cache(corpus)
+    assert rebuilt.to_array().tolist() == expected.to_array().tolist()
+    assert all(rebuilt.is_near_duplicate(t) for t in texts)
@@ -0,0 +1,27 @@
+"""Fold the parts of the docs corpus into a single part.
+
+Each augment run appends one part (see alfs.data_models.doc_corpus); run this
+to merge them after many runs, or to convert a single-file docs.parquet into
+the partitioned layout.
+
+Usage:
+    python -m alfs.etl.compact --corpus docs.parquet
+"""
+
+import argparse
+from pathlib import Path
+
+from alfs.etl.corpus import compact_docs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact the docs corpus parts")
+    parser.add_argument("--corpus", required=True, help="Path to docs.parquet")
+    args = parser.parse_args()
+
+    folded = compact_docs(Path(args.corpus))
+    print(f"Compacted {folded} parts")
+
+
+if __name__ == "__main__":
+    main()
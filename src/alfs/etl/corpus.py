@@ -1,29 +1,155 @@
-"""Helpers for reading and appending to the docs corpus parquet."""
+"""Helpers for reading and appending to the partitioned docs corpus.
 
+See alfs.data_models.doc_corpus for the layout. append_docs() writes each
+batch of new docs as one immutable part; compact_docs() folds the parts into
+one.
+"""
+
+import json
+import os
 from pathlib import Path
+import shutil
+from typing import Any
 
 import polars as pl
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
 
 from alfs.data_models.doc import Doc
+from alfs.data_models.doc_corpus import (
+    DOCS_SCHEMA,
+    MANIFEST_FILE,
+    adopt_path,
+    load_manifest,
+    scan_docs,
+)
+from alfs.data_models.doc_corpus import read_docs as read_docs
+
+ROW_GROUP_SIZE = 16 * 1024
 
 
 def get_doc_ids(corpus_path: Path) -> set[str]:
     """Return the set of doc_ids already in the corpus."""
-    df = pl.read_parquet(corpus_path, columns=["doc_id"])
+    df = scan_docs(corpus_path).select("doc_id").collect(engine="streaming")
     return set(df["doc_id"].to_list())
 
 
-def read_docs(corpus_path: Path) -> pl.DataFrame:
-    return pl.read_parquet(corpus_path)
+def _part_name(manifest: dict[str, Any]) -> str:
+    name = f"part-{manifest['next_seq']:06d}.parquet"
+    manifest["next_seq"] += 1
+    return name
+
+
+def _part_entry(name: str, path: Path) -> dict[str, Any]:
+    stats = (
+        pl.scan_parquet(path)
+        .select(
+            pl.len().alias("n_docs"),
+            pl.col("doc_id").min().alias("min_doc_id"),
+            pl.col("doc_id").max().alias("max_doc_id"),
+            pl.col("source").drop_nulls().unique().implode().alias("sources"),
+        )
+        .collect()
+        .row(0, named=True)
+    )
+    sources = stats.pop("sources")
+    return {
+        "file": name,
+        "source": sources[0] if len(sources) == 1 else None,
+        **stats,
+    }
+
+
+def _save_manifest(corpus_path: Path, manifest: dict[str, Any]) -> None:
+    path = corpus_path / MANIFEST_FILE
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, path)
+
+
+def _remove_unreferenced(corpus_path: Path, manifest: dict[str, Any]) -> None:
+    live = {part["file"] for part in manifest["parts"]}
+    for path in corpus_path.glob("part-*.parquet*"):
+        if path.name not in live:
+            path.unlink()
+
+
+def _adopt_single_file(corpus_path: Path) -> None:
+    """Turn a single-file corpus into a directory with that file as its first part.
+
+    The directory is assembled beside the file, with the file hard-linked in
+    rather than copied, and swapped in once its manifest is written. The file
+    stays in place until then, so a crash leaves either it or a complete
+    .adopt directory (see _finish_adoption()).
+    """
+    staged = adopt_path(corpus_path)
+    shutil.rmtree(staged, ignore_errors=True)
+    staged.mkdir()
+    manifest = load_manifest(staged)
+    name = _part_name(manifest)
+    try:
+        os.link(corpus_path, staged / name)
+    except OSError:
+        shutil.copy2(corpus_path, staged / name)
+    manifest["parts"].append(_part_entry(name, staged / name))
+    _save_manifest(staged, manifest)
+    # A directory cannot be renamed over a file; the part keeps the data.
+    corpus_path.unlink()
+    os.replace(staged, corpus_path)
+
+
+def _finish_adoption(corpus_path: Path) -> None:
+    """Move a complete .adopt directory left by an interrupted swap into place."""
+    staged = adopt_path(corpus_path)
+    if not corpus_path.exists() and (staged / MANIFEST_FILE).exists():
+        os.replace(staged, corpus_path)
 
 
 def append_docs(new_docs: list[Doc], corpus_path: Path) -> None:
-    """Append new_docs to corpus_path, creating the file if it doesn't exist."""
-    new_df = pl.DataFrame([d.model_dump() for d in new_docs])
-    if corpus_path.exists():
-        existing = pl.read_parquet(corpus_path)
-        combined = pl.concat([existing, new_df])
-    else:
-        corpus_path.parent.mkdir(parents=True, exist_ok=True)
-        combined = new_df
-    combined.write_parquet(corpus_path)
+    """Append new_docs to corpus_path as a new part, creating the corpus if needed.
+
+    Existing parts are neither read nor rewritten.
+    """
+    if not new_docs:
+        return
+    _finish_adoption(corpus_path)
+    if corpus_path.is_file():
+        _adopt_single_file(corpus_path)
+    corpus_path.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(corpus_path)
+    name = _part_name(manifest)
+    path = corpus_path / name
+    tmp = path.with_name(path.name + ".tmp")
+    df = pl.DataFrame([d.model_dump() for d in new_docs], schema=DOCS_SCHEMA)
+    pq.write_table(
+        df.to_arrow(), tmp, row_group_size=ROW_GROUP_SIZE, compression="zstd"
+    )
+    os.replace(tmp, path)
+    manifest["parts"].append(_part_entry(name, path))
+    _save_manifest(corpus_path, manifest)
+    _remove_unreferenced(corpus_path, manifest)
+
+
+def compact_docs(corpus_path: Path) -> int:
+    """Fold every part of the corpus into one; returns the number of parts folded.
+
+    The merged part is streamed to disk and listed in the manifest before the
+    old parts are removed, so readers never see a partial corpus.
+    """
+    _finish_adoption(corpus_path)
+    if corpus_path.is_file():
+        _adopt_single_file(corpus_path)
+    manifest = load_manifest(corpus_path)
+    n_parts = len(manifest["parts"])
+    if n_parts <= 1:
+        return 0
+    name = _part_name(manifest)
+    path = corpus_path / name
+    tmp = path.with_name(path.name + ".tmp")
+    scan_docs(corpus_path).sink_parquet(
+        tmp, compression="zstd", row_group_size=ROW_GROUP_SIZE
+    )
+    os.replace(tmp, path)
+    manifest["parts"] = [_part_entry(name, path)]
+    _save_manifest(corpus_path, manifest)
+    _remove_unreferenced(corpus_path, manifest)
+    return n_parts
@@ -1,7 +1,12 @@
+import os
 from pathlib import Path
 
+import polars as pl
+import pytest
+
 from alfs.data_models.doc import Doc
-from alfs.etl.corpus import append_docs, get_doc_ids
+from alfs.data_models.doc_corpus import load_manifest
+from alfs.etl.corpus import append_docs, compact_docs, get_doc_ids, read_docs
 
 
 def _make_doc(doc_id: str, text: str) -> Doc:
@@ -30,3 +35,92 @@ def test_get_doc_ids_returns_correct_set(tmp_path: Path) -> None:
     docs = [_make_doc(f"id{i}", f"text {i}") for i in range(3)]
     append_docs(docs, corpus)
     assert get_doc_ids(corpus) == {"id0", "id1", "id2"}
+
+
+def test_append_docs_writes_one_part_per_call(tmp_path: Path) -> None:
+    corpus = tmp_path / "docs.parquet"
+    append_docs([Doc(doc_id="bbb", text="b", source="wikibooks")], corpus)
+    first = (corpus / "part-000000.parquet").stat().st_mtime_ns
+    append_docs(
+        [
+            Doc(doc_id="aaa", text="a", source="wikisource"),
+            Doc(doc_id="ccc", text="c", source="wikisource"),
+        ],
+        corpus,
+    )
+    assert (corpus / "part-000000.parquet").stat().st_mtime_ns == first
+    parts = load_manifest(corpus)["parts"]
+    assert [p["file"] for p in parts] == ["part-000000.parquet", "part-000001.parquet"]
+    assert parts[1] == {
+        "file": "part-000001.parquet",
+        "source": "wikisource",
+        "n_docs": 2,
+        "min_doc_id": "aaa",
+        "max_doc_id": "ccc",
+    }
+    assert read_docs(corpus)["doc_id"].to_list() == ["bbb", "aaa", "ccc"]
+
+
+def test_unlisted_parts_are_ignored(tmp_path: Path) -> None:
+    corpus = tmp_path / "docs.parquet"
+    append_docs([_make_doc("aaa", "first")], corpus)
+    # Left behind by an interrupted append.
+    pl.DataFrame({"doc_id": ["zzz"], "text": ["x"]}).write_parquet(
+        corpus / "part-000001.parquet"
+    )
+    assert get_doc_ids(corpus) == {"aaa"}
+    append_docs([_make_doc("bbb", "second")], corpus)
+    assert get_doc_ids(corpus) == {"aaa", "bbb"}
+
+
+def test_append_adopts_single_file_corpus(tmp_path: Path) -> None:
+    corpus = tmp_path / "docs.parquet"
+    pl.DataFrame(
+        {"doc_id": ["old"], "text": ["legacy"], "author": [None], "source": ["x"]}
+    ).write_parquet(corpus)
+    assert get_doc_ids(corpus) == {"old"}
+    append_docs([Doc(doc_id="new", text="fresh", author="someone")], corpus)
+    assert corpus.is_dir()
+    docs = read_docs(corpus)
+    assert docs["doc_id"].to_list() == ["old", "new"]
+    assert docs["author"].to_list() == [None, "someone"]
+
+
+def test_interrupted_adoption_keeps_the_corpus(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    corpus = tmp_path / "docs.parquet"
+    pl.DataFrame(
+        {"doc_id": ["old"], "text": ["legacy"], "source": ["x"]}
+    ).write_parquet(corpus)
+    real_replace = os.replace
+
+    def crash_on_swap(src: Path, dst: Path) -> None:
+        if Path(dst) == corpus:
+            raise KeyboardInterrupt
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", crash_on_swap)
+    with pytest.raises(KeyboardInterrupt):
+        append_docs([_make_doc("new", "fresh")], corpus)
+    monkeypatch.setattr(os, "replace", real_replace)
+    assert not corpus.exists()
+    assert get_doc_ids(corpus) == {"old"}
+    append_docs([_make_doc("new", "fresh")], corpus)
+    assert corpus.is_dir()
+    assert read_docs(corpus)["doc_id"].to_list() == ["old", "new"]
+    assert not (tmp_path / "docs.parquet.adopt").exists()
+
+
+def test_compact_docs_folds_parts(tmp_path: Path) -> None:
+    corpus = tmp_path / "docs.parquet"
+    for i in range(3):
+        append_docs([_make_doc(f"id{i}", f"text {i}")], corpus)
+    before = read_docs(corpus)
+    assert compact_docs(corpus) == 3
+    assert [p["file"] for p in load_manifest(corpus)["parts"]] == [
+        "part-000003.parquet"
+    ]
+    assert sorted(f.name for f in corpus.glob("part-*")) == ["part-000003.parquet"]
+    assert read_docs(corpus).equals(before)
+    assert compact_docs(corpus) == 0
@@ -1,53 +1,157 @@
-"""8-gram near-duplicate cache backed by a numpy .npy file.
+"""8-gram near-duplicate cache backed by a sorted numpy .npy file.
 
-The cache stores SHA256[:8]-derived int64 hashes of word 8-grams sampled
-from each document (every 10th gram when indexing, all grams when querying).
+The cache stores int64 hashes of word 8-grams sampled from each document
+(every 10th gram when indexing, all grams when querying). A gram's hash
+combines the xxh3 hashes of its eight words, so hashing a document costs one
+xxh3 call per word plus a few vectorized passes (see gram_hashes()).
+
+On disk the hashes are a sorted, duplicate-free int64 array. load()
+memory-maps it and membership is a binary search, so opening a cache of tens
+of millions of hashes neither builds a set nor reads the whole file. Hashes
+added since loading live in a sorted in-memory delta, fed by a small sorted
+buffer, until save() merges them in.
+
+A JSON sidecar (ngram_cache.json for ngram_cache.npy) records HASH_VERSION.
+Hashes from another version (including the original SHA256 caches, which have
+no sidecar) never match new ones; is_current() tells callers to rebuild.
 """
 
-import hashlib
+from __future__ import annotations
+
+import json
+import os
 from pathlib import Path
 
 import numpy as np
+import xxhash
+
+HASH_VERSION = "xxh3-words-poly8-v1"
+BUFFER_SIZE = 4096
+_GRAM = 8
+_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _empty() -> np.ndarray:
+    return np.empty(0, dtype=np.int64)
+
+
+def _sorted_contains(sorted_hashes: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+    """Boolean mask of hashes present in sorted_hashes."""
+    if len(sorted_hashes) == 0:
+        return np.zeros(len(hashes), dtype=bool)
+    idx = np.searchsorted(sorted_hashes, hashes)
+    np.minimum(idx, len(sorted_hashes) - 1, out=idx)
+    return np.asarray(sorted_hashes[idx] == hashes)
+
+
+def _merge(sorted_hashes: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """Insert sorted new hashes (absent from sorted_hashes) in order."""
+    return np.insert(sorted_hashes, np.searchsorted(sorted_hashes, new), new)
+
+
+def meta_path(path: Path) -> Path:
+    return path.with_suffix(".json")
 
 
 class NgramCache:
-    def __init__(self) -> None:
-        self._hashes: set[int] = set()
+    def __init__(self, hashes: np.ndarray | None = None) -> None:
+        # Three disjoint sorted tiers: the loaded (possibly memory-mapped)
+        # array, hashes added since, and a small buffer in front of those.
+        self._base = _empty() if hashes is None else hashes
+        self._delta = _empty()
+        self._buffer = _empty()
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._delta) + len(self._buffer)
+
+    @staticmethod
+    def is_current(path: Path) -> bool:
+        """Whether the cache at path was written with this HASH_VERSION."""
+        meta = meta_path(path)
+        return (
+            meta.exists() and json.loads(meta.read_text()).get("hash") == HASH_VERSION
+        )
 
     @classmethod
-    def load(cls, path: Path) -> "NgramCache":
-        cache = cls()
-        arr = np.load(path)
-        cache._hashes = set(arr.tolist())
-        return cache
+    def load(cls, path: Path) -> NgramCache:
+        if not cls.is_current(path):
+            raise ValueError(
+                f"{path} was not written with gram hash {HASH_VERSION}; rebuild it"
+            )
+        return cls(np.load(path, mmap_mode="r"))
+
+    def to_array(self) -> np.ndarray:
+        """Every hash in the cache, sorted."""
+        return np.sort(np.concatenate([self._base, self._delta, self._buffer]))
 
     def save(self, path: Path) -> None:
-        arr = np.array(list(self._hashes), dtype=np.int64)
-        np.save(path, arr)
+        # Written aside and renamed, so a mapped copy of path stays valid.
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, self.to_array())
+        os.replace(tmp, path)
+        meta_path(path).write_text(json.dumps({"hash": HASH_VERSION}))
 
-    def _hash_gram(self, gram: str) -> int:
-        h = hashlib.sha256(gram.encode()).digest()[:8]
-        return int.from_bytes(h, "little", signed=True)
+    @staticmethod
+    def gram_hashes(text: str) -> np.ndarray:
+        """Hashes of every word 8-gram of text, in order, as int64.
 
-    def _word_8grams(self, text: str) -> list[str]:
+        Each gram's word hashes are folded polynomially, then mixed with the
+        splitmix64 finalizer. Needs no cache state, so it can run in worker
+        processes; pass the result to add_hashes() / is_near_duplicate_hashes().
+        """
         words = text.split()
-        return [" ".join(words[i : i + 8]) for i in range(len(words) - 7)]
+        n = len(words) - _GRAM + 1
+        if n <= 0:
+            return _empty()
+        word_hashes = np.fromiter(
+            (xxhash.xxh3_64_intdigest(w.encode()) for w in words),
+            dtype=np.uint64,
+            count=len(words),
+        )
+        h = word_hashes[:n].copy()
+        for k in range(1, _GRAM):
+            h *= _MULTIPLIER
+            h += word_hashes[k : k + n]
+        h ^= h >> np.uint64(30)
+        h *= np.uint64(0xBF58476D1CE4E5B9)
+        h ^= h >> np.uint64(27)
+        h *= np.uint64(0x94D049BB133111EB)
+        h ^= h >> np.uint64(31)
+        return h.view(np.int64)
+
+    def _contains(self, hashes: np.ndarray) -> np.ndarray:
+        return (
+            _sorted_contains(self._base, hashes)
+            | _sorted_contains(self._delta, hashes)
+            | _sorted_contains(self._buffer, hashes)
+        )
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Index a document's gram_hashes(): sample every 10th 8-gram."""
+        sample = np.unique(np.asarray(hashes, dtype=np.int64)[::10])
+        self._buffer = _merge(self._buffer, sample[~self._contains(sample)])
+        if len(self._buffer) >= BUFFER_SIZE:
+            self._delta = _merge(self._delta, self._buffer)
+            self._buffer = _empty()
 
     def add_doc(self, text: str) -> None:
         """Index a document: sample every 10th 8-gram."""
-        grams = self._word_8grams(text)
-        for i, gram in enumerate(grams):
-            if i % 10 == 0:
-                self._hashes.add(self._hash_gram(gram))
+        self.add_hashes(self.gram_hashes(text))
 
     def add_docs(self, texts: list[str]) -> None:
         for text in texts:
             self.add_doc(text)
 
+    def is_near_duplicate_hashes(
+        self, hashes: np.ndarray, threshold: float = 0.05
+    ) -> bool:
+        """is_near_duplicate() for a document's precomputed gram_hashes()."""
+        if len(hashes) == 0:
+            return False
+        hits = int(np.count_nonzero(self._contains(np.asarray(hashes, dtype=np.int64))))
+        return hits / len(hashes) >= threshold
+
     def is_near_duplicate(self, text: str, threshold: float = 0.05) -> bool:
         """Return True if >= threshold fraction of 8-grams match the cache."""
-        grams = self._word_8grams(text)
-        if not grams:
-            return False
-        hits = sum(1 for gram in grams if self._hash_gram(gram) in self._hashes)
-        return hits / len(grams) >= threshold
+        return self.is_near_duplicate_hashes(self.gram_hashes(text), threshold)
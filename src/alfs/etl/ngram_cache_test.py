@@ -1,6 +1,10 @@
+import json
+import random
+
+import numpy as np
 import pytest
 
-from alfs.etl.ngram_cache import NgramCache
+from alfs.etl.ngram_cache import BUFFER_SIZE, NgramCache
 
 # A sentence long enough to have 8-grams (needs >= 8 words)
 SHORT = "the quick brown fox jumps over the lazy dog"
@@ -61,39 +65,42 @@ def test_add_docs_bulk_same_as_add_doc_individually():
     c2 = NgramCache()
     c2.add_docs([text1, text2])
 
-    assert c1._hashes == c2._hashes
+    assert np.array_equal(c1.to_array(), c2.to_array())
 
 
-def test_hash_gram_is_deterministic():
-    cache = NgramCache()
+def test_gram_hashes_are_deterministic():
     gram = "the quick brown fox jumps over the lazy"
-    assert cache._hash_gram(gram) == cache._hash_gram(gram)
+    # Pinned: changing the hash must bump HASH_VERSION.
+    assert NgramCache.gram_hashes(gram).tolist() == [-6506173073453126861]
+    assert NgramCache.gram_hashes(gram).dtype == np.int64
 
 
-def test_word_8grams_length():
-    cache = NgramCache()
-    words = list(range(10))
-    text = " ".join(str(w) for w in words)
-    grams = cache._word_8grams(text)
-    assert len(grams) == 3  # 10 - 8 + 1 = 3
+def test_gram_hashes_depend_on_word_order():
+    hashes = NgramCache.gram_hashes("a b c d e f g h h g f e d c b a")
+    assert len(set(hashes.tolist())) == len(hashes)
 
 
-def test_word_8grams_empty_and_short():
-    cache = NgramCache()
-    assert cache._word_8grams("") == []
-    assert cache._word_8grams("only seven words here so no grams") == []
+def test_gram_hashes_length():
+    text = " ".join(str(w) for w in range(10))
+    assert len(NgramCache.gram_hashes(text)) == 3  # 10 - 8 + 1 = 3
+
+
+def test_gram_hashes_empty_and_short():
+    assert len(NgramCache.gram_hashes("")) == 0
+    assert len(NgramCache.gram_hashes("only seven words here so no grams")) == 0
 
 
 def test_save_and_load_roundtrip(tmp_path):
     cache = NgramCache()
     cache.add_doc(_make_long(SHORT, n=20))
-    original_hashes = set(cache._hashes)
+    original_hashes = cache.to_array()
 
     path = tmp_path / "cache.npy"
     cache.save(path)
 
     loaded = NgramCache.load(path)
-    assert loaded._hashes == original_hashes
+    assert np.array_equal(loaded.to_array(), original_hashes)
+    assert len(loaded) == len(original_hashes)
 
 
 def test_loaded_cache_detects_duplicate(tmp_path):
@@ -129,4 +136,63 @@ def test_cache_grows_with_docs(n_docs):
             )
         )
     # Cache should be non-empty after adding docs with enough words
-    assert len(cache._hashes) > 0
+    assert len(cache) > 0
+
+
+def test_hash_api_matches_text_api():
+    text = _make_long(SHORT, n=30)
+    variant = _make_long(NEAR_DUP, n=30)
+    by_text = NgramCache()
+    by_text.add_doc(text)
+    by_hash = NgramCache()
+    by_hash.add_hashes(NgramCache.gram_hashes(text))
+    assert np.array_equal(by_hash.to_array(), by_text.to_array())
+    for other in (variant, _make_long(UNRELATED, n=30), ""):
+        assert by_hash.is_near_duplicate_hashes(
+            NgramCache.gram_hashes(other)
+        ) == by_text.is_near_duplicate(other)
+
+
+def test_hashes_are_unique_and_sorted_across_buffer_flushes():
+    cache = NgramCache()
+    rng = random.Random(0)
+    texts = [
+        " ".join(str(rng.randrange(10_000)) for _ in range(200)) for _ in range(300)
+    ]
+    cache.add_docs(texts)
+    cache.add_docs(texts[:10])  # re-adding changes nothing
+    hashes = cache.to_array()
+    assert len(hashes) > BUFFER_SIZE
+    assert len(cache) == len(hashes) == len(np.unique(hashes))
+    expected = np.unique(
+        np.concatenate([NgramCache.gram_hashes(t)[::10] for t in texts])
+    )
+    assert np.array_equal(hashes, expected)
+    assert all(cache.is_near_duplicate(t) for t in texts[::37])
+
+
+def test_load_memory_maps_and_extends(tmp_path):
+    path = tmp_path / "cache.npy"
+    first = _make_long(SHORT, n=30)
+    cache = NgramCache()
+    cache.add_doc(first)
+    cache.save(path)
+
+    loaded = NgramCache.load(path)
+    assert isinstance(loaded._base, np.memmap)
+    second = _make_long(UNRELATED, n=30)
+    loaded.add_doc(second)
+    loaded.save(path)
+    reloaded = NgramCache.load(path)
+    assert reloaded.is_near_duplicate(first)
+    assert reloaded.is_near_duplicate(second)
+
+
+def test_cache_without_current_hash_version_is_rejected(tmp_path):
+    path = tmp_path / "cache.npy"
+    np.save(path, np.array([3, 1, 2], dtype=np.int64))  # an original SHA256 cache
+    assert not NgramCache.is_current(path)
+    with pytest.raises(ValueError):
+        NgramCache.load(path)
+    path.with_suffix(".json").write_text(json.dumps({"hash": "other"}))
+    assert not NgramCache.is_current(path)
@@ -0,0 +1,38 @@
+"""Order-preserving, bounded process pool map for streaming ETL stages."""
+
+from collections import deque
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+
+MAX_PENDING_PER_WORKER = 4
+
+
+def imap_ordered[T, R](
+    fn: Callable[[T], R], items: Iterable[T], workers: int
+) -> Generator[R]:
+    """Yield fn(item) for each item, in input order, using workers processes.
+
+    Items are pulled from the iterable only as results are consumed, keeping at
+    most MAX_PENDING_PER_WORKER tasks per worker in flight, so a streaming
+    reader never runs far ahead.  Closing the generator early cancels
+    outstanding tasks and leaves the rest of items unread.  With workers <= 1,
+    fn runs in this process.  fn and items must be picklable.
+    """
+    if workers <= 1:
+        yield from map(fn, items)
+        return
+    # spawn: callers may have polars' thread pool running, which fork can deadlock.
+    pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    pending: deque[Future[R]] = deque()
+    try:
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= workers * MAX_PENDING_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)
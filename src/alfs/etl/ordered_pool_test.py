@@ -0,0 +1,26 @@
+from alfs.etl.ordered_pool import MAX_PENDING_PER_WORKER, imap_ordered
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+def test_imap_ordered_preserves_order():
+    items = list(range(40))
+    expected = [x * x for x in items]
+    assert list(imap_ordered(_square, items, workers=1)) == expected
+    assert list(imap_ordered(_square, items, workers=2)) == expected
+
+
+def test_imap_ordered_bounds_read_ahead():
+    pulled: list[int] = []
+
+    def stream():
+        for i in range(10_000):
+            pulled.append(i)
+            yield i
+
+    results = imap_ordered(_square, stream(), workers=2)
+    assert [next(results) for _ in range(3)] == [0, 1, 4]
+    assert len(pulled) <= 3 + 2 * MAX_PENDING_PER_WORKER
+    results.close()
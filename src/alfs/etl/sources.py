@@ -1,4 +1,9 @@
-"""Source registry for MediaWiki corpus dumps."""
+"""Source registry for MediaWiki corpus dumps.
+
+MediaWiki sources use the pages-articles-multistream dumps: the same pages as
+pages-articles, split into many small bz2 streams that can be sought to and
+decompressed independently (see alfs.etl.stream_dump).
+"""
 
 from dataclasses import dataclass, field
 
@@ -17,22 +22,22 @@ SOURCES: dict[str, Source] = {
     "wikibooks": Source(
         name="wikibooks",
         type="mediawiki",
-        dump_url="https://dumps.wikimedia.org/enwikibooks/latest/enwikibooks-latest-pages-articles.xml.bz2",
-        dump_filename="enwikibooks-latest-pages-articles.xml.bz2",
+        dump_url="https://dumps.wikimedia.org/enwikibooks/latest/enwikibooks-latest-pages-articles-multistream.xml.bz2",
+        dump_filename="enwikibooks-latest-pages-articles-multistream.xml.bz2",
         base_url="https://en.wikibooks.org/wiki/",
     ),
     "wikisource": Source(
         name="wikisource",
         type="mediawiki",
-        dump_url="https://dumps.wikimedia.org/enwikisource/latest/enwikisource-latest-pages-articles.xml.bz2",
-        dump_filename="enwikisource-latest-pages-articles.xml.bz2",
+        dump_url="https://dumps.wikimedia.org/enwikisource/latest/enwikisource-latest-pages-articles-multistream.xml.bz2",
+        dump_filename="enwikisource-latest-pages-articles-multistream.xml.bz2",
         base_url="https://en.wikisource.org/wiki/",
     ),
     "wikipedia": Source(
         name="wikipedia",
         type="mediawiki",
-        dump_url="https://dumps.wikimedia.org/enwiki/latest/enwiki-latest-pages-articles.xml.bz2",
-        dump_filename="enwiki-latest-pages-articles.xml.bz2",
+        dump_url="https://dumps.wikimedia.org/enwiki/latest/enwiki-latest-pages-articles-multistream.xml.bz2",
+        dump_filename="enwiki-latest-pages-articles-multistream.xml.bz2",
         base_url="https://en.wikipedia.org/wiki/",
     ),
     "gutenberg": Source(
@@ -1,80 +1,258 @@
 """Stream a MediaWiki XML dump to newline-delimited JSON.
 
+Every page dict carries its resume position: stream_offset, the compressed
+byte offset of the bz2 stream it was read from, and stream_page, its index
+among the pages yielded from that stream.  Passing a position back to
+stream_pages() seeks straight to that stream.  In a multistream dump (many
+small concatenated bz2 streams) this skips at most one stream's worth of pages.
+A single-stream dump is one stream at offset 0, so resuming re-reads the dump
+up to the position.
+
+With workers > 1, a multistream dump is read in parallel: stream boundaries are
+found by scanning for the byte-aligned bz2 stream header, and each stream is
+decompressed and parsed by a worker process (Wikimedia streams hold whole
+<page> elements).  Pages are yielded in dump order with the same positions as a
+sequential read.  Dumps without a second stream within MULTISTREAM_PROBE bytes
+are read sequentially.
+
 Usage:
     python -m alfs.etl.stream_dump \
         --dump dump.xml.bz2 \
         --source wikibooks \
-        --output pages.jsonl
+        --output pages.jsonl \
+        [--workers 4]
 """
 
+from __future__ import annotations
+
 import argparse
 import bz2
 from collections.abc import Iterator
+import contextlib
+import itertools
 import json
 from pathlib import Path
 import re
+from typing import BinaryIO
 import xml.etree.ElementTree as ET
 
+from alfs.etl.ordered_pool import imap_ordered
+
 NS = "http://www.mediawiki.org/xml/export-0.11/"
+READ_SIZE = 1 << 20
+MULTISTREAM_PROBE = 64 << 20
+# "BZh" + block size digit + the first block's magic (pi digits 0x314159265359).
+_STREAM_HEADER = re.compile(rb"BZh[1-9]1AY&SY")
+_STREAM_HEADER_LEN = 10
+
+
+def iter_bz2_streams(f: BinaryIO, offset: int = 0) -> Iterator[tuple[int, bytes, bool]]:
+    """Decompress concatenated bz2 streams starting at byte offset.
+
+    Yields (stream_offset, data, end_of_stream) where stream_offset is the
+    compressed offset at which the stream producing data starts.
+    """
+    f.seek(offset)
+    if f.read(3) != b"BZh":
+        raise ValueError(f"No bz2 stream starts at byte {offset}")
+    f.seek(offset)
+    stream_offset = fed = offset
+    decompressor = bz2.BZ2Decompressor()
+    started = False
+    buf = b""
+    while True:
+        if not buf:
+            buf = f.read(READ_SIZE)
+            if not buf:
+                break
+        data = decompressor.decompress(buf)
+        started = True
+        if decompressor.eof:
+            unused = decompressor.unused_data
+            yield stream_offset, data, True
+            fed += len(buf) - len(unused)
+            stream_offset = fed
+            decompressor = bz2.BZ2Decompressor()
+            started = False
+            buf = unused
+        else:
+            fed += len(buf)
+            buf = b""
+            if data:
+                yield stream_offset, data, False
+    if started:
+        raise EOFError("Compressed file ended before the end-of-stream marker")
+
+
+def _page_dict(elem: ET.Element, source: str) -> dict | None:
+    """Fields of a <page> element, or None for pages that are skipped."""
+    ns_elem = elem.find(f"{{{NS}}}ns")
+    if ns_elem is None or ns_elem.text != "0":
+        return None
+
+    if elem.find(f"{{{NS}}}redirect") is not None:
+        return None
+
+    title_elem = elem.find(f"{{{NS}}}title")
+    title = title_elem.text if title_elem is not None else ""
+    if not title:
+        return None
+
+    revision = elem.find(f"{{{NS}}}revision")
+    if revision is None:
+        return None
+
+    text_elem = revision.find(f"{{{NS}}}text")
+    wikitext = text_elem.text if text_elem is not None else ""
+    if not wikitext:
+        return None
+
+    timestamp_elem = revision.find(f"{{{NS}}}timestamp")
+    timestamp = timestamp_elem.text if timestamp_elem is not None else ""
+    year = int(timestamp[:4]) if timestamp else None
+    if source == "wikisource" and wikitext:
+        m = re.search(r"\|\s*year\s*=\s*(\d{4})", wikitext)
+        if m:
+            year = int(m.group(1))
+
+    contributor = revision.find(f"{{{NS}}}contributor")
+    username_elem = (
+        contributor.find(f"{{{NS}}}username") if contributor is not None else None
+    )
+    author = username_elem.text if username_elem is not None else None
+
+    return {
+        "title": title,
+        "wikitext": wikitext,
+        "year": year,
+        "author": author,
+        "source": source,
+    }
 
 
-def stream_pages(dump_path: Path, source: str) -> Iterator[dict]:
-    """Yield page dicts from a MediaWiki XML dump (namespace 0, non-redirects)."""
-    with bz2.open(dump_path) as f:
-        for _event, elem in ET.iterparse(f, events=["end"]):
-            if elem.tag != f"{{{NS}}}page":
-                continue
-
-            ns_elem = elem.find(f"{{{NS}}}ns")
-            if ns_elem is None or ns_elem.text != "0":
-                elem.clear()
-                continue
-
-            if elem.find(f"{{{NS}}}redirect") is not None:
-                elem.clear()
-                continue
-
-            title_elem = elem.find(f"{{{NS}}}title")
-            title = title_elem.text if title_elem is not None else ""
-            if not title:
-                elem.clear()
-                continue
-
-            revision = elem.find(f"{{{NS}}}revision")
-            if revision is None:
-                elem.clear()
-                continue
-
-            text_elem = revision.find(f"{{{NS}}}text")
-            wikitext = text_elem.text if text_elem is not None else ""
-            if not wikitext:
-                elem.clear()
-                continue
-
-            timestamp_elem = revision.find(f"{{{NS}}}timestamp")
-            timestamp = timestamp_elem.text if timestamp_elem is not None else ""
-            year = int(timestamp[:4]) if timestamp else None
-            if source == "wikisource" and wikitext:
-                m = re.search(r"\|\s*year\s*=\s*(\d{4})", wikitext)
-                if m:
-                    year = int(m.group(1))
-
-            contributor = revision.find(f"{{{NS}}}contributor")
-            username_elem = (
-                contributor.find(f"{{{NS}}}username")
-                if contributor is not None
-                else None
-            )
-            author = username_elem.text if username_elem is not None else None
-
-            yield {
-                "title": title,
-                "wikitext": wikitext,
-                "year": year,
-                "author": author,
-                "source": source,
-            }
-            elem.clear()
+def _root_parser(stream_offset: int) -> ET.XMLPullParser[ET.Element]:
+    parser: ET.XMLPullParser[ET.Element] = ET.XMLPullParser(events=["end"])
+    if stream_offset:
+        # Later streams hold bare <page> elements; give them the dump's root.
+        parser.feed(f'<mediawiki xmlns="{NS}">')
+    return parser
+
+
+def _read_pages(parser: ET.XMLPullParser[ET.Element], source: str) -> Iterator[dict]:
+    """Page dicts for the <page> elements the parser has completed."""
+    for _event, elem in parser.read_events():  # type: ignore[misc]
+        if not isinstance(elem, ET.Element) or elem.tag != f"{{{NS}}}page":
+            continue
+        page = _page_dict(elem, source)
+        elem.clear()
+        if page is not None:
+            yield page
+
+
+def stream_starts(f: BinaryIO, offset: int = 0) -> Iterator[int]:
+    """Offsets of the bz2 stream headers at or after offset, read lazily."""
+    f.seek(offset)
+    pos = offset
+    tail = b""
+    while chunk := f.read(READ_SIZE):
+        buf = tail + chunk
+        base = pos - len(tail)
+        # A match starting in tail runs into chunk, so none is reported twice.
+        for m in _STREAM_HEADER.finditer(buf):
+            yield base + m.start()
+        tail = buf[-(_STREAM_HEADER_LEN - 1) :]
+        pos += len(chunk)
+
+
+def is_multistream(f: BinaryIO, offset: int = 0) -> bool:
+    """Whether another bz2 stream starts within MULTISTREAM_PROBE of offset."""
+    f.seek(offset)
+    head = f.read(MULTISTREAM_PROBE)
+    return sum(1 for _ in itertools.islice(_STREAM_HEADER.finditer(head), 2)) == 2
+
+
+def _parse_stream(task: tuple[Path, int, int, str]) -> list[dict]:
+    """Decompress and parse one bz2 stream; pages carry their positions."""
+    dump_path, offset, length, source = task
+    with open(dump_path, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    decompressor = bz2.BZ2Decompressor()
+    xml = decompressor.decompress(data)
+    if not decompressor.eof or decompressor.unused_data:
+        raise ValueError(f"Bad bz2 stream of {length} bytes at byte {offset}")
+    parser = _root_parser(offset)
+    parser.feed(xml)
+    parser.flush()
+    pages = list(_read_pages(parser, source))
+    for i, page in enumerate(pages):
+        page["stream_offset"] = offset
+        page["stream_page"] = i
+    return pages
+
+
+def _stream_pages_parallel(
+    dump_path: Path, source: str, stream_offset: int, stream_page: int, workers: int
+) -> Iterator[dict]:
+    with open(dump_path, "rb") as f:
+        size = f.seek(0, 2)
+        starts = stream_starts(f, stream_offset)
+        spans = itertools.pairwise(itertools.chain(starts, [size]))
+        tasks = ((dump_path, start, end - start, source) for start, end in spans)
+        with contextlib.closing(imap_ordered(_parse_stream, tasks, workers)) as results:
+            for pages in results:
+                for page in pages:
+                    if (
+                        page["stream_offset"] == stream_offset
+                        and page["stream_page"] < stream_page
+                    ):
+                        continue
+                    yield page
+
+
+def stream_pages(
+    dump_path: Path,
+    source: str,
+    stream_offset: int = 0,
+    stream_page: int = 0,
+    workers: int = 1,
+) -> Iterator[dict]:
+    """Yield page dicts from a MediaWiki XML dump (namespace 0, non-redirects).
+
+    Starts at the page at (stream_offset, stream_page), a position taken from a
+    previously yielded page.  workers > 1 reads a multistream dump in parallel.
+    """
+    with open(dump_path, "rb") as f:
+        f.seek(stream_offset)
+        if f.read(3) != b"BZh":
+            raise ValueError(f"No bz2 stream starts at byte {stream_offset}")
+        parallel = workers > 1 and is_multistream(f, stream_offset)
+    if parallel:
+        yield from _stream_pages_parallel(
+            dump_path, source, stream_offset, stream_page, workers
+        )
+        return
+
+    parser = _root_parser(stream_offset)
+    current = stream_offset
+    n_in_stream = 0
+    with open(dump_path, "rb") as f:
+        for offset, data, end_of_stream in iter_bz2_streams(f, stream_offset):
+            if offset != current:
+                current, n_in_stream = offset, 0
+            parser.feed(data)
+            if end_of_stream:
+                # Emit every page of this stream before the next one is fed, so
+                # each page is attributed to the stream it came from.
+                parser.flush()
+            for page in _read_pages(parser, source):
+                index = n_in_stream
+                n_in_stream += 1
+                if current == stream_offset and index < stream_page:
+                    continue
+                page["stream_offset"] = current
+                page["stream_page"] = index
+                yield page
 
 
 def main() -> None:
@@ -89,11 +267,14 @@ def main() -> None:
         help="Source corpus name",
     )
     parser.add_argument("--output", required=True, help="Output JSONL file path")
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Worker processes for multistream dumps"
+    )
     args = parser.parse_args()
 
     count = 0
     with open(args.output, "w") as out:
-        for page in stream_pages(Path(args.dump), args.source):
+        for page in stream_pages(Path(args.dump), args.source, workers=args.workers):
             out.write(json.dumps(page) + "\n")
             count += 1
 
@@ -1,5 +1,16 @@
+import bz2
+from pathlib import Path
 import re
 
+import pytest
+
+from alfs.etl.stream_dump import (
+    is_multistream,
+    iter_bz2_streams,
+    stream_pages,
+    stream_starts,
+)
+
 
 def extract_wikisource_year(wikitext: str, timestamp_year: int) -> int:
     """Replicate the year-extraction logic from stream_dump.main()."""
@@ -27,3 +38,131 @@ def test_year_falls_back_to_timestamp_when_no_header():
 def test_year_falls_back_to_timestamp_when_year_missing_from_header():
     wikitext = "{{header\n| title = Something\n| author = Someone\n}}"
     assert extract_wikisource_year(wikitext, 2012) == 2012
+
+
+# --- bz2 stream positions -------------------------------------------------
+
+HEADER = (
+    '<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/" version="0.11">\n'
+    "  <siteinfo><sitename>Test</sitename></siteinfo>\n"
+)
+FOOTER = "</mediawiki>\n"
+
+
+def _page_xml(i: int, ns: int = 0, redirect: bool = False) -> str:
+    return (
+        f"  <page><title>Page {i}</title><ns>{ns}</ns><id>{i}</id>"
+        + ('<redirect title="Elsewhere" />' if redirect else "")
+        + "<revision><timestamp>2015-06-01T00:00:00Z</timestamp>"
+        f"<contributor><username>user{i}</username></contributor>"
+        f"<text>Body of page {i}.</text></revision></page>\n"
+    )
+
+
+def _pages_xml(n: int) -> list[str]:
+    # Every 7th page is a talk page and every 5th a redirect; both are skipped.
+    return [
+        _page_xml(i, ns=1 if i % 7 == 3 else 0, redirect=i % 5 == 4) for i in range(n)
+    ]
+
+
+def write_multistream(path: Path, pages: list[str], per_stream: int) -> list[int]:
+    """Write a multistream dump; returns the offset of each page stream."""
+    offsets = []
+    with open(path, "wb") as f:
+        f.write(bz2.compress(HEADER.encode()))
+        for i in range(0, len(pages), per_stream):
+            offsets.append(f.tell())
+            f.write(bz2.compress("".join(pages[i : i + per_stream]).encode()))
+        f.write(bz2.compress(FOOTER.encode()))
+    return offsets
+
+
+def test_stream_pages_multistream_positions(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    offsets = write_multistream(dump, _pages_xml(30), per_stream=4)
+    pages = list(stream_pages(dump, "wikibooks"))
+    assert [p["title"] for p in pages] == [
+        f"Page {i}" for i in range(30) if i % 7 != 3 and i % 5 != 4
+    ]
+    assert pages[0]["author"] == "user0"
+    assert pages[0]["year"] == 2015
+    assert {p["stream_offset"] for p in pages} <= set(offsets)
+    # Positions count yielded pages within each stream.
+    by_stream: dict[int, list[int]] = {}
+    for p in pages:
+        by_stream.setdefault(p["stream_offset"], []).append(p["stream_page"])
+    assert all(idx == list(range(len(idx))) for idx in by_stream.values())
+
+
+def test_stream_pages_resumes_from_every_position(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    write_multistream(dump, _pages_xml(30), per_stream=4)
+    pages = list(stream_pages(dump, "wikibooks"))
+    for i, page in enumerate(pages):
+        resumed = list(
+            stream_pages(dump, "wikibooks", page["stream_offset"], page["stream_page"])
+        )
+        assert resumed == pages[i:]
+
+
+def test_stream_pages_single_stream_dump(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    dump.write_bytes(bz2.compress((HEADER + "".join(_pages_xml(12)) + FOOTER).encode()))
+    pages = list(stream_pages(dump, "wikibooks"))
+    assert {p["stream_offset"] for p in pages} == {0}
+    assert [p["stream_page"] for p in pages] == list(range(len(pages)))
+    assert list(stream_pages(dump, "wikibooks", 0, 3)) == pages[3:]
+
+
+def test_stream_pages_rejects_offset_off_stream_boundary(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    offsets = write_multistream(dump, _pages_xml(8), per_stream=4)
+    with pytest.raises(ValueError):
+        list(stream_pages(dump, "wikibooks", offsets[0] + 1))
+
+
+def test_iter_bz2_streams_reports_stream_offsets(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    offsets = write_multistream(dump, _pages_xml(8), per_stream=4)
+    with open(dump, "rb") as f:
+        ends = [off for off, _data, end in iter_bz2_streams(f) if end]
+    assert ends == [0, *offsets, ends[-1]]
+    assert ends[-1] > offsets[-1]
+
+
+# --- parallel multistream reads -------------------------------------------
+
+
+def test_stream_starts_finds_every_stream(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    offsets = write_multistream(dump, _pages_xml(30), per_stream=4)
+    with open(dump, "rb") as f:
+        starts = list(stream_starts(f))
+        assert is_multistream(f)
+    with open(dump, "rb") as f:
+        ends = [off for off, _data, end in iter_bz2_streams(f) if end]
+    assert starts == ends
+    assert starts[1:-1] == offsets
+
+
+def test_stream_pages_parallel_matches_sequential(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    write_multistream(dump, _pages_xml(60), per_stream=4)
+    pages = list(stream_pages(dump, "wikibooks"))
+    assert list(stream_pages(dump, "wikibooks", workers=2)) == pages
+    for i in (0, 1, 17, len(pages) - 1):
+        page = pages[i]
+        resumed = stream_pages(
+            dump, "wikibooks", page["stream_offset"], page["stream_page"], workers=2
+        )
+        assert list(resumed) == pages[i:]
+
+
+def test_stream_pages_parallel_single_stream_falls_back(tmp_path: Path):
+    dump = tmp_path / "dump.xml.bz2"
+    dump.write_bytes(bz2.compress((HEADER + "".join(_pages_xml(12)) + FOOTER).encode()))
+    with open(dump, "rb") as f:
+        assert not is_multistream(f)
+    pages = list(stream_pages(dump, "wikibooks"))
+    assert list(stream_pages(dump, "wikibooks", workers=2)) == pages
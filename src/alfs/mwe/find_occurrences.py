@@ -18,6 +18,7 @@ from pathlib import Path
 import polars as pl
 
 from alfs.data_models.occurrence import Occurrence
+from alfs.seg.token_store import TokenStore
 
 
 def load_all_seg_data(seg_data_dir: Path) -> pl.DataFrame:
@@ -26,14 +27,7 @@ def load_all_seg_data(seg_data_dir: Path) -> pl.DataFrame:
     Sorted by (doc_id, byte_offset) so consecutive rows within a doc
     represent adjacent tokens.
     """
-    parquet_files = sorted(seg_data_dir.glob("*/occurrences.parquet"))
-    if not parquet_files:
-        raise FileNotFoundError(f"No occurrences.parquet files found in {seg_data_dir}")
-    return (
-        pl.concat([pl.scan_parquet(str(f)) for f in parquet_files])
-        .sort(["doc_id", "byte_offset"])
-        .collect()
-    )
+    return TokenStore(seg_data_dir).scan().sort(["doc_id", "byte_offset"]).collect()
 
 
 def _build_bigram_df(tokens: pl.DataFrame) -> pl.DataFrame:
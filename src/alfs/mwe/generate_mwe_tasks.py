@@ -18,11 +18,9 @@ from pathlib import Path
 import random
 import uuid
 
-import polars as pl
-
+from alfs.data_models.doc_store import DocStore
 from alfs.data_models.mwe_queue import MWEQueue
 from alfs.data_models.occurrence import Occurrence
-from alfs.encoding import context_window as _context_window
 from alfs.mwe.find_occurrences import (
     MWECorpus,
     mwe_form_from_components,
@@ -54,6 +52,7 @@ def run(
     corpus = MWECorpus(seg_data_dir)
 
     rng = random.Random(seed)
+    doc_store = DocStore.open(docs)
     generated = 0
 
     for entry in entries:
@@ -70,31 +69,17 @@ def run(
         # Sample occurrences for context extraction
         sampled = rng.sample(occs, min(max_contexts, len(occs)))
 
-        # Load needed docs
-        needed_doc_ids = list({o.doc_id for o in sampled})
-        docs_df = (
-            pl.scan_parquet(str(docs))
-            .filter(pl.col("doc_id").is_in(needed_doc_ids))
-            .collect(engine="streaming")
-        )
-        docs_map = dict(
-            zip(
-                docs_df["doc_id"].to_list(),
-                docs_df["text"].to_list(),
-                strict=False,
-            )
-        )
-
         # Extract contexts
         form = mwe_form_from_components(entry.components)
         contexts: list[str] = []
         occurrence_refs: list[Occurrence] = []
         for occ in sampled:
-            text = docs_map.get(occ.doc_id, "")
-            if not text:
+            window = doc_store.context_window(
+                occ.doc_id, occ.byte_offset, form, context_chars
+            )
+            if window is None:
                 continue
-            snippet, _ = _context_window(text, occ.byte_offset, form, context_chars)
-            contexts.append(snippet)
+            contexts.append(window[0])
             occurrence_refs.append(occ)
 
         if not contexts:
@@ -11,6 +11,7 @@ from alfs.data_models.alf import Alf, Sense
 from alfs.data_models.pos import PartOfSpeech
 from alfs.data_models.sense_store import SenseStore
 from alfs.mwe.populate_seg_data import find_mwe_forms, populate
+from alfs.seg.token_store import TokenStore
 
 
 @pytest.fixture()
@@ -96,7 +97,7 @@ def test_populate_basic(tmp_path: Path, seg_data_dir: Path, senses_db: Path):
     assert n >= 1
 
     # Verify the MWE form now appears in seg data
-    a_parquet = pl.read_parquet(seg_data_dir / "a" / "occurrences.parquet")
+    a_parquet = TokenStore(seg_data_dir).scan("a").collect()
     mwe_rows = a_parquet.filter(pl.col("form") == "a priori")
     assert len(mwe_rows) >= 1
     assert mwe_rows["doc_id"][0] == "d1"
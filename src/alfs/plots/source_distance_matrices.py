@@ -26,6 +26,7 @@ import numpy as np
 import polars as pl
 from scipy.spatial.distance import jensenshannon  # type: ignore[import-untyped]
 
+from alfs.data_models.doc_corpus import read_docs
 from alfs.data_models.occurrence_store import OccurrenceStore
 
 
@@ -37,8 +38,12 @@ def main() -> None:
     parser.add_argument("--min-per-source", type=int, default=3)
     args = parser.parse_args()
 
-    labeled = OccurrenceStore(Path(args.labeled_db)).to_polars()
-    docs = pl.read_parquet(args.docs, columns=["doc_id", "source"]).drop_nulls("source")
+    labeled = (
+        OccurrenceStore(Path(args.labeled_db))
+        .scan(columns=["form", "doc_id", "sense_key"])
+        .collect()
+    )
+    docs = read_docs(Path(args.docs), columns=["doc_id", "source"]).drop_nulls("source")
     df = labeled.join(docs, on="doc_id", how="inner").select(
         ["form", "source", "sense_key"]
     )
@@ -31,6 +31,7 @@ import polars as pl
 from scipy.spatial.distance import jensenshannon  # type: ignore[import-untyped]
 from scipy.stats import linregress, spearmanr  # type: ignore[import-untyped]
 
+from alfs.data_models.doc_corpus import read_docs
 from alfs.data_models.occurrence_store import OccurrenceStore
 from alfs.data_models.sense_store import SenseStore
 
@@ -71,8 +72,12 @@ def main() -> None:
     args = parser.parse_args()
 
     # --- load data ---
-    labeled = OccurrenceStore(Path(args.labeled_db)).to_polars()
-    docs = pl.read_parquet(args.docs, columns=["doc_id", "source"]).drop_nulls("source")
+    labeled = (
+        OccurrenceStore(Path(args.labeled_db))
+        .scan(columns=["form", "doc_id", "sense_key"])
+        .collect()
+    )
+    docs = read_docs(Path(args.docs), columns=["doc_id", "source"]).drop_nulls("source")
     corpus_counts: dict[str, int] = {
         k: v
         for k, v in json.loads(Path(args.corpus_counts).read_text()).items()
@@ -0,0 +1,30 @@
+"""Rebuild the materialized form_counts/sense_counts tables in labeled.db.
+
+The tables are kept current by triggers and backfilled automatically the first
+time an older database is opened; run this only to repair counts after labeled
+was edited with the triggers missing.
+
+Usage:
+    python -m alfs.qc.rebuild_counts --labeled-db labeled.db
+"""
+
+import argparse
+from pathlib import Path
+
+from alfs.data_models.occurrence_store import OccurrenceStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Rebuild per-form and per-sense label counts in labeled.db"
+    )
+    parser.add_argument("--labeled-db", required=True, help="Path to labeled.db")
+    args = parser.parse_args()
+
+    occ_store = OccurrenceStore(Path(args.labeled_db))
+    occ_store.rebuild_counts()
+    print(f"Rebuilt counts for {len(occ_store.count_by_form())} forms")
+
+
+if __name__ == "__main__":
+    main()
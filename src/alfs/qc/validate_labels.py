@@ -1,12 +1,15 @@
 """Validate that labeled.db byte_offsets still resolve to the expected form."""
 
 import argparse
+from collections import defaultdict
 from pathlib import Path
 import sys
 
 import polars as pl
 
+from alfs.data_models.doc_corpus import read_docs
 from alfs.data_models.occurrence_store import OccurrenceStore
+from alfs.encoding import char_offsets
 
 
 def validate(labeled: pl.DataFrame, docs: pl.DataFrame) -> pl.DataFrame:
@@ -19,16 +22,23 @@ def validate(labeled: pl.DataFrame, docs: pl.DataFrame) -> pl.DataFrame:
     when docs are removed.
     """
     docs_map = dict(zip(docs["doc_id"].to_list(), docs["text"].to_list(), strict=False))
+    # Group rows by doc so each doc's offsets are mapped in a single pass.
+    rows_by_doc: dict[str, list[int]] = defaultdict(list)
+    for i, doc_id in enumerate(labeled["doc_id"].to_list()):
+        rows_by_doc[doc_id].append(i)
+    forms = labeled["form"].to_list()
+    byte_offsets = labeled["byte_offset"].to_list()
     stale_indices = []
-    for i, row in enumerate(labeled.iter_rows(named=True)):
-        text = docs_map.get(row["doc_id"])
+    for doc_id, rows in rows_by_doc.items():
+        text = docs_map.get(doc_id)
         if text is None:
-            continue  # orphaned label — not flagged
-        char_offset = len(text.encode()[: row["byte_offset"]].decode())
-        form = row["form"]
-        if text[char_offset : char_offset + len(form)].lower() != form.lower():
-            stale_indices.append(i)
-    return labeled[stale_indices]
+            continue  # orphaned labels — not flagged
+        offsets = char_offsets(text, [byte_offsets[i] for i in rows])
+        for i, char_offset in zip(rows, offsets, strict=True):
+            form = forms[i]
+            if text[char_offset : char_offset + len(form)].lower() != form.lower():
+                stale_indices.append(i)
+    return labeled[sorted(stale_indices)]
 
 
 def main() -> None:
@@ -41,7 +51,7 @@ def main() -> None:
 
     occ_store = OccurrenceStore(Path(args.labeled_db))
     labeled = occ_store.to_polars()
-    docs = pl.read_parquet(args.docs)
+    docs = read_docs(Path(args.docs))
 
     stale = validate(labeled, docs)
     total = len(labeled)
@@ -82,3 +82,21 @@ def test_mixed_returns_only_stale():
 
     assert len(stale) == 1
     assert stale["form"][0] == "goodbye"
+
+
+def test_multibyte_docs_keep_row_order():
+    text = "café au lait, naïve café"
+    labeled = _labeled(
+        [
+            ("café", "d2", len("café au lait, naïve ".encode()), "1", 2),  # valid
+            ("tea", "d1", 0, "1", 2),  # stale
+            ("naïve", "d2", len("café au lait, ".encode()), "1", 2),  # valid
+            ("lait", "d2", len("café au ".encode()) + 1, "1", 2),  # stale
+            ("café", "d2", 0, "1", 2),  # valid
+        ]
+    )
+    docs = _docs([("d1", "coffee"), ("d2", text)])
+
+    stale = validate(labeled, docs)
+
+    assert stale["form"].to_list() == ["tea", "lait"]
@@ -2,7 +2,8 @@
 
 Usage:
     python -m alfs.seg.aggregate_occurrences \
-        --occurrences raw_occurrences.parquet --output-dir by_prefix/ [--merge]
+        --occurrences raw_occurrences.parquet --output-dir by_prefix/ [--merge] \
+        [--workers 4] [--sharding first_letter|two_letter|hash:N]
 """
 
 import argparse
@@ -10,51 +11,40 @@ from pathlib import Path
 
 import polars as pl
 
-
-def prefix(form: str) -> str:
-    if form and form[0].lower() in "abcdefghijklmnopqrstuvwxyz":
-        return form[0].lower()
-    return "other"
-
-
-def aggregate(df: pl.DataFrame, output_dir: Path, merge: bool = False) -> None:
+from alfs.seg.segment_docs import (
+    DEFAULT_TOKENIZER,
+    SEGMENTER_VERSION,
+    TOKENIZERS,
+    segmenter_version,
+)
+from alfs.seg.sharding import Sharding
+from alfs.seg.sharding import prefix as prefix
+from alfs.seg.token_store import WRITE_WORKERS, TokenStore
+
+
+def aggregate(
+    df: pl.DataFrame,
+    output_dir: Path,
+    merge: bool = False,
+    workers: int = WRITE_WORKERS,
+    sharding: Sharding | None = None,
+    segmenter: str | None = SEGMENTER_VERSION,
+) -> None:
     """Write df to by_prefix layout under output_dir.
 
-    merge=True: read existing parquet, concat, re-sort, write.
+    merge=True: combine with existing rows of each touched prefix.
     merge=False: overwrite (original behaviour).
+    workers: number of threads writing prefix segments.
+    sharding: scheme for a new layout; an existing layout keeps its own.
+    segmenter: recorded against each written doc in the segmented-docs file.
 
     Forms are stored with their original case. Callers that want case-agnostic
     lookup should filter with pl.col("form").str.to_lowercase() == form.lower().
+    See alfs.seg.token_store for the on-disk format.
     """
-    df = df.with_columns(
-        pl.col("form")
-        .map_elements(
-            prefix,
-            return_dtype=pl.String,
-        )
-        .alias("prefix")
+    TokenStore(output_dir).write(
+        df, merge=merge, workers=workers, sharding=sharding, segmenter=segmenter
     )
-
-    prefixes = df["prefix"].unique().sort().to_list()
-    print(f"Writing {len(prefixes)} prefix groups to {output_dir}...")
-
-    for pfx in prefixes:
-        group = (
-            df.filter(pl.col("prefix") == pfx)
-            .drop("prefix")
-            .sort(["form", "doc_id", "byte_offset"])
-        )
-        prefix_dir = output_dir / pfx
-        prefix_dir.mkdir(parents=True, exist_ok=True)
-        out_path = prefix_dir / "occurrences.parquet"
-
-        if merge and out_path.exists():
-            existing = pl.read_parquet(out_path)
-            group = pl.concat([existing, group]).sort(["form", "doc_id", "byte_offset"])
-
-        group.write_parquet(out_path)
-        print(f"  {pfx}: {len(group)} rows → {out_path}")
-
     print("Done.")
 
 
@@ -74,13 +64,43 @@ def main() -> None:
         action="store_true",
         help="Merge into existing parquets instead of overwriting",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WRITE_WORKERS,
+        help="Number of threads writing prefix segments",
+    )
+    parser.add_argument(
+        "--sharding",
+        type=Sharding.parse,
+        default=None,
+        help="Sharding for a new layout: first_letter, two_letter or hash:N",
+    )
+    parser.add_argument(
+        "--tokenizer",
+        choices=sorted(TOKENIZERS),
+        default=DEFAULT_TOKENIZER,
+        help="Tokenizer backend segment_docs ran with",
+    )
+    parser.add_argument(
+        "--segmenter",
+        default=None,
+        help="Segmenter version recorded for each doc (default: from --tokenizer)",
+    )
     args = parser.parse_args()
 
     print(f"Loading occurrences from {args.occurrences}...")
     df = pl.read_parquet(args.occurrences)
     print(f"Loaded {len(df)} occurrences")
 
-    aggregate(df, Path(args.output_dir), merge=args.merge)
+    aggregate(
+        df,
+        Path(args.output_dir),
+        merge=args.merge,
+        workers=args.workers,
+        sharding=args.sharding,
+        segmenter=args.segmenter or segmenter_version(args.tokenizer),
+    )
 
 
 if __name__ == "__main__":
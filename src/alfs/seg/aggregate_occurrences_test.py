@@ -3,6 +3,7 @@ from pathlib import Path
 import polars as pl
 
 from alfs.seg.aggregate_occurrences import aggregate
+from alfs.seg.token_store import TokenStore
 
 
 def _make_occ_df(rows: list[tuple[str, str, int]]) -> pl.DataFrame:
@@ -18,8 +19,7 @@ def _make_occ_df(rows: list[tuple[str, str, int]]) -> pl.DataFrame:
 def test_aggregate_creates_prefix_dirs(tmp_path: Path) -> None:
     df = _make_occ_df([("apple", "doc1", 0), ("banana", "doc2", 5)])
     aggregate(df, tmp_path)
-    assert (tmp_path / "a" / "occurrences.parquet").exists()
-    assert (tmp_path / "b" / "occurrences.parquet").exists()
+    assert TokenStore(tmp_path).prefixes() == ["a", "b"]
 
 
 def test_aggregate_merge_true_preserves_existing_rows(tmp_path: Path) -> None:
@@ -29,7 +29,7 @@ def test_aggregate_merge_true_preserves_existing_rows(tmp_path: Path) -> None:
     new_row = _make_occ_df([("arc", "doc2", 10)])
     aggregate(new_row, tmp_path, merge=True)
 
-    result = pl.read_parquet(tmp_path / "a" / "occurrences.parquet")
+    result = TokenStore(tmp_path).scan("a").collect()
     assert set(result["doc_id"].to_list()) == {"doc1", "doc2"}
     assert len(result) == 2
 
@@ -37,10 +37,10 @@ def test_aggregate_merge_true_preserves_existing_rows(tmp_path: Path) -> None:
 def test_aggregate_preserves_original_case(tmp_path: Path) -> None:
     df = _make_occ_df([("Aaron", "doc1", 0), ("aaron", "doc2", 5), ("DOGS", "doc3", 0)])
     aggregate(df, tmp_path)
-    result = pl.read_parquet(tmp_path / "a" / "occurrences.parquet")
+    result = TokenStore(tmp_path).scan("a").collect()
     forms = set(result["form"].to_list())
     assert forms == {"Aaron", "aaron"}
-    result_d = pl.read_parquet(tmp_path / "d" / "occurrences.parquet")
+    result_d = TokenStore(tmp_path).scan("d").collect()
     assert result_d["form"].to_list() == ["DOGS"]
 
 
@@ -51,6 +51,6 @@ def test_aggregate_merge_false_overwrites(tmp_path: Path) -> None:
     new_row = _make_occ_df([("arc", "doc2", 10)])
     aggregate(new_row, tmp_path, merge=False)
 
-    result = pl.read_parquet(tmp_path / "a" / "occurrences.parquet")
+    result = TokenStore(tmp_path).scan("a").collect()
     assert result["doc_id"].to_list() == ["doc2"]
     assert len(result) == 1
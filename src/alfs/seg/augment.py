@@ -1,63 +1,227 @@
 """Incrementally segment new docs and merge into the by_prefix layout.
 
+Worker results stream into spill files under --work-dir (default
+<seg-data-dir>.augment) as Arrow batches: every FLUSH_TOKENS tokens the
+buffered batches are written to a new spill-NNNNNN.parquet, and the spill and
+the doc_ids it completes are then appended to checkpoint.jsonl. A rerun after
+an interruption skips checkpointed docs and drops spill files the checkpoint
+does not list. Once every doc is segmented, the spill files are merged into
+by_prefix in one pass and the work dir is removed.
+
 Usage:
     python -m alfs.seg.augment \
         --docs ../text_data/docs.parquet \
         --seg-data-dir ../seg_data/by_prefix \
-        [--workers 8]
+        [--workers 8] [--work-dir ../seg_data/by_prefix.augment] \
+        [--tokenizer blank|model]
 """
 
 import argparse
+from collections.abc import Iterator
+import json
 import multiprocessing
+import os
 from pathlib import Path
+import shutil
 
 import polars as pl
 import pyarrow as pa  # type: ignore[import-untyped]
-import spacy
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
 
+from alfs.data_models.doc_corpus import scan_docs
+from alfs.encoding import ByteOffsetMapper
 from alfs.seg.aggregate_occurrences import aggregate
-from alfs.seg.segment_docs import iter_chunks
-
-PA_SCHEMA = pa.schema(
-    [
-        ("form", pa.string()),
-        ("doc_id", pa.string()),
-        ("byte_offset", pa.int64()),
-    ]
+from alfs.seg.segment_docs import (
+    DEFAULT_TOKENIZER,
+    FLUSH_TOKENS,
+    PA_SCHEMA,
+    TOKENIZERS,
+    iter_chunks,
+    load_nlp,
+    segmenter_version,
 )
+from alfs.seg.token_store import TokenStore
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
 
 _nlp = None
 
 
-def _init_worker() -> None:
+def _init_worker(tokenizer: str = DEFAULT_TOKENIZER) -> None:
     global _nlp
-    _nlp = spacy.load("en_core_web_sm")
+    _nlp = load_nlp(tokenizer)
 
 
-def _segment_doc(args: tuple[str, str]) -> list[tuple[str, str, int]]:
-    """Segment a single doc; returns list of (form, doc_id, byte_offset)."""
+def _segment_doc(args: tuple[str, str]) -> tuple[str, pa.RecordBatch]:
+    """Segment a single doc; returns (doc_id, batch of PA_SCHEMA rows)."""
     text, doc_id = args
-    rows: list[tuple[str, str, int]] = []
+    forms: list[str] = []
+    offsets: list[int] = []
+    doc_mapper = ByteOffsetMapper(text)
     for chunk, chunk_start_chars in iter_chunks(text):
-        chunk_start_bytes = len(text[:chunk_start_chars].encode())
+        chunk_start_bytes = doc_mapper.byte_offset(chunk_start_chars)
         assert _nlp is not None
         spacy_doc = _nlp(chunk)
+        chunk_mapper = ByteOffsetMapper(chunk)
         for token in spacy_doc:
-            byte_offset = chunk_start_bytes + len(chunk[: token.idx].encode())
-            rows.append((token.text, doc_id, byte_offset))
-    return rows
+            forms.append(token.text)
+            offsets.append(chunk_start_bytes + chunk_mapper.byte_offset(token.idx))
+    batch = pa.record_batch([forms, [doc_id] * len(forms), offsets], schema=PA_SCHEMA)
+    return doc_id, batch
 
 
 def _get_segmented_doc_ids(seg_data_dir: Path) -> set[str]:
-    """Collect all doc_ids already present in by_prefix parquets."""
-    parquets = list(seg_data_dir.glob("*/occurrences.parquet"))
-    if not parquets:
-        return set()
-    doc_ids: set[str] = set()
-    for p in parquets:
-        df = pl.read_parquet(p, columns=["doc_id"])
-        doc_ids.update(df["doc_id"].to_list())
-    return doc_ids
+    """Doc_ids recorded in the by_prefix segmented-docs file."""
+    return TokenStore(seg_data_dir).doc_ids()
+
+
+def load_checkpoint(work_dir: Path) -> tuple[list[Path], set[str]]:
+    """Return (spill files, completed doc_ids) recorded in work_dir.
+
+    Spill files not listed in the checkpoint are discarded. The file is
+    truncated after its last complete line, so a line cut short by a crash is
+    dropped rather than joined to the next append.
+    """
+    spills: list[Path] = []
+    done: set[str] = set()
+    path = work_dir / CHECKPOINT_FILE
+    if path.exists():
+        data = path.read_bytes()
+        valid = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            spills.append(work_dir / entry["spill"])
+            done.update(entry["doc_ids"])
+            valid += len(line)
+        if valid < len(data):
+            os.truncate(path, valid)
+    for stray in work_dir.glob("spill-*"):
+        if stray not in spills:
+            stray.unlink()
+    return spills, done
+
+
+def _write_spill(
+    work_dir: Path, seq: int, batches: list[pa.RecordBatch], doc_ids: list[str]
+) -> None:
+    """Write batches to spill-<seq>.parquet, then checkpoint their docs."""
+    name = f"spill-{seq:06d}.parquet"
+    tmp = work_dir / (name + ".tmp")
+    pq.write_table(pa.Table.from_batches(batches, schema=PA_SCHEMA), tmp)
+    os.replace(tmp, work_dir / name)
+    with open(work_dir / CHECKPOINT_FILE, "a") as f:
+        f.write(json.dumps({"spill": name, "doc_ids": doc_ids}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _iter_results(
+    tasks: list[tuple[str, str]], workers: int, tokenizer: str
+) -> Iterator[tuple[str, pa.RecordBatch]]:
+    if workers <= 1:
+        if _nlp is None:
+            _init_worker(tokenizer)
+        yield from map(_segment_doc, tasks)
+        return
+    with multiprocessing.Pool(
+        processes=workers, initializer=_init_worker, initargs=(tokenizer,)
+    ) as pool:
+        yield from pool.imap_unordered(_segment_doc, tasks)
+
+
+def segment_to_spills(
+    tasks: list[tuple[str, str]],
+    work_dir: Path,
+    workers: int,
+    first_seq: int = 0,
+    flush_tokens: int = FLUSH_TOKENS,
+    tokenizer: str = DEFAULT_TOKENIZER,
+) -> int:
+    """Segment (text, doc_id) tasks into checkpointed spill files.
+
+    Returns the number of spill files written.
+    """
+    work_dir.mkdir(parents=True, exist_ok=True)
+    batches: list[pa.RecordBatch] = []
+    doc_ids: list[str] = []
+    n_buffered = 0
+    seq = first_seq
+    for i, (doc_id, batch) in enumerate(_iter_results(tasks, workers, tokenizer), 1):
+        batches.append(batch)
+        doc_ids.append(doc_id)
+        n_buffered += batch.num_rows
+        if n_buffered >= flush_tokens:
+            _write_spill(work_dir, seq, batches, doc_ids)
+            seq += 1
+            batches, doc_ids, n_buffered = [], [], 0
+        if i % 100 == 0 or i == len(tasks):
+            print(f"  Segmented {i}/{len(tasks)} docs...", end="\r")
+    if doc_ids:
+        _write_spill(work_dir, seq, batches, doc_ids)
+        seq += 1
+    print()
+    return seq - first_seq
+
+
+def run(
+    docs_path: Path,
+    seg_data_dir: Path,
+    work_dir: Path,
+    workers: int = 8,
+    flush_tokens: int = FLUSH_TOKENS,
+    tokenizer: str = DEFAULT_TOKENIZER,
+) -> None:
+    # 1. Find already-segmented and checkpointed doc_ids
+    segmented_ids = _get_segmented_doc_ids(seg_data_dir)
+    print(f"Already segmented: {len(segmented_ids)} docs")
+    spills, checkpointed = load_checkpoint(work_dir)
+    if checkpointed:
+        print(f"Resuming: {len(checkpointed)} docs in {len(spills)} spill files")
+
+    # 2. Load corpus and filter to new docs
+    print(f"Loading docs from {docs_path}...")
+    skip = pl.Series(list(segmented_ids | checkpointed), dtype=pl.String)
+    new_docs = (
+        scan_docs(docs_path)
+        .filter(~pl.col("doc_id").is_in(skip.implode()))
+        .collect(engine="streaming")
+    )
+    print(f"New docs to segment: {len(new_docs)}")
+
+    # 3. Segment into spill files
+    if len(new_docs) > 0:
+        tasks = [(row["text"], row["doc_id"]) for row in new_docs.iter_rows(named=True)]
+        segment_to_spills(
+            tasks,
+            work_dir,
+            workers,
+            first_seq=len(spills),
+            flush_tokens=flush_tokens,
+            tokenizer=tokenizer,
+        )
+        spills, _ = load_checkpoint(work_dir)
+
+    if not spills:
+        print("Nothing to do.")
+        return
+
+    # 4. Merge the spill files into by_prefix layout in one pass. Docs merged
+    # by an earlier run that died before removing work_dir are filtered out.
+    merged = pl.Series(list(segmented_ids), dtype=pl.String)
+    df = (
+        pl.scan_parquet(spills)
+        .filter(~pl.col("doc_id").is_in(merged.implode()))
+        .collect()
+    )
+    print(f"Total occurrences: {len(df):,}")
+    if len(df) > 0:
+        aggregate(df, seg_data_dir, merge=True, segmenter=segmenter_version(tokenizer))
+    shutil.rmtree(work_dir)
 
 
 def main() -> None:
@@ -73,45 +237,32 @@ def main() -> None:
     parser.add_argument(
         "--workers", type=int, default=8, help="Number of worker processes"
     )
+    parser.add_argument(
+        "--work-dir",
+        default=None,
+        help="Spill/checkpoint directory (default: <seg-data-dir>.augment)",
+    )
+    parser.add_argument(
+        "--tokenizer",
+        choices=sorted(TOKENIZERS),
+        default=DEFAULT_TOKENIZER,
+        help="Tokenizer backend",
+    )
     args = parser.parse_args()
 
     seg_data_dir = Path(args.seg_data_dir)
-
-    # 1. Find already-segmented doc_ids
-    segmented_ids = _get_segmented_doc_ids(seg_data_dir)
-    print(f"Already segmented: {len(segmented_ids)} docs")
-
-    # 2. Load corpus and filter to new docs
-    print(f"Loading docs from {args.docs}...")
-    all_docs = pl.read_parquet(args.docs)
-    new_docs = all_docs.filter(~pl.col("doc_id").is_in(list(segmented_ids)))
-    print(f"New docs to segment: {len(new_docs)}")
-
-    if len(new_docs) == 0:
-        print("Nothing to do.")
-        return
-
-    # 3. Segment with multiprocessing pool
-    tasks = [(row["text"], row["doc_id"]) for row in new_docs.iter_rows(named=True)]
-
-    all_rows: list[tuple[str, str, int]] = []
-    with multiprocessing.Pool(processes=args.workers, initializer=_init_worker) as pool:
-        for i, result in enumerate(pool.imap_unordered(_segment_doc, tasks), 1):
-            all_rows.extend(result)
-            if i % 100 == 0 or i == len(tasks):
-                print(f"  Segmented {i}/{len(tasks)} docs...", end="\r")
-    print()
-
-    # 4. Build DataFrame and merge into by_prefix layout
-    df = pl.DataFrame(
-        {
-            "form": [r[0] for r in all_rows],
-            "doc_id": [r[1] for r in all_rows],
-            "byte_offset": [r[2] for r in all_rows],
-        }
+    work_dir = (
+        Path(args.work_dir)
+        if args.work_dir
+        else seg_data_dir.with_name(seg_data_dir.name + ".augment")
+    )
+    run(
+        Path(args.docs),
+        seg_data_dir,
+        work_dir,
+        workers=args.workers,
+        tokenizer=args.tokenizer,
     )
-    print(f"Total occurrences: {len(df):,}")
-    aggregate(df, seg_data_dir, merge=True)
 
 
 if __name__ == "__main__":
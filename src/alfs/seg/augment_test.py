@@ -1,8 +1,13 @@
 from pathlib import Path
 
 import polars as pl
+import pyarrow as pa  # type: ignore[import-untyped]
+import pytest
+import spacy
 
+from alfs.seg import augment, segment_docs
 from alfs.seg.augment import _get_segmented_doc_ids
+from alfs.seg.token_store import TokenStore
 
 
 def _write_occ_parquet(path: Path, doc_ids: list[str]) -> None:
@@ -24,3 +29,109 @@ def test_get_segmented_doc_ids_collects_ids_across_prefixes(tmp_path: Path) -> N
     _write_occ_parquet(tmp_path / "a" / "occurrences.parquet", ["abc"])
     _write_occ_parquet(tmp_path / "b" / "occurrences.parquet", ["xyz"])
     assert _get_segmented_doc_ids(tmp_path) == {"abc", "xyz"}
+
+
+def test_segment_doc_byte_offsets(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(augment, "_nlp", spacy.blank("en"))
+    monkeypatch.setattr(segment_docs, "CHUNK_SIZE", 8)
+    text = "naïve café über alles"
+    doc_id, batch = augment._segment_doc((text, "d1"))
+    rows = [(r["form"], r["doc_id"], r["byte_offset"]) for r in batch.to_pylist()]
+    encoded = text.encode()
+    assert doc_id == "d1"
+    assert [form for form, _, _ in rows] == text.split()
+    for form, doc_id, offset in rows:
+        assert doc_id == "d1"
+        assert encoded[offset : offset + len(form.encode())].decode() == form
+
+
+@pytest.fixture
+def blank_nlp(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(augment, "_nlp", spacy.blank("en"))
+
+
+def _docs(tmp_path: Path, n: int) -> Path:
+    path = tmp_path / "docs.parquet"
+    pl.DataFrame(
+        {"doc_id": [f"d{i}" for i in range(n)], "text": [f"w{i} x y" for i in range(n)]}
+    ).write_parquet(path)
+    return path
+
+
+def _seg_rows(seg_dir: Path) -> list[tuple[str, str, int]]:
+    return sorted(TokenStore(seg_dir).scan().collect().iter_rows())
+
+
+@pytest.mark.usefixtures("blank_nlp")
+def test_run_merges_spills_and_removes_work_dir(tmp_path: Path) -> None:
+    seg_dir, work_dir = tmp_path / "seg", tmp_path / "work"
+    augment.run(_docs(tmp_path, 5), seg_dir, work_dir, workers=1, flush_tokens=4)
+    assert len(_seg_rows(seg_dir)) == 15
+    assert not work_dir.exists()
+    augment.run(_docs(tmp_path, 6), seg_dir, work_dir, workers=1, flush_tokens=4)
+    assert len(_seg_rows(seg_dir)) == 18
+    segmenters = TokenStore(seg_dir).segmented_docs()["segmenter"].unique()
+    assert segmenters.to_list() == [segment_docs.segmenter_version("blank")]
+
+
+@pytest.mark.usefixtures("blank_nlp")
+def test_run_resumes_after_interruption(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    docs = _docs(tmp_path, 6)
+    seg_dir, work_dir = tmp_path / "seg", tmp_path / "work"
+    segment_doc = augment._segment_doc
+    segmented: list[str] = []
+
+    def crash_on_d4(args: tuple[str, str]) -> tuple[str, pa.RecordBatch]:
+        if args[1] == "d4":
+            raise KeyboardInterrupt
+        segmented.append(args[1])
+        return segment_doc(args)
+
+    monkeypatch.setattr(augment, "_segment_doc", crash_on_d4)
+    with pytest.raises(KeyboardInterrupt):
+        augment.run(docs, seg_dir, work_dir, workers=1, flush_tokens=6)
+    spills, done = augment.load_checkpoint(work_dir)
+    assert done == {"d0", "d1", "d2", "d3"}
+    assert len(spills) == 2
+    assert not seg_dir.exists()
+
+    (work_dir / "spill-000009.parquet").write_bytes(b"partial")
+    segmented.clear()
+    monkeypatch.setattr(augment, "_segment_doc", segment_doc)
+    augment.run(docs, seg_dir, work_dir, workers=1, flush_tokens=6)
+    expected = tmp_path / "expected"
+    augment.run(docs, expected, tmp_path / "work2", workers=1)
+    assert _seg_rows(seg_dir) == _seg_rows(expected)
+    assert not work_dir.exists()
+
+
+@pytest.mark.usefixtures("blank_nlp")
+def test_run_skips_spills_already_merged(tmp_path: Path) -> None:
+    seg_dir, work_dir = tmp_path / "seg", tmp_path / "work"
+    augment.run(_docs(tmp_path, 1), seg_dir, tmp_path / "done", workers=1)
+    # A previous run merged d0 but died before removing its work dir.
+    augment.segment_to_spills([("w0 x y", "d0"), ("w1 x y", "d1")], work_dir, 1)
+    augment.run(_docs(tmp_path, 3), seg_dir, work_dir, workers=1)
+    rows = _seg_rows(seg_dir)
+    assert len(rows) == len(set(rows)) == 9
+
+
+def test_load_checkpoint_drops_torn_line_and_keeps_later_spills(
+    tmp_path: Path,
+) -> None:
+    batch = pa.record_batch([["a"], ["d0"], [0]], schema=augment.PA_SCHEMA)
+    augment._write_spill(tmp_path, 0, [batch], ["d0"])
+    with open(tmp_path / augment.CHECKPOINT_FILE, "a") as f:
+        f.write('{"spill": "spill-000001.parquet", "doc_ids": ["d1", "d')
+    augment.load_checkpoint(tmp_path)
+    augment._write_spill(tmp_path, 1, [batch], ["d2"])
+    augment._write_spill(tmp_path, 2, [batch], ["d3"])
+    spills, done = augment.load_checkpoint(tmp_path)
+    assert [p.name for p in spills] == [
+        "spill-000000.parquet",
+        "spill-000001.parquet",
+        "spill-000002.parquet",
+    ]
+    assert done == {"d0", "d2", "d3"}
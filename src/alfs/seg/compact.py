@@ -0,0 +1,44 @@
+"""Fold by_prefix delta segments into a single base segment per prefix.
+
+Merged aggregation appends a small delta segment per touched prefix and folds
+them automatically once a prefix has more than MAX_DELTAS; run this to compact
+everything ahead of a read-heavy step, or to convert a legacy string layout.
+--reshard rewrites the whole layout under another sharding scheme.
+
+Usage:
+    python -m alfs.seg.compact --seg-data-dir by_prefix/ [--prefix a]
+    python -m alfs.seg.compact --seg-data-dir by_prefix/ --reshard hash:64
+"""
+
+import argparse
+from pathlib import Path
+
+from alfs.seg.sharding import Sharding
+from alfs.seg.token_store import TokenStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compact by_prefix occurrence segments"
+    )
+    parser.add_argument("--seg-data-dir", required=True, help="by_prefix directory")
+    parser.add_argument("--prefix", default=None, help="Only compact this prefix")
+    parser.add_argument(
+        "--reshard",
+        type=Sharding.parse,
+        default=None,
+        help="Rewrite into this sharding: first_letter, two_letter or hash:N",
+    )
+    args = parser.parse_args()
+
+    store = TokenStore(Path(args.seg_data_dir))
+    if args.reshard is not None:
+        store.reshard(args.reshard)
+        print(f"Resharded into {len(store.prefixes())} prefixes ({args.reshard})")
+        return
+    compacted = store.compact(args.prefix)
+    print(f"Compacted {len(compacted)} prefixes")
+
+
+if __name__ == "__main__":
+    main()
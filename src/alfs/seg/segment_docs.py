@@ -1,19 +1,66 @@
 """Tokenize docs and emit (form, doc_id, byte_offset) tuples.
 
+Only spaCy's tokenizer is used. The default "blank" backend is spacy.blank("en"),
+which has the same English tokenizer rules as SPACY_MODEL but skips loading the
+trained pipeline; --tokenizer model loads SPACY_MODEL with everything but the
+tokenizer excluded.  With --n-process > 1, chunks are fanned out across worker
+processes by nlp.pipe, which is an alternative to Nextflow-level sharding when
+running on a single many-core machine.
+
 Usage:
-    python -m alfs.etl.segment_docs \
-        --docs docs.parquet --output raw_occurrences.parquet
+    python -m alfs.seg.segment_docs \
+        --docs docs.parquet --output raw_occurrences.parquet \
+        [--n-process 8] [--batch-size 64] [--tokenizer blank|model]
 """
 
 import argparse
-from collections.abc import Iterator
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+import time
 
-import polars as pl
 import pyarrow as pa  # type: ignore[import-untyped]
 import pyarrow.parquet as pq  # type: ignore[import-untyped]
 import spacy
+from spacy.language import Language
+
+from alfs.data_models.doc_corpus import read_docs
+from alfs.encoding import ByteOffsetMapper
 
 CHUNK_SIZE = 800_000
+SPACY_MODEL = "en_core_web_sm"
+# Components of SPACY_MODEL that do not affect tokenization.
+UNUSED_PIPES = [
+    "tok2vec",
+    "tagger",
+    "parser",
+    "attribute_ruler",
+    "lemmatizer",
+    "ner",
+    "senter",
+]
+# Tokenizer backends by name. Each must split text exactly as SPACY_MODEL's
+# tokenizer does (see the parity tests in segment_docs_test.py), so the choice
+# affects speed only.
+TOKENIZERS: dict[str, Callable[[], Language]] = {
+    "blank": lambda: spacy.blank("en"),
+    "model": lambda: spacy.load(SPACY_MODEL, exclude=UNUSED_PIPES),
+}
+DEFAULT_TOKENIZER = "blank"
+
+
+def segmenter_version(tokenizer: str = DEFAULT_TOKENIZER) -> str:
+    """Recorded per doc in the by_prefix segmented-docs file.
+
+    Names spaCy's version, whose tokenizer rules may change, and the backend
+    that actually split the doc.
+    """
+    backend = SPACY_MODEL if tokenizer == "model" else f"{tokenizer}-en"
+    return f"spacy-{spacy.__version__}/{backend}"
+
+
+SEGMENTER_VERSION = segmenter_version()
+# Tokens buffered before an Arrow table is handed to the writer.
+FLUSH_TOKENS = 1_000_000
 
 PA_SCHEMA = pa.schema(
     [
@@ -38,6 +85,58 @@ def iter_chunks(text: str) -> Iterator[tuple[str, int]]:
         start = end
 
 
+def load_nlp(tokenizer: str = DEFAULT_TOKENIZER) -> Language:
+    """Load the named TOKENIZERS backend."""
+    if tokenizer not in TOKENIZERS:
+        raise ValueError(
+            f"Unknown tokenizer {tokenizer!r}; choose from {sorted(TOKENIZERS)}"
+        )
+    return TOKENIZERS[tokenizer]()
+
+
+def _iter_doc_chunks(
+    docs: Iterable[tuple[str, str]],
+) -> Iterator[tuple[str, tuple[str, int]]]:
+    """Yield (chunk_text, (doc_id, chunk_start_bytes)) for nlp.pipe(as_tuples)."""
+    for doc_id, text in docs:
+        mapper = ByteOffsetMapper(text)
+        for chunk, chunk_start_chars in iter_chunks(text):
+            yield chunk, (doc_id, mapper.byte_offset(chunk_start_chars))
+
+
+def segment(
+    nlp: Language,
+    docs: Iterable[tuple[str, str]],
+    n_process: int = 1,
+    batch_size: int = 64,
+    flush_tokens: int = FLUSH_TOKENS,
+) -> Iterator[pa.Table]:
+    """Tokenize (doc_id, text) pairs into Arrow tables matching PA_SCHEMA.
+
+    Rows come out in input order.  Columns are accumulated directly and a table
+    is yielded every flush_tokens tokens (and once more at the end).
+    """
+    forms: list[str] = []
+    doc_ids: list[str] = []
+    offsets: list[int] = []
+    for spacy_doc, (doc_id, chunk_start_bytes) in nlp.pipe(
+        _iter_doc_chunks(docs),
+        as_tuples=True,
+        n_process=n_process,
+        batch_size=batch_size,
+    ):
+        mapper = ByteOffsetMapper(spacy_doc.text)
+        for token in spacy_doc:
+            forms.append(token.text)
+            offsets.append(chunk_start_bytes + mapper.byte_offset(token.idx))
+        doc_ids.extend([doc_id] * len(spacy_doc))
+        if len(forms) >= flush_tokens:
+            yield pa.table([forms, doc_ids, offsets], schema=PA_SCHEMA)
+            forms, doc_ids, offsets = [], [], []
+    if forms:
+        yield pa.table([forms, doc_ids, offsets], schema=PA_SCHEMA)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Segment docs into occurrences")
     parser.add_argument("--docs", required=True, help="Path to docs.parquet")
@@ -50,43 +149,53 @@ def main() -> None:
     parser.add_argument(
         "--num-shards", type=int, default=1, help="Total number of shards"
     )
+    parser.add_argument(
+        "--n-process",
+        type=int,
+        default=1,
+        help="Number of spaCy worker processes (nlp.pipe n_process)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Chunks per nlp.pipe batch",
+    )
+    parser.add_argument(
+        "--tokenizer",
+        choices=sorted(TOKENIZERS),
+        default=DEFAULT_TOKENIZER,
+        help="Tokenizer backend",
+    )
     args = parser.parse_args()
 
     print(f"Loading docs from {args.docs}...")
-    df = pl.read_parquet(args.docs)
+    df = read_docs(Path(args.docs))
     print(f"Loaded {len(df)} docs")
     df = df[args.shard_index :: args.num_shards]
     print(f"Shard {args.shard_index}/{args.num_shards}: {len(df)} docs")
 
-    nlp = spacy.load("en_core_web_sm")
+    nlp = load_nlp(args.tokenizer)
 
+    n_tokens = 0
+    start = time.perf_counter()
     with pq.ParquetWriter(args.output, PA_SCHEMA) as writer:
-        for row in df.iter_rows(named=True):
-            doc_id: str = row["doc_id"]
-            text: str = row["text"]
-            rows: list[dict[str, object]] = []
-            for chunk, chunk_start_chars in iter_chunks(text):
-                chunk_start_bytes = len(text[:chunk_start_chars].encode())
-                spacy_doc = nlp(chunk)
-                for token in spacy_doc:
-                    byte_offset = chunk_start_bytes + len(chunk[: token.idx].encode())
-                    rows.append(
-                        {
-                            "form": token.text,
-                            "doc_id": doc_id,
-                            "byte_offset": byte_offset,
-                        }
-                    )
-            table = pa.table(
-                {
-                    "form": [r["form"] for r in rows],
-                    "doc_id": [r["doc_id"] for r in rows],
-                    "byte_offset": [r["byte_offset"] for r in rows],
-                },
-                schema=PA_SCHEMA,
-            )
+        docs = zip(df["doc_id"], df["text"], strict=True)
+        for table in segment(
+            nlp, docs, n_process=args.n_process, batch_size=args.batch_size
+        ):
             writer.write_table(table)
-
+            n_tokens += table.num_rows
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {n_tokens:,} tokens ({n_tokens / elapsed:,.0f} tokens/sec)",
+                end="\r",
+            )
+    elapsed = time.perf_counter() - start
+    print(
+        f"\nSegmented {n_tokens:,} tokens in {elapsed:.1f}s "
+        f"({n_tokens / max(elapsed, 1e-9):,.0f} tokens/sec)"
+    )
     print(f"Done writing {args.output}")
 
 
@@ -1,3 +1,7 @@
+import pytest
+import spacy
+
+from alfs.seg import augment
 import alfs.seg.segment_docs as sd
 from alfs.seg.segment_docs import iter_chunks
 
@@ -47,3 +51,115 @@ def test_iter_chunks_start_positions(monkeypatch):
     first_chunk, first_start = result[0]
     _, second_start = result[1]
     assert second_start == first_start + len(first_chunk)
+
+
+def _segment_rows(docs, **kwargs):
+    nlp = spacy.blank("en")
+    tables = list(sd.segment(nlp, docs, **kwargs))
+    return [row for t in tables for row in zip(*t.to_pydict().values(), strict=True)]
+
+
+def test_segment_byte_offsets():
+    text = "café au lait"
+    rows = _segment_rows([("d1", text)])
+    encoded = text.encode()
+    assert [f for f, _, _ in rows] == ["café", "au", "lait"]
+    for form, doc_id, offset in rows:
+        assert doc_id == "d1"
+        assert encoded[offset : offset + len(form.encode())].decode() == form
+
+
+def test_segment_offsets_across_chunks(monkeypatch):
+    monkeypatch.setattr(sd, "CHUNK_SIZE", 10)
+    text = "naïve résumé über alles ok"
+    rows = _segment_rows([("d1", text)])
+    encoded = text.encode()
+    assert [f for f, _, _ in rows] == text.split()
+    for form, _, offset in rows:
+        assert encoded[offset : offset + len(form.encode())].decode() == form
+
+
+def test_segment_flushes_and_preserves_order():
+    docs = [("d1", "one two three"), ("d2", "four five")]
+    nlp = spacy.blank("en")
+    tables = list(sd.segment(nlp, docs, flush_tokens=2))
+    assert all(t.schema == sd.PA_SCHEMA for t in tables)
+    assert len(tables) == 2
+    rows = [r for t in tables for r in t.column("form").to_pylist()]
+    assert rows == ["one", "two", "three", "four", "five"]
+
+
+def test_segment_multiprocess_matches_single():
+    docs = [(f"d{i}", f"doc {i} has some words, and punctuation!") for i in range(20)]
+    assert _segment_rows(docs, n_process=2, batch_size=4) == _segment_rows(docs)
+
+
+# Fixed corpus for tokenizer parity: contractions, abbreviations, URLs, e-mail,
+# quotes, hyphenation, currency, non-ASCII and a multi-chunk document.
+PARITY_CORPUS = [
+    ("p1", "Don't stop—it's 5:30 p.m. in the U.S.!"),
+    ("p2", "e-mail me at jo@example.com or see https://ex.org/a?b=1."),
+    ("p3", '"Well," she said (quietly), "I can\'t."'),
+    ("p4", "Naïve café-au-lait costs $4.50… 🙂"),
+    ("p5", "  Leading spaces,\ttabs\nand\n\nnewlines; semi-colons: 1,000,000."),
+    ("p6", " ".join(["Mr. Smith's well-known 'quote' isn't over-used."] * 40)),
+]
+
+
+def _forms_and_offsets(nlp, monkeypatch):
+    """(form, byte_offset) rows from segment() and from augment._segment_doc."""
+    monkeypatch.setattr(sd, "CHUNK_SIZE", 200)
+    via_segment = [
+        (form, doc_id, offset)
+        for t in sd.segment(nlp, PARITY_CORPUS)
+        for form, doc_id, offset in zip(*t.to_pydict().values(), strict=True)
+    ]
+    monkeypatch.setattr(augment, "_nlp", nlp)
+    via_augment = [
+        (r["form"], r["doc_id"], r["byte_offset"])
+        for doc_id, text in PARITY_CORPUS
+        for r in augment._segment_doc((text, doc_id))[1].to_pylist()
+    ]
+    return via_segment, via_augment
+
+
+def test_blank_tokenizer_golden_tokens():
+    nlp = sd.load_nlp("blank")
+    expected = {
+        "p1": "Do n't stop — it 's 5:30 p.m. in the U.S. !",
+        "p3": '" Well , " she said ( quietly ) , " I ca n\'t . "',
+        "p4": "Naïve café - au - lait costs $ 4.50 … 🙂",
+    }
+    for doc_id, text in PARITY_CORPUS:
+        if doc_id in expected:
+            assert [t.text for t in nlp(text)] == expected[doc_id].split()
+
+
+def test_segment_and_augment_agree(monkeypatch):
+    via_segment, via_augment = _forms_and_offsets(sd.load_nlp("blank"), monkeypatch)
+    assert via_segment == via_augment
+    for doc_id, text in PARITY_CORPUS:
+        encoded = text.encode()
+        for form, row_doc, offset in via_segment:
+            if row_doc == doc_id:
+                assert encoded[offset : offset + len(form.encode())].decode() == form
+
+
+@pytest.mark.skipif(
+    not spacy.util.is_package(sd.SPACY_MODEL), reason=f"{sd.SPACY_MODEL} not installed"
+)
+def test_blank_tokenizer_matches_model(monkeypatch):
+    blank = _forms_and_offsets(sd.load_nlp("blank"), monkeypatch)
+    model = _forms_and_offsets(sd.load_nlp("model"), monkeypatch)
+    assert blank == model
+
+
+def test_load_nlp_rejects_unknown_tokenizer():
+    with pytest.raises(ValueError, match="Unknown tokenizer"):
+        sd.load_nlp("regex")
+
+
+def test_segmenter_version_names_backend():
+    assert sd.segmenter_version("blank").endswith("/blank-en")
+    assert sd.segmenter_version("model").endswith(f"/{sd.SPACY_MODEL}")
+    assert sd.segmenter_version(sd.DEFAULT_TOKENIZER) == sd.SEGMENTER_VERSION
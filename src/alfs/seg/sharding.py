@@ -0,0 +1,112 @@
+"""Sharding schemes that map a form to its by_prefix shard directory.
+
+A layout records its scheme in by_prefix/manifest.json, so readers resolve a
+form's shard with TokenStore.shard() instead of assuming first letters:
+
+    first_letter  a..z, or "other" for forms not starting with a-z (default)
+    two_letter    first letter plus the second ("_" if not a-z): "th", "x_"
+    hash:N        crc32 of the lowercase form mod N: "h000".."h{N-1}"
+
+Every scheme depends only on the lowercase form, so all case variants of a form
+share a shard and SegIndex can answer case-insensitive lookups from one shard.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+import zlib
+
+import polars as pl
+
+SCHEMES = ("first_letter", "two_letter", "hash")
+_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def prefix(form: str) -> str:
+    if form and form[0].lower() in _LETTERS:
+        return form[0].lower()
+    return "other"
+
+
+def prefix_expr(col: str = "form") -> pl.Expr:
+    """Vectorized prefix(): the same bucket for every value of col."""
+    first = pl.col(col).str.slice(0, 1).str.to_lowercase()
+    return (
+        pl.when(first.str.contains("^[a-z]$"))
+        .then(first)
+        .otherwise(pl.lit("other"))
+        .alias("prefix")
+    )
+
+
+def _second_letter(form: str) -> str:
+    second = form[1:2].lower()
+    return second if second and second in _LETTERS else "_"
+
+
+@dataclass(frozen=True)
+class Sharding:
+    scheme: str = "first_letter"
+    n_shards: int = 0
+
+    def __post_init__(self) -> None:
+        if self.scheme not in SCHEMES:
+            raise ValueError(f"Unknown sharding scheme: {self.scheme!r}")
+        if (self.scheme == "hash") != (self.n_shards > 0):
+            raise ValueError("n_shards must be set for, and only for, hash sharding")
+
+    @classmethod
+    def parse(cls, spec: str) -> Sharding:
+        """Parse a CLI spec: first_letter, two_letter or hash:N."""
+        scheme, _, n = spec.partition(":")
+        return cls(scheme, int(n) if n else 0)
+
+    @classmethod
+    def from_manifest(cls, manifest: dict[str, Any]) -> Sharding:
+        spec = manifest.get("sharding", {})
+        return cls(spec.get("scheme", "first_letter"), spec.get("n_shards", 0))
+
+    def to_manifest(self) -> dict[str, Any]:
+        if self.scheme == "hash":
+            return {"scheme": self.scheme, "n_shards": self.n_shards}
+        return {"scheme": self.scheme}
+
+    def __str__(self) -> str:
+        return f"hash:{self.n_shards}" if self.scheme == "hash" else self.scheme
+
+    def shard(self, form: str) -> str:
+        pfx = prefix(form)
+        if self.scheme == "first_letter":
+            return pfx
+        if self.scheme == "two_letter":
+            return pfx if pfx == "other" else pfx + _second_letter(form)
+        bucket = zlib.crc32(form.lower().encode("utf-8")) % self.n_shards
+        return f"h{bucket:03d}"
+
+    def expr(self, col: str = "form") -> pl.Expr:
+        """Shard of every value of col, as a "prefix" column."""
+        if self.scheme == "first_letter":
+            return prefix_expr(col)
+        if self.scheme == "two_letter":
+            first = prefix_expr(col)
+            second = pl.col(col).str.slice(1, 1).str.to_lowercase()
+            return (
+                pl.when(first == "other")
+                .then(first)
+                .when(second.str.contains("^[a-z]$"))
+                .then(first + second)
+                .otherwise(first + pl.lit("_"))
+                .alias("prefix")
+            )
+        # crc32 has no native expression; hash each distinct form once.
+        return (
+            pl.col(col)
+            .map_batches(self._hash_shards, return_dtype=pl.String)
+            .alias("prefix")
+        )
+
+    def _hash_shards(self, forms: pl.Series) -> pl.Series:
+        uniques = forms.unique()
+        shards = [self.shard(f) for f in uniques.to_list()]
+        return forms.replace_strict(uniques, shards, return_dtype=pl.String)
@@ -0,0 +1,57 @@
+import polars as pl
+import pytest
+
+from alfs.seg.sharding import Sharding, prefix, prefix_expr
+
+FORMS = ["apple", "Zebra", "ß", "İstanbul", "\u212aelvin", "_x", "1st", "", "é", "a"]
+
+
+def test_prefix_expr_matches_prefix() -> None:
+    buckets = pl.DataFrame({"form": FORMS}).select(prefix_expr())["prefix"]
+    assert buckets.to_list() == [prefix(f) for f in FORMS]
+
+
+@pytest.mark.parametrize("spec", ["first_letter", "two_letter", "hash:8"])
+def test_expr_matches_shard(spec: str) -> None:
+    sharding = Sharding.parse(spec)
+    forms = FORMS + ["The", "tHE", "x1", "aİ"]
+    shards = pl.DataFrame({"form": forms}).select(sharding.expr())["prefix"]
+    assert shards.to_list() == [sharding.shard(f) for f in forms]
+
+
+@pytest.mark.parametrize("spec", ["first_letter", "two_letter", "hash:8"])
+def test_case_variants_share_a_shard(spec: str) -> None:
+    sharding = Sharding.parse(spec)
+    assert sharding.shard("Then") == sharding.shard("tHEN") == sharding.shard("then")
+
+
+def test_two_letter_shards() -> None:
+    sharding = Sharding("two_letter")
+    assert [sharding.shard(f) for f in ["the", "x", "a1", "_a"]] == [
+        "th",
+        "x_",
+        "a_",
+        "other",
+    ]
+
+
+def test_hash_shards_are_stable_and_bounded() -> None:
+    sharding = Sharding.parse("hash:16")
+    assert sharding.shard("apple") == "h000"
+    assert {sharding.shard(f"w{i}") for i in range(1000)} == {
+        f"h{i:03d}" for i in range(16)
+    }
+
+
+def test_manifest_round_trip() -> None:
+    for spec in ["first_letter", "two_letter", "hash:64"]:
+        sharding = Sharding.parse(spec)
+        assert Sharding.from_manifest({"sharding": sharding.to_manifest()}) == sharding
+        assert str(sharding) == spec
+    assert Sharding.from_manifest({}) == Sharding()
+
+
+@pytest.mark.parametrize("spec", ["bigram", "hash", "first_letter:4"])
+def test_invalid_specs_raise(spec: str) -> None:
+    with pytest.raises(ValueError):
+        Sharding.parse(spec)
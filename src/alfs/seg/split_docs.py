@@ -1,6 +1,6 @@
 """Split docs into fixed-size shards for parallel segmentation.
 
-Filters out already-segmented doc_ids from the by_prefix layout, then
+Filters out doc_ids the by_prefix layout records as segmented, then
 writes new docs as shard_NNNN.parquet files (one per shard_size docs).
 
 Usage:
@@ -15,16 +15,12 @@ from pathlib import Path
 
 import polars as pl
 
+from alfs.data_models.doc_corpus import scan_docs
+from alfs.seg.token_store import TokenStore
+
 
 def get_segmented_doc_ids(seg_data_dir: Path) -> set[str]:
-    parquets = list(seg_data_dir.glob("*/occurrences.parquet"))
-    if not parquets:
-        return set()
-    doc_ids: set[str] = set()
-    for p in parquets:
-        df = pl.read_parquet(p, columns=["doc_id"])
-        doc_ids.update(df["doc_id"].to_list())
-    return doc_ids
+    return TokenStore(seg_data_dir).doc_ids()
 
 
 def main() -> None:
@@ -47,8 +43,11 @@ def main() -> None:
     print(f"Already segmented: {len(segmented_ids)} docs")
 
     print(f"Loading docs from {args.docs}...")
-    all_docs = pl.read_parquet(args.docs)
-    new_docs = all_docs.filter(~pl.col("doc_id").is_in(list(segmented_ids)))
+    new_docs = (
+        scan_docs(Path(args.docs))
+        .filter(~pl.col("doc_id").is_in(list(segmented_ids)))
+        .collect(engine="streaming")
+    )
     print(f"New docs to segment: {len(new_docs)}")
 
     if len(new_docs) == 0:
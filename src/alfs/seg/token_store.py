@@ -0,0 +1,676 @@
+"""Interned, segmented storage for the by_prefix segmentation layout.
+
+Each prefix directory holds one or more immutable token segments. A segment is
+a parquet file of integer columns (form_id, doc_idx, byte_offset), sorted by
+lowercase form and then by (form_id, doc_idx, byte_offset), and written with
+row-group statistics and dictionary encoding on the id columns. Next to it,
+<segment>.index.parquet maps each lowercase form to its [start, end) row range,
+which SegIndex uses to read only the row groups holding one form.
+
+by_prefix/manifest.json lists the live segments of every prefix (shard) and
+the sharding scheme that assigns forms to prefixes (see alfs.seg.sharding):
+
+    {"version": 1, "next_seq": 7, "sharding": {"scheme": "first_letter"},
+     "prefixes": {"a": ["base-000003.parquet", "delta-000006.parquet"], ...}}
+
+Readers resolve a form's prefix with shard(); a manifest without "sharding"
+uses first letters.
+
+Appends (merge=True) add a delta segment holding only the new rows, so their
+cost is proportional to the rows added rather than to the prefix. compact()
+folds a prefix's segments into a single base segment; writes do so on their own
+once a prefix has more than MAX_DELTAS deltas. Readers treat a prefix's
+segments as one table. Segment files not listed in the manifest (e.g. left by
+an interrupted write) are ignored, and removed the next time their prefix is
+written.
+
+The strings live once in two dictionaries at the root of the layout:
+
+    by_prefix/forms.parquet   form_id (int32) -> form
+    by_prefix/docs.parquet    doc_idx (int32) -> doc_id
+
+Ids are dense and append-only, so a dictionary's row number is its id and
+existing segments stay valid as new forms and docs are added.
+
+Every write also records which docs the layout holds, in a root file named by
+the manifest's "segmented" key (doc_id, token_count, segmenter, segmented_at;
+see segmented_docs()). It is replaced together with the segments it describes,
+so "is this doc segmented?" costs O(docs) rather than a scan of every token.
+
+A layout without a manifest is read as one segment per prefix,
+<prefix>/occurrences.parquet (with <prefix>/index.parquet). Such files may also
+hold the original string columns (form, doc_id, byte_offset); TokenStore decides
+per file from its schema. The first write adopts them into a manifest, and
+compaction converts them.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import copy
+from datetime import UTC, datetime
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+from alfs.seg.sharding import Sharding
+
+MANIFEST_FILE = "manifest.json"
+OCCURRENCES_FILE = "occurrences.parquet"
+INDEX_FILE = "index.parquet"
+FORMS_FILE = "forms.parquet"
+DOCS_FILE = "docs.parquet"
+ROW_GROUP_SIZE = 32 * 1024
+MAX_DELTAS = 16
+WRITE_WORKERS = 4
+
+COLUMNS = ["form", "doc_id", "byte_offset"]
+_EMPTY_SCHEMA = {"form": pl.String, "doc_id": pl.String, "byte_offset": pl.Int64}
+_SEGMENTED_AT = pl.Datetime("us", "UTC")
+SEGMENTED_SCHEMA = {
+    "doc_id": pl.String,
+    "token_count": pl.Int64,
+    "segmenter": pl.String,
+    "segmented_at": _SEGMENTED_AT,
+}
+_TOKEN_SCHEMA = {"form_id": pl.Int32, "doc_idx": pl.Int32, "byte_offset": pl.Int64}
+# (dictionary file, id column, string column)
+_FORMS = (FORMS_FILE, "form_id", "form")
+_DOCS = (DOCS_FILE, "doc_idx", "doc_id")
+
+
+def _write_atomic(
+    df: pl.DataFrame, path: Path, dictionary_columns: list[str] | None = None
+) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    pq.write_table(
+        df.to_arrow(),
+        tmp,
+        row_group_size=ROW_GROUP_SIZE,
+        use_dictionary=dictionary_columns or False,
+        write_statistics=True,
+        compression="zstd",
+    )
+    os.replace(tmp, path)
+
+
+_FileKey = tuple[int, int, int] | None
+
+
+def _file_key(stat: os.stat_result) -> tuple[int, int, int]:
+    """Identifies one version of a file: atomic writes replace the inode."""
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def _index_path(segment: Path) -> Path:
+    if segment.name == OCCURRENCES_FILE:
+        return segment.with_name(INDEX_FILE)
+    return segment.with_name(f"{segment.stem}.index.parquet")
+
+
+class TokenStore:
+    """Read and write the by_prefix layout under seg_data_dir."""
+
+    def __init__(self, seg_data_dir: Path) -> None:
+        self._dir = Path(seg_data_dir)
+        # Parsed files, each keyed on the _file_key() it was read at.
+        self._dictionaries: dict[str, tuple[_FileKey, pl.Series]] = {}
+        self._manifest_cache: tuple[_FileKey, dict[str, Any]] | None = None
+
+    def _manifest(self) -> dict[str, Any]:
+        """The manifest, re-read only when manifest.json is replaced.
+
+        Shared between calls, so callers must not modify it; writers use
+        _load_manifest().
+        """
+        path = self._dir / MANIFEST_FILE
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._manifest_cache = None
+            return self._legacy_manifest()
+        key = _file_key(stat)
+        if self._manifest_cache is None or self._manifest_cache[0] != key:
+            self._manifest_cache = (key, json.loads(path.read_text()))
+        return self._manifest_cache[1]
+
+    def _load_manifest(self) -> dict[str, Any]:
+        """A private copy of the manifest, to modify and _save_manifest()."""
+        return copy.deepcopy(self._manifest())
+
+    def _legacy_manifest(self) -> dict[str, Any]:
+        return {
+            "version": 1,
+            "next_seq": 0,
+            "prefixes": {
+                p.parent.name: [OCCURRENCES_FILE]
+                for p in sorted(self._dir.glob(f"*/{OCCURRENCES_FILE}"))
+            },
+        }
+
+    def _save_manifest(self, manifest: dict[str, Any]) -> None:
+        path = self._dir / MANIFEST_FILE
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+        os.replace(tmp, path)
+
+    @property
+    def sharding(self) -> Sharding:
+        return Sharding.from_manifest(self._manifest())
+
+    def shard(self, form: str) -> str:
+        """Return the prefix directory that holds form under this layout."""
+        return self.sharding.shard(form)
+
+    def prefixes(self) -> list[str]:
+        """Prefixes with at least one live segment, sorted."""
+        return sorted(p for p, segs in self._manifest()["prefixes"].items() if segs)
+
+    def segments(self, pfx: str) -> list[Path]:
+        """Live segment files for one prefix, oldest first."""
+        names = self._manifest()["prefixes"].get(pfx, [])
+        return [self._dir / pfx / name for name in names]
+
+    def has_prefix(self, pfx: str) -> bool:
+        return bool(self.segments(pfx))
+
+    def files(self) -> list[Path]:
+        """All live segment files, sorted by prefix."""
+        manifest = self._manifest()
+        return [
+            self._dir / pfx / name
+            for pfx in sorted(manifest["prefixes"])
+            for name in manifest["prefixes"][pfx]
+        ]
+
+    def _dictionary(self, spec: tuple[str, str, str]) -> pl.Series:
+        """Return the dictionary's strings, indexed by id."""
+        filename, _, value_col = spec
+        path = self._dir / filename
+        try:
+            key: _FileKey | None = _file_key(path.stat())
+        except FileNotFoundError:
+            key = None
+        cached = self._dictionaries.get(filename)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        if key is not None:
+            series = pl.read_parquet(path, columns=[value_col])[value_col]
+        else:
+            series = pl.Series(value_col, [], dtype=pl.String)
+        self._dictionaries[filename] = (key, series)
+        return series
+
+    def _extend_dictionary(
+        self, spec: tuple[str, str, str], values: pl.Series
+    ) -> pl.DataFrame:
+        """Add unseen values to a dictionary; return its (value, id) mapping."""
+        filename, id_col, value_col = spec
+        existing = self._dictionary(spec)
+        unique = values.unique()
+        new = unique.filter(~unique.is_in(existing.implode()))
+        if len(new):
+            existing = pl.concat([existing, new.sort().rename(value_col)])
+            _write_atomic(
+                pl.DataFrame(
+                    {
+                        id_col: pl.int_range(len(existing), dtype=pl.Int32, eager=True),
+                        value_col: existing,
+                    }
+                ),
+                self._dir / filename,
+            )
+            key = _file_key((self._dir / filename).stat())
+            self._dictionaries[filename] = (key, existing)
+        return pl.DataFrame(
+            {
+                value_col: existing,
+                id_col: pl.int_range(len(existing), dtype=pl.Int32, eager=True),
+            }
+        )
+
+    def _encode(self, rows: pl.DataFrame) -> pl.DataFrame:
+        """Map (form, doc_id, byte_offset) rows to token ids, extending dictionaries.
+
+        Columns other than form and doc_id are carried through.
+        """
+        forms = self._extend_dictionary(_FORMS, rows["form"])
+        docs = self._extend_dictionary(_DOCS, rows["doc_id"])
+        extra = [c for c in rows.columns if c not in COLUMNS]
+        return (
+            rows.join(forms, on="form")
+            .join(docs, on="doc_id")
+            .select([*_TOKEN_SCHEMA, *extra])
+        )
+
+    @staticmethod
+    def is_interned(path: Path) -> bool:
+        return "form_id" in pl.read_parquet_schema(path)
+
+    def _scan_ids(self, path: Path) -> pl.LazyFrame:
+        return pl.scan_parquet(path).select(list(_TOKEN_SCHEMA))
+
+    def _decode(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        return lf.select(
+            pl.lit(self._dictionary(_FORMS)).gather(pl.col("form_id")).alias("form"),
+            pl.lit(self._dictionary(_DOCS)).gather(pl.col("doc_idx")).alias("doc_id"),
+            pl.col("byte_offset"),
+        )
+
+    def _scan_file(self, path: Path) -> pl.LazyFrame:
+        if self.is_interned(path):
+            return self._decode(self._scan_ids(path))
+        return pl.scan_parquet(path).select(COLUMNS)
+
+    def scan(self, pfx: str | None = None) -> pl.LazyFrame:
+        """Lazily read (form, doc_id, byte_offset) rows, optionally for one prefix.
+
+        Raises FileNotFoundError if there are no matching segments.
+        """
+        paths = self.segments(pfx) if pfx is not None else self.files()
+        if not paths:
+            raise FileNotFoundError(f"No occurrence segments found in {self._dir}")
+        return pl.concat([self._scan_file(p) for p in paths])
+
+    def form_counts(self) -> pl.DataFrame:
+        """Return (form, total) token counts over the whole layout.
+
+        Interned segments are counted on form_id and decoded once per form.
+        """
+        paths = self.files()
+        if not paths:
+            raise FileNotFoundError(f"No occurrence segments found in {self._dir}")
+        interned = [p for p in paths if self.is_interned(p)]
+        legacy = [p for p in paths if p not in interned]
+        parts: list[pl.LazyFrame] = []
+        if interned:
+            forms = self._dictionary(_FORMS)
+            parts.append(
+                pl.concat([pl.scan_parquet(p).select("form_id") for p in interned])
+                .group_by("form_id")
+                .agg(pl.len().alias("total"))
+                .select(
+                    pl.lit(forms).gather(pl.col("form_id")).alias("form"),
+                    pl.col("total"),
+                )
+            )
+        if legacy:
+            parts.append(
+                pl.concat([pl.scan_parquet(p).select("form") for p in legacy])
+                .group_by("form")
+                .agg(pl.len().alias("total"))
+            )
+        return (
+            pl.concat(parts)
+            .group_by("form")
+            .agg(pl.col("total").sum().cast(pl.UInt32))
+            .collect()
+        )
+
+    def doc_ids(self) -> set[str]:
+        """Return every doc_id with at least one token in the layout."""
+        return set(self.segmented_docs()["doc_id"].to_list())
+
+    def segmented_docs(self) -> pl.DataFrame:
+        """Return one SEGMENTED_SCHEMA row per doc in the layout.
+
+        Layouts written before docs were recorded are counted from their
+        segments, with null segmenter and segmented_at.
+        """
+        name = self._manifest().get("segmented")
+        if name is not None:
+            return pl.read_parquet(self._dir / name)
+        return self._count_docs(self.files()).with_columns(
+            pl.lit(None, dtype=pl.String).alias("segmenter"),
+            pl.lit(None, dtype=_SEGMENTED_AT).alias("segmented_at"),
+        )
+
+    def _count_docs(self, paths: list[Path]) -> pl.DataFrame:
+        """Return (doc_id, token_count) over the given segments."""
+        parts: list[pl.DataFrame] = []
+        for path in paths:
+            if self.is_interned(path):
+                counts = pl.read_parquet(path, columns=["doc_idx"])["doc_idx"]
+                parts.append(
+                    counts.value_counts(name="token_count").select(
+                        pl.lit(self._dictionary(_DOCS))
+                        .gather(pl.col("doc_idx"))
+                        .alias("doc_id"),
+                        pl.col("token_count"),
+                    )
+                )
+            else:
+                counts = pl.read_parquet(path, columns=["doc_id"])["doc_id"]
+                parts.append(counts.value_counts(name="token_count"))
+        if not parts:
+            return pl.DataFrame(schema={"doc_id": pl.String, "token_count": pl.Int64})
+        return (
+            pl.concat(parts)
+            .group_by("doc_id")
+            .agg(pl.col("token_count").sum().cast(pl.Int64))
+        )
+
+    def _record_docs(
+        self,
+        df: pl.DataFrame,
+        previous: pl.DataFrame,
+        merge: bool,
+        manifest: dict[str, Any],
+        segmenter: str | None,
+    ) -> str:
+        """Write the segmented-docs file for manifest after writing df.
+
+        merge=True adds df's token counts to previous. merge=False recounts
+        the manifest's live segments, since replaced prefixes may have dropped
+        docs. Docs in df are stamped with segmenter and the current time;
+        others keep their previous stamps. Returns the new file's name.
+        """
+        stamp = [
+            pl.lit(segmenter, dtype=pl.String).alias("segmenter"),
+            pl.lit(datetime.now(UTC), dtype=_SEGMENTED_AT).alias("segmented_at"),
+        ]
+        written = (
+            df.group_by("doc_id")
+            .agg(pl.len().cast(pl.Int64).alias("token_count"))
+            .with_columns(stamp)
+        )
+        if merge:
+            docs = (
+                pl.concat([previous, written])
+                .group_by("doc_id", maintain_order=True)
+                .agg(
+                    pl.col("token_count").sum(),
+                    pl.col("segmenter").last(),
+                    pl.col("segmented_at").last(),
+                )
+            )
+        else:
+            live = [
+                self._dir / pfx / name
+                for pfx, names in manifest["prefixes"].items()
+                for name in names
+            ]
+            stamps = pl.concat([previous, written]).unique(
+                "doc_id", keep="last", maintain_order=True
+            )
+            docs = self._count_docs(live).join(
+                stamps.drop("token_count"), on="doc_id", how="left"
+            )
+        name = self._segment_name("segmented", manifest)
+        _write_atomic(
+            docs.select(list(SEGMENTED_SCHEMA)).sort("doc_id"), self._dir / name
+        )
+        return name
+
+    @staticmethod
+    def _segment_name(kind: str, manifest: dict[str, Any]) -> str:
+        name = f"{kind}-{manifest['next_seq']:06d}.parquet"
+        manifest["next_seq"] += 1
+        return name
+
+    def _write_segment(
+        self, pfx: str, ids: pl.DataFrame, name: str, forms_lower: pl.Series
+    ) -> None:
+        """Write ids as the sorted, indexed segment pfx/name.
+
+        forms_lower is the lowercased forms dictionary. The segment is not
+        live until the caller lists it in the manifest and saves it.
+        """
+        ids = ids.with_columns(
+            pl.lit(forms_lower).gather(pl.col("form_id")).alias("form_lower")
+        ).sort(["form_lower", *_TOKEN_SCHEMA])
+        index = (
+            ids.with_row_index("row")
+            .group_by("form_lower")
+            .agg(
+                pl.col("row").min().cast(pl.Int64).alias("start"),
+                (pl.col("row").max() + 1).cast(pl.Int64).alias("end"),
+            )
+            .sort("start")
+        )
+        path = self._dir / pfx / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(
+            ids.select(list(_TOKEN_SCHEMA)),
+            path,
+            dictionary_columns=["form_id", "doc_idx"],
+        )
+        _write_atomic(index, _index_path(path))
+
+    def _remove_unreferenced(self, pfx: str, manifest: dict[str, Any]) -> None:
+        live = {self._dir / pfx / name for name in manifest["prefixes"].get(pfx, [])}
+        keep = live | {_index_path(p) for p in live}
+        for path in (self._dir / pfx).glob("*.parquet*"):
+            if path not in keep:
+                path.unlink()
+
+    def _segment_ids(self, path: Path) -> pl.DataFrame:
+        """Read a segment as interned ids, encoding legacy string files."""
+        if self.is_interned(path):
+            return pl.read_parquet(path, columns=list(_TOKEN_SCHEMA))
+        return self._encode(pl.read_parquet(path, columns=COLUMNS))
+
+    def write(
+        self,
+        df: pl.DataFrame,
+        merge: bool = False,
+        workers: int = WRITE_WORKERS,
+        sharding: Sharding | None = None,
+        segmenter: str | None = None,
+    ) -> None:
+        """Write (form, doc_id, byte_offset) rows into their prefixes.
+
+        merge=True: add the rows as a new delta segment of each touched prefix.
+        merge=False: replace each touched prefix with a single base segment.
+
+        Rows are assigned to prefixes by the layout's sharding scheme. A new or
+        empty layout adopts `sharding` (default first_letter); passing a
+        different scheme for a populated layout raises ValueError, since that
+        needs reshard().
+
+        Rows are bucketed in one partition_by pass and the per-prefix segments
+        are written by up to `workers` threads. Dictionaries are extended before
+        any segment references new ids, and segments become live together when
+        the manifest is saved, along with the segmented-docs record (stamped
+        with `segmenter`, e.g. segment_docs.SEGMENTER_VERSION).
+        """
+        self._dir.mkdir(parents=True, exist_ok=True)
+        previous = self.segmented_docs()
+        manifest = self._load_manifest()
+        current = Sharding.from_manifest(manifest)
+        if sharding is not None and sharding != current:
+            if any(manifest["prefixes"].values()):
+                raise ValueError(
+                    f"{self._dir} is sharded by {current}, not {sharding}; "
+                    "reshard it first (python -m alfs.seg.compact --reshard)"
+                )
+            current = sharding
+        manifest["sharding"] = current.to_manifest()
+
+        df = df.select(COLUMNS).with_columns(current.expr())
+        groups = self._partition(self._encode(df))
+        self._write_groups(groups, manifest, merge, workers)
+        replaced = manifest.get("segmented")
+        manifest["segmented"] = self._record_docs(
+            df, previous, merge, manifest, segmenter
+        )
+        self._save_manifest(manifest)
+        if replaced is not None:
+            (self._dir / replaced).unlink(missing_ok=True)
+
+        for pfx in groups:
+            self._remove_unreferenced(pfx, manifest)
+            if len(manifest["prefixes"][pfx]) > MAX_DELTAS + 1:
+                self.compact(pfx)
+
+    @staticmethod
+    def _partition(ids: pl.DataFrame) -> dict[str, pl.DataFrame]:
+        return {
+            str(pfx): rows
+            for (pfx,), rows in ids.partition_by(
+                "prefix", as_dict=True, include_key=False
+            ).items()
+        }
+
+    def _write_groups(
+        self,
+        groups: dict[str, pl.DataFrame],
+        manifest: dict[str, Any],
+        merge: bool,
+        workers: int,
+    ) -> None:
+        """Write one segment per group and list it in (unsaved) manifest."""
+        prefixes = sorted(groups)
+
+        names: dict[str, str] = {}
+        for pfx in prefixes:
+            live = manifest["prefixes"].get(pfx)
+            kind = "delta" if merge and live else "base"
+            names[pfx] = self._segment_name(kind, manifest)
+
+        print(f"Writing {len(prefixes)} prefix groups to {self._dir}...")
+        forms_lower = self._dictionary(_FORMS).str.to_lowercase()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [
+                pool.submit(
+                    self._write_segment, pfx, groups[pfx], names[pfx], forms_lower
+                )
+                for pfx in prefixes
+            ]
+            for future in futures:
+                future.result()
+
+        for pfx in prefixes:
+            live = manifest["prefixes"].setdefault(pfx, [])
+            if merge and live:
+                live.append(names[pfx])
+            else:
+                live[:] = [names[pfx]]
+            print(f"  {pfx}: {len(groups[pfx])} rows → {self._dir / pfx / names[pfx]}")
+
+    def reshard(self, sharding: Sharding, workers: int = WRITE_WORKERS) -> None:
+        """Rewrite the whole layout into base segments under a new scheme.
+
+        Old segments stay live until the new manifest is saved, then are
+        removed along with prefix directories the new scheme no longer uses.
+        """
+        manifest = self._load_manifest()
+        paths = self.files()
+        old_prefixes = list(manifest["prefixes"])
+        if paths:
+            ids = pl.concat([self._segment_ids(p) for p in paths])
+            forms = self._dictionary(_FORMS)
+            ids = (
+                ids.with_columns(pl.lit(forms).gather(pl.col("form_id")).alias("form"))
+                .with_columns(sharding.expr())
+                .drop("form")
+            )
+        else:
+            ids = pl.DataFrame(schema={**_TOKEN_SCHEMA, "prefix": pl.String})
+        manifest["prefixes"] = {}
+        manifest["sharding"] = sharding.to_manifest()
+        self._write_groups(self._partition(ids), manifest, False, workers)
+        self._save_manifest(manifest)
+        for pfx in old_prefixes:
+            self._remove_unreferenced(pfx, manifest)
+            pfx_dir = self._dir / pfx
+            if pfx_dir.is_dir() and not any(pfx_dir.iterdir()):
+                pfx_dir.rmdir()
+
+    def compact(self, pfx: str | None = None) -> list[str]:
+        """Fold each prefix's segments into one interned base segment.
+
+        Compacts every prefix when pfx is None. Prefixes that already consist
+        of a single interned segment are left alone. Returns the prefixes that
+        were rewritten.
+        """
+        manifest = self._load_manifest()
+        targets = [pfx] if pfx is not None else sorted(manifest["prefixes"])
+        compacted: list[str] = []
+        for target in targets:
+            paths = [
+                self._dir / target / n for n in manifest["prefixes"].get(target, [])
+            ]
+            if not paths or (len(paths) == 1 and self.is_interned(paths[0])):
+                continue
+            parts = [self._segment_ids(p) for p in paths]
+            name = self._segment_name("base", manifest)
+            forms_lower = self._dictionary(_FORMS).str.to_lowercase()
+            self._write_segment(target, pl.concat(parts), name, forms_lower)
+            manifest["prefixes"][target] = [name]
+            self._save_manifest(manifest)
+            self._remove_unreferenced(target, manifest)
+            compacted.append(target)
+        return compacted
+
+
+class SegIndex(TokenStore):
+    """Case-insensitive per-form lookups against the by_prefix layout.
+
+    occurrences() uses each segment's sidecar index to read only the row
+    groups that hold the form. Segments without a usable index (legacy string
+    files, or an index that does not match its segment) fall back to scanning
+    the whole segment.
+    """
+
+    def __init__(self, seg_data_dir: Path) -> None:
+        super().__init__(seg_data_dir)
+        self._indexes: dict[Path, dict[str, tuple[int, int]] | None] = {}
+
+    def _index(self, segment: Path) -> dict[str, tuple[int, int]] | None:
+        if segment not in self._indexes:
+            index_path = _index_path(segment)
+            ranges: dict[str, tuple[int, int]] | None = None
+            if index_path.exists() and self.is_interned(segment):
+                df = pl.read_parquet(index_path)
+                n_rows = pq.ParquetFile(segment).metadata.num_rows
+                if df["end"].max() == n_rows:
+                    ranges = {
+                        form: (start, end)
+                        for form, start, end in df.select(
+                            ["form_lower", "start", "end"]
+                        ).iter_rows()
+                    }
+            self._indexes[segment] = ranges
+        return self._indexes[segment]
+
+    def _read_rows(self, path: Path, start: int, end: int) -> pl.DataFrame:
+        """Read rows [start, end) of a segment, touching only their row groups."""
+        pf = pq.ParquetFile(path)
+        row_groups: list[int] = []
+        first_row = rg_start = 0
+        for i in range(pf.metadata.num_row_groups):
+            rg_end = rg_start + pf.metadata.row_group(i).num_rows
+            if rg_start < end and rg_end > start:
+                if not row_groups:
+                    first_row = rg_start
+                row_groups.append(i)
+            rg_start = rg_end
+        table = pf.read_row_groups(row_groups, columns=list(_TOKEN_SCHEMA))
+        return pl.DataFrame(pl.from_arrow(table.slice(start - first_row, end - start)))
+
+    def _segment_occurrences(self, segment: Path, form: str) -> pl.LazyFrame | None:
+        ranges = self._index(segment)
+        if ranges is None:
+            return self._scan_file(segment).filter(
+                pl.col("form").str.to_lowercase() == form.lower()
+            )
+        span = ranges.get(form.lower())
+        if span is None:
+            return None
+        return self._decode(self._read_rows(segment, *span).lazy())
+
+    def occurrences(self, form: str) -> pl.DataFrame:
+        """Return (form, doc_id, byte_offset) rows matching form case-insensitively."""
+        parts = [
+            lf
+            for segment in self.segments(self.shard(form))
+            if (lf := self._segment_occurrences(segment, form)) is not None
+        ]
+        if not parts:
+            return pl.DataFrame(schema=_EMPTY_SCHEMA)
+        return pl.concat(parts).collect()
@@ -0,0 +1,312 @@
+from pathlib import Path
+
+import polars as pl
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+import pytest
+
+from alfs.seg import token_store
+from alfs.seg.sharding import Sharding
+from alfs.seg.token_store import SegIndex, TokenStore
+
+
+def _occ_df(rows: list[tuple[str, str, int]]) -> pl.DataFrame:
+    return pl.DataFrame(
+        rows,
+        schema={"form": pl.String, "doc_id": pl.String, "byte_offset": pl.Int64},
+        orient="row",
+    )
+
+
+def _rows(df: pl.DataFrame) -> set[tuple[str, str, int]]:
+    return set(df.select(["form", "doc_id", "byte_offset"]).iter_rows())
+
+
+def _write_legacy(seg_dir: Path, pfx: str, rows: list[tuple[str, str, int]]) -> None:
+    (seg_dir / pfx).mkdir(parents=True, exist_ok=True)
+    _occ_df(rows).write_parquet(seg_dir / pfx / "occurrences.parquet")
+
+
+def test_write_with_multiple_workers_matches_serial(tmp_path: Path) -> None:
+    df = _occ_df([(f"{c}{i}", f"d{i}", i) for c in "abcxyz_" for i in range(20)])
+    TokenStore(tmp_path / "serial").write(df, workers=1)
+    TokenStore(tmp_path / "parallel").write(df, workers=4)
+    serial = TokenStore(tmp_path / "serial")
+    parallel = TokenStore(tmp_path / "parallel")
+    assert parallel.prefixes() == serial.prefixes()
+    assert _rows(parallel.scan().collect()) == _rows(serial.scan().collect())
+
+
+def test_write_stores_integer_columns(tmp_path: Path) -> None:
+    TokenStore(tmp_path).write(_occ_df([("apple", "d1", 0), ("Ant", "d2", 5)]))
+    [segment] = TokenStore(tmp_path).segments("a")
+    schema = pl.read_parquet_schema(segment)
+    assert schema == {"form_id": pl.Int32, "doc_idx": pl.Int32, "byte_offset": pl.Int64}
+    assert (tmp_path / "forms.parquet").exists()
+    assert (tmp_path / "docs.parquet").exists()
+
+
+def test_scan_round_trips(tmp_path: Path) -> None:
+    rows = [("apple", "d1", 0), ("Ant", "d2", 5), ("bee", "d1", 9), ("42", "d3", 1)]
+    TokenStore(tmp_path).write(_occ_df(rows))
+    store = TokenStore(tmp_path)
+    assert _rows(store.scan().collect()) == set(rows)
+    assert _rows(store.scan("a").collect()) == {("apple", "d1", 0), ("Ant", "d2", 5)}
+    assert _rows(store.scan("other").collect()) == {("42", "d3", 1)}
+
+
+def test_scan_missing_prefix_raises(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        TokenStore(tmp_path).scan().collect()
+    TokenStore(tmp_path).write(_occ_df([("apple", "d1", 0)]))
+    with pytest.raises(FileNotFoundError):
+        TokenStore(tmp_path).scan("z")
+
+
+def test_merge_appends_delta_segment(tmp_path: Path) -> None:
+    TokenStore(tmp_path).write(_occ_df([("apple", "d1", 0)]))
+    [base] = TokenStore(tmp_path).segments("a")
+    base_bytes = base.read_bytes()
+    TokenStore(tmp_path).write(
+        _occ_df([("ant", "d2", 3), ("bee", "d2", 7)]), merge=True
+    )
+    segments = TokenStore(tmp_path).segments("a")
+    assert segments[0] == base
+    assert base.read_bytes() == base_bytes
+    assert len(segments) == 2
+    assert pl.read_parquet(segments[1]).height == 1
+    assert _rows(TokenStore(tmp_path).scan().collect()) == {
+        ("apple", "d1", 0),
+        ("ant", "d2", 3),
+        ("bee", "d2", 7),
+    }
+
+
+def test_reads_legacy_and_mixed_layouts(tmp_path: Path) -> None:
+    _write_legacy(tmp_path, "a", [("apple", "d1", 0), ("apple", "d2", 4)])
+    TokenStore(tmp_path).write(_occ_df([("bee", "d3", 1)]))
+    store = TokenStore(tmp_path)
+    assert _rows(store.scan().collect()) == {
+        ("apple", "d1", 0),
+        ("apple", "d2", 4),
+        ("bee", "d3", 1),
+    }
+    counts = dict(store.form_counts().iter_rows())
+    assert counts == {"apple": 2, "bee": 1}
+    assert store.doc_ids() == {"d1", "d2", "d3"}
+
+
+def test_merge_false_replaces_all_segments(tmp_path: Path) -> None:
+    store = TokenStore(tmp_path)
+    store.write(_occ_df([("apple", "d1", 0)]))
+    store.write(_occ_df([("ant", "d2", 3)]), merge=True)
+    store.write(_occ_df([("arc", "d3", 5)]))
+    [segment] = store.segments("a")
+    assert _rows(store.scan("a").collect()) == {("arc", "d3", 5)}
+    assert {p.name for p in (tmp_path / "a").iterdir()} == {
+        segment.name,
+        segment.stem + ".index.parquet",
+    }
+
+
+def test_compact_folds_deltas_and_converts_legacy(tmp_path: Path) -> None:
+    _write_legacy(tmp_path, "a", [("apple", "d1", 0)])
+    store = TokenStore(tmp_path)
+    store.write(_occ_df([("ant", "d2", 3)]), merge=True)
+    store.write(_occ_df([("Ant", "d3", 4), ("bee", "d3", 8)]), merge=True)
+    assert len(store.segments("a")) == 3
+    assert store.compact() == ["a"]
+    [segment] = store.segments("a")
+    assert store.is_interned(segment)
+    assert not (tmp_path / "a" / "occurrences.parquet").exists()
+    assert _rows(store.scan("a").collect()) == {
+        ("apple", "d1", 0),
+        ("ant", "d2", 3),
+        ("Ant", "d3", 4),
+    }
+    assert store.compact() == []
+
+
+def test_write_compacts_after_max_deltas(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(token_store, "MAX_DELTAS", 2)
+    store = TokenStore(tmp_path)
+    store.write(_occ_df([("a0", "d0", 0)]))
+    for i in range(1, 3):
+        store.write(_occ_df([(f"a{i}", f"d{i}", i)]), merge=True)
+    assert len(store.segments("a")) == 3
+    store.write(_occ_df([("a3", "d3", 3)]), merge=True)
+    assert len(store.segments("a")) == 1
+    assert len(store.scan("a").collect()) == 4
+
+
+def test_unlisted_segments_are_ignored(tmp_path: Path) -> None:
+    store = TokenStore(tmp_path)
+    store.write(_occ_df([("apple", "d1", 0)]))
+    [segment] = store.segments("a")
+    stray = segment.with_name("delta-999999.parquet")
+    stray.write_bytes(segment.read_bytes())
+    assert len(store.scan("a").collect()) == 1
+    store.write(_occ_df([("ant", "d2", 3)]), merge=True)
+    assert not stray.exists()
+    assert len(store.scan("a").collect()) == 2
+
+
+def test_form_counts_are_case_sensitive(tmp_path: Path) -> None:
+    TokenStore(tmp_path).write(
+        _occ_df([("Run", "d1", 0), ("run", "d1", 4), ("run", "d2", 0)])
+    )
+    counts = dict(TokenStore(tmp_path).form_counts().iter_rows())
+    assert counts == {"Run": 1, "run": 2}
+
+
+def test_write_sorts_by_lowercase_form_and_indexes(tmp_path: Path) -> None:
+    TokenStore(tmp_path).write(
+        _occ_df([("apple", "d1", 0), ("Ant", "d2", 5), ("APPLE", "d1", 9)])
+    )
+    forms = TokenStore(tmp_path).scan("a").collect()["form"].to_list()
+    assert [f.lower() for f in forms] == ["ant", "apple", "apple"]
+    [segment] = TokenStore(tmp_path).segments("a")
+    index = pl.read_parquet(segment.with_name(segment.stem + ".index.parquet"))
+    assert index.rows() == [("ant", 0, 1), ("apple", 1, 3)]
+
+
+def test_seg_index_occurrences_case_insensitive(tmp_path: Path) -> None:
+    TokenStore(tmp_path).write(
+        _occ_df([("apple", "d1", 0), ("Apple", "d2", 5), ("ant", "d2", 9)])
+    )
+    seg_index = SegIndex(tmp_path)
+    assert _rows(seg_index.occurrences("APPLE")) == {
+        ("apple", "d1", 0),
+        ("Apple", "d2", 5),
+    }
+    TokenStore(tmp_path).write(_occ_df([("APPLE", "d3", 1)]), merge=True)
+    assert ("APPLE", "d3", 1) in _rows(SegIndex(tmp_path).occurrences("apple"))
+    assert seg_index.occurrences("avocado").is_empty()
+    assert seg_index.occurrences("zebra").is_empty()
+
+
+def test_seg_index_reads_across_row_groups(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(token_store, "ROW_GROUP_SIZE", 3)
+    rows = [(f"a{i % 4}", f"d{i}", i) for i in range(20)]
+    TokenStore(tmp_path).write(_occ_df(rows))
+    [segment] = TokenStore(tmp_path).segments("a")
+    assert pq.ParquetFile(segment).num_row_groups > 1
+    seg_index = SegIndex(tmp_path)
+    for i in range(4):
+        expected = {r for r in rows if r[0] == f"a{i}"}
+        assert _rows(seg_index.occurrences(f"a{i}")) == expected
+
+
+def test_seg_index_falls_back_without_usable_index(tmp_path: Path) -> None:
+    _write_legacy(tmp_path, "a", [("apple", "d1", 0), ("ant", "d1", 6)])
+    assert _rows(SegIndex(tmp_path).occurrences("Apple")) == {("apple", "d1", 0)}
+
+    TokenStore(tmp_path).write(_occ_df([("bee", "d1", 0), ("bat", "d2", 1)]))
+    [segment] = TokenStore(tmp_path).segments("b")
+    pl.DataFrame(
+        {"form_lower": ["bee"], "start": [0], "end": [1]},
+        schema={"form_lower": pl.String, "start": pl.Int64, "end": pl.Int64},
+    ).write_parquet(segment.with_name(segment.stem + ".index.parquet"))
+    assert _rows(SegIndex(tmp_path).occurrences("bee")) == {("bee", "d1", 0)}
+
+
+def test_write_uses_recorded_sharding(tmp_path: Path) -> None:
+    store = TokenStore(tmp_path)
+    store.write(
+        _occ_df([("The", "d1", 0), ("then", "d1", 4)]), sharding=Sharding("two_letter")
+    )
+    store.write(_occ_df([("thaw", "d2", 0), ("x", "d2", 5)]), merge=True)
+    assert store.sharding == Sharding("two_letter")
+    assert store.prefixes() == ["th", "x_"]
+    assert _rows(SegIndex(tmp_path).occurrences("the")) == {("The", "d1", 0)}
+
+
+def test_write_rejects_different_sharding(tmp_path: Path) -> None:
+    store = TokenStore(tmp_path)
+    store.write(_occ_df([("apple", "d1", 0)]))
+    with pytest.raises(ValueError, match="reshard"):
+        store.write(_occ_df([("ant", "d2", 0)]), sharding=Sharding("hash", 4))
+
+
+def test_reshard_moves_all_rows(tmp_path: Path) -> None:
+    _write_legacy(tmp_path, "a", [("apple", "d1", 0)])
+    store = TokenStore(tmp_path)
+    store.write(_occ_df([("Ant", "d2", 3), ("bee", "d2", 7)]), merge=True)
+    before = _rows(store.scan().collect())
+    store.reshard(Sharding("hash", 4))
+    assert store.sharding == Sharding("hash", 4)
+    assert _rows(store.scan().collect()) == before
+    assert not (tmp_path / "a").exists()
+    assert all(p.startswith("h") for p in store.prefixes())
+    seg_index = SegIndex(tmp_path)
+    assert _rows(seg_index.occurrences("ANT")) == {("Ant", "d2", 3)}
+
+
+def test_segmented_docs_tracks_merges(tmp_path: Path) -> None:
+    store = TokenStore(tmp_path)
+    store.write(_occ_df([("a", "d1", 0), ("b", "d1", 2)]), segmenter="v1")
+    store.write(_occ_df([("c", "d2", 0), ("a", "d1", 9)]), merge=True, segmenter="v2")
+    docs = store.segmented_docs().sort("doc_id")
+    assert docs.select("doc_id", "token_count", "segmenter").rows() == [
+        ("d1", 3, "v2"),
+        ("d2", 1, "v2"),
+    ]
+    assert docs["segmented_at"].null_count() == 0
+
+
+def test_segmented_docs_recounts_after_replacing_prefixes(tmp_path: Path) -> None:
+    store = TokenStore(tmp_path)
+    store.write(
+        _occ_df([("a", "d1", 0), ("b", "d1", 2), ("b", "d2", 0)]), segmenter="v1"
+    )
+    store.write(_occ_df([("b", "d3", 0)]), segmenter="v2")
+    docs = store.segmented_docs().sort("doc_id")
+    assert docs.select("doc_id", "token_count", "segmenter").rows() == [
+        ("d1", 1, "v1"),
+        ("d3", 1, "v2"),
+    ]
+    assert len(list(tmp_path.glob("segmented-*.parquet"))) == 1
+
+
+def test_doc_ids_read_from_segmented_docs(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _write_legacy(tmp_path, "a", [("apple", "d1", 0)])
+    assert TokenStore(tmp_path).doc_ids() == {"d1"}
+    TokenStore(tmp_path).write(_occ_df([("bee", "d2", 0)]), merge=True)
+
+    def no_scan(self: TokenStore, paths: list[Path]) -> pl.DataFrame:
+        raise AssertionError("doc_ids scanned segments")
+
+    monkeypatch.setattr(TokenStore, "_count_docs", no_scan)
+    assert TokenStore(tmp_path).doc_ids() == {"d1", "d2"}
+
+
+def test_manifest_is_parsed_once_until_replaced(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    writer = TokenStore(tmp_path)
+    writer.write(_occ_df([("apple", "d1", 0), ("bear", "d1", 6)]))
+    reader = SegIndex(tmp_path)
+    loads = 0
+    real_loads = token_store.json.loads
+
+    def counting_loads(text: str) -> object:
+        nonlocal loads
+        loads += 1
+        return real_loads(text)
+
+    monkeypatch.setattr(token_store.json, "loads", counting_loads)
+    for _ in range(3):
+        assert len(reader.occurrences("apple")) == 1
+        assert reader.has_prefix(reader.shard("bear"))
+    assert loads == 1
+
+    writer.write(_occ_df([("apple", "d2", 0)]), merge=True)
+    loads = 0
+    # The reader picks up the new manifest and the grown docs dictionary.
+    assert len(reader.occurrences("apple")) == 2
+    assert loads == 1
@@ -26,7 +26,7 @@ from alfs.data_models.blocklist import Blocklist
 from alfs.data_models.induction_queue import InductionQueue
 from alfs.data_models.occurrence import Occurrence
 from alfs.data_models.sense_store import SenseStore
-from alfs.seg.aggregate_occurrences import prefix as form_prefix
+from alfs.seg.token_store import SegIndex
 
 _WORD_RE = re.compile(r"[a-zA-Z]")
 
@@ -43,19 +43,14 @@ def run(
 ) -> int:
     """Enqueue top-N unseen forms by corpus frequency. Returns count added."""
     seg_dir = Path(seg_data_dir)
-    parquet_files = list(seg_dir.glob("*/occurrences.parquet"))
-    if not parquet_files:
+    seg_index = SegIndex(seg_dir)
+    if not seg_index.files():
         raise FileNotFoundError(
             f"No occurrences.parquet files found in {seg_dir}. Run `make seg` first."
         )
 
     # Count total corpus occurrences per form
-    total_counts = (
-        pl.concat([pl.scan_parquet(str(f)).select("form") for f in parquet_files])
-        .group_by("form")
-        .agg(pl.len().alias("total"))
-        .collect()
-    )
+    total_counts = seg_index.form_counts()
 
     # Filter to word-like forms with enough occurrences
     total_counts = total_counts.filter(pl.col("total") >= min_count)
@@ -94,13 +89,10 @@ def run(
     occs_by_form: dict[str, list[Occurrence]] = {}
     if n_occurrence_refs > 0:
         for form in forms:
-            occ_path = seg_dir / form_prefix(form) / "occurrences.parquet"
-            if not occ_path.exists():
+            if not seg_index.has_prefix(seg_index.shard(form)):
                 continue
             try:
-                df = pl.read_parquet(str(occ_path)).filter(
-                    pl.col("form").str.to_lowercase() == form.lower()
-                )
+                df = seg_index.occurrences(form)
                 rows = df.select(["doc_id", "byte_offset"]).to_dicts()
                 sampled = rng.sample(rows, min(n_occurrence_refs, len(rows)))
                 occs_by_form[form] = [
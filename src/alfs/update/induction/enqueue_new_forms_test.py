@@ -24,8 +24,7 @@ def _make_seg_data(seg_dir: Path, prefix: str, rows: list[dict]) -> None:
 
 @pytest.fixture
 def seg_dir(tmp_path: Path) -> Path:
-    """Seg data with a few forms. Prefix is first character (form_prefix("cat") ==
-    "c")."""
+    """Seg data with a few forms, sharded by first letter ("cat" lives in "c")."""
     d = tmp_path / "seg"
     # Each form needs at least min_count occurrences
     _make_seg_data(
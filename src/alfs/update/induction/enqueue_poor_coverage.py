@@ -40,16 +40,19 @@ def run(
 ) -> int:
     """Enqueue forms with poor-quality labeled occurrences. Returns count added."""
     occ_store = OccurrenceStore(Path(labeled_db))
-    df = occ_store.to_polars()
-
-    if df.is_empty():
+    if occ_store.count_by_form().is_empty():
         print("No labeled occurrences found.")
         return 0
 
     # Poor coverage = rating in {0, 1}, except occurrences explicitly tagged as
     # skip/noise (sense_key="0") — those should never be re-examined.
-    bad_df = df.filter(
-        pl.col("rating").is_in([0, 1]) & (pl.col("sense_key") != SKIP_SENSE_KEY)
+    bad_df = (
+        occ_store.scan(
+            columns=["form", "doc_id", "byte_offset", "sense_key"],
+            where={"rating": [0, 1]},
+        )
+        .filter(pl.col("sense_key") != SKIP_SENSE_KEY)
+        .collect()
     )
 
     if bad_df.is_empty():
@@ -29,14 +29,14 @@ from alfs.clerk.queue import enqueue
 from alfs.clerk.request import AddSensesRequest
 from alfs.data_models.alf import Alf, Sense, morph_base_form
 from alfs.data_models.blocklist import Blocklist
+from alfs.data_models.doc_store import DocStore
 from alfs.data_models.induction_queue import InductionQueue, InductionQueueEntry
 from alfs.data_models.occurrence import Occurrence
 from alfs.data_models.occurrence_store import OccurrenceStore
 from alfs.data_models.pos import PartOfSpeech
 from alfs.data_models.sense_store import SenseStore
 from alfs.data_models.update_target import UpdateTarget
-from alfs.encoding import context_window as _context_window
-from alfs.seg.aggregate_occurrences import prefix as form_prefix
+from alfs.seg.token_store import SegIndex
 from alfs.update import llm
 from alfs.update.induction import prompts
 
@@ -72,9 +72,11 @@ _CRITIC_SCHEMA = {
 }
 
 
-def extract_context(text: str, byte_offset: int, form: str, context_chars: int) -> str:
-    snippet, _ = _context_window(text, byte_offset, form, context_chars)
-    return snippet
+def extract_context(
+    docs: DocStore, doc_id: str, byte_offset: int, form: str, context_chars: int
+) -> str | None:
+    window = docs.context_window(doc_id, byte_offset, form, context_chars)
+    return None if window is None else window[0]
 
 
 def _load_existing_defs(form: str, senses_db: Path) -> list[str]:
@@ -84,12 +86,16 @@ def _load_existing_defs(form: str, senses_db: Path) -> list[str]:
     the LLM doesn't duplicate definitions already captured at another casing.
     """
     store = SenseStore(senses_db)
+    variants = store.read_case_variants(form)
+    bases = store.read_many(
+        base for v in variants if (base := morph_base_form(v)) is not None
+    )
     existing_defs: list[str] = []
-    for variant in store.read_case_variants(form):
+    for variant in variants:
         existing_defs.extend(s.definition for s in variant.senses)
         base_name = morph_base_form(variant)
         if base_name is not None:
-            base_entry = store.read(base_name)
+            base_entry = bases.get(base_name)
             if base_entry is not None:
                 existing_defs.extend(s.definition for s in base_entry.senses)
     return existing_defs
@@ -109,17 +115,15 @@ def _load_contexts(
     If pinned_occurrences is non-empty, use those. Otherwise sample from corpus,
     excluding well-labeled occurrences.
     """
-    occ_path = seg_data_dir / form_prefix(form) / "occurrences.parquet"
-    if not occ_path.exists():
+    seg_index = SegIndex(seg_data_dir)
+    if not seg_index.has_prefix(seg_index.shard(form)):
         if pinned_occurrences:
             # MWE or other form not in seg data — trust pinned occurrences
             all_occurrences: list[dict[str, object]] = []
         else:
             return [], []
     else:
-        df = pl.read_parquet(str(occ_path)).filter(
-            pl.col("form").str.to_lowercase() == form.lower()
-        )
+        df = seg_index.occurrences(form)
         all_occurrences = list(
             df.select(["doc_id", "byte_offset"]).iter_rows(named=True)
         )
@@ -161,25 +165,16 @@ def _load_contexts(
         random.seed(42)
         samples_raw = random.sample(candidates, min(max_samples, len(candidates)))
 
-    needed_doc_ids = list({o["doc_id"] for o in samples_raw})
-    docs_df = (
-        pl.scan_parquet(str(docs))
-        .filter(pl.col("doc_id").is_in(needed_doc_ids))
-        .collect(engine="streaming")
-    )
-    docs_map = dict(
-        zip(docs_df["doc_id"].to_list(), docs_df["text"].to_list(), strict=False)
-    )
+    doc_store = DocStore.open(Path(docs))
 
     contexts = []
     occurrence_refs = []
     for occ in samples_raw:
         doc_id: str = occ["doc_id"]  # type: ignore[assignment]
         byte_offset: int = occ["byte_offset"]  # type: ignore[assignment]
-        text = docs_map.get(doc_id, "")
-        if not text:
+        ctx = extract_context(doc_store, doc_id, byte_offset, form, context_chars)
+        if ctx is None:
             continue
-        ctx = extract_context(text, byte_offset, form, context_chars)
         contexts.append(ctx)
         occurrence_refs.append(Occurrence(doc_id=doc_id, byte_offset=byte_offset))
 
@@ -420,15 +415,14 @@ def run(
     if senses_db and Path(senses_db).exists():
         existing_defs = _load_existing_defs(form, Path(senses_db))
 
-    occ_path = Path(seg_data_dir) / form_prefix(form) / "occurrences.parquet"
-    if not occ_path.exists():
+    seg_index = SegIndex(Path(seg_data_dir))
+    pfx = seg_index.shard(form)
+    if not seg_index.has_prefix(pfx):
         alf = Alf(form=form, senses=[])
         Path(output).write_text(alf.model_dump_json())
-        print(f"No occurrences parquet for '{form}' ({occ_path}); skipping.")
+        print(f"No seg data for '{form}' (prefix {pfx!r}); skipping.")
         return
-    df = pl.read_parquet(str(occ_path)).filter(
-        pl.col("form").str.to_lowercase() == form.lower()
-    )
+    df = seg_index.occurrences(form)
     all_occurrences = list(df.select(["doc_id", "byte_offset"]).iter_rows(named=True))
 
     well_labeled: set[tuple[str, int]] = set()
@@ -446,22 +440,15 @@ def run(
     random.seed(42)
     samples = random.sample(all_occurrences, min(max_samples, len(all_occurrences)))
 
-    needed_doc_ids = list({occ["doc_id"] for occ in samples})
-    docs_df = (
-        pl.scan_parquet(str(docs))
-        .filter(pl.col("doc_id").is_in(needed_doc_ids))
-        .collect(engine="streaming")
-    )
-    docs_map = dict(
-        zip(docs_df["doc_id"].to_list(), docs_df["text"].to_list(), strict=False)
-    )
+    doc_store = DocStore.open(Path(docs))
 
     contexts = []
     for occ in samples:
-        text = docs_map.get(occ["doc_id"], "")
-        if not text:
+        ctx = extract_context(
+            doc_store, occ["doc_id"], occ["byte_offset"], form, context_chars
+        )
+        if ctx is None:
             continue
-        ctx = extract_context(text, occ["byte_offset"], form, context_chars)
         contexts.append(ctx)
 
     if not contexts:
@@ -478,7 +465,7 @@ def run(
         occurrence_refs = [
             Occurrence(doc_id=s["doc_id"], byte_offset=s["byte_offset"])
             for s in samples
-            if s["doc_id"] in docs_map
+            if s["doc_id"] in doc_store
         ]
         task = CCInductionTask(
             id=str(uuid.uuid4()),
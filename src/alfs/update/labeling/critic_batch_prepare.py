@@ -24,8 +24,8 @@ import json
 from pathlib import Path
 
 import numpy as np
-import polars as pl
 
+from alfs.data_models.doc_store import DocStore
 from alfs.data_models.occurrence_store import OccurrenceStore
 from alfs.data_models.reserved_sense_keys import RESERVED_SENSE_KEYS
 from alfs.data_models.sense_store import SenseStore
@@ -96,13 +96,14 @@ def run(
     max_sense_ts = sense_store.max_sense_updated_at_by_form()
 
     # Load all rating >= 1 instances from labeled.db
-    labeled = occ_store.to_polars()
-    if len(labeled) == 0:
+    good = occ_store.scan(
+        columns=["form", "doc_id", "byte_offset", "sense_key", "last_critic_date"],
+        where={"rating": [1, 2]},
+    ).collect()
+    if len(good) == 0:
         print("No labeled instances found.")
         return []
 
-    good = labeled.filter(pl.col("rating").is_in([1, 2]))
-
     # Group instances by (sense_uuid, form, definition), keeping only those
     # needing critic review: last_critic_date IS NULL or stale vs latest sense edit
     # Each entry: (doc_id, byte_offset, surface_form)
@@ -144,18 +145,7 @@ def run(
     if max_senses is not None:
         sampled = sampled[:max_senses]
 
-    # Load docs needed for context extraction
-    needed_doc_ids = list(
-        {doc_id for _, _, _, insts in sampled for doc_id, _, _ in insts}
-    )
-    docs_df = (
-        pl.scan_parquet(str(docs))
-        .filter(pl.col("doc_id").is_in(needed_doc_ids))
-        .collect(engine="streaming")
-    )
-    docs_map: dict[str, str] = dict(
-        zip(docs_df["doc_id"].to_list(), docs_df["text"].to_list(), strict=False)
-    )
+    doc_store = DocStore.open(Path(docs))
 
     batch_requests: list[str] = []
     metadata_rows: list[str] = []
@@ -165,10 +155,11 @@ def run(
         contexts: list[str] = []
         valid_instances: list[tuple[str, int, str]] = []
         for doc_id, byte_offset, surface_form in instances:
-            text = docs_map.get(doc_id, "")
-            if not text:
+            ctx = extract_context(
+                doc_store, doc_id, byte_offset, surface_form, context_chars
+            )
+            if ctx is None:
                 continue
-            ctx = extract_context(text, byte_offset, surface_form, context_chars)
             contexts.append(ctx)
             valid_instances.append((doc_id, byte_offset, surface_form))
 
@@ -23,9 +23,10 @@ import numpy as np
 import polars as pl
 
 from alfs.data_models.alf import Alf, morph_base_form
+from alfs.data_models.doc_store import DocStore
 from alfs.data_models.occurrence_store import OccurrenceStore
 from alfs.data_models.sense_store import SenseStore
-from alfs.seg.aggregate_occurrences import prefix as form_prefix
+from alfs.seg.token_store import SegIndex
 from alfs.update.labeling.label_occurrences import build_sense_menu, extract_context
 
 
@@ -33,17 +34,10 @@ def compute_sense_quality_counts(
     occ_store: OccurrenceStore,
 ) -> dict[str, dict[str, int]]:
     """Return {form: {sense_uuid: count_of_rating=2}} from labeled occurrences."""
-    df = occ_store.to_polars()
-    if len(df) == 0:
-        return {}
+    counts = occ_store.count_by_sense().filter(pl.col("n_excellent") > 0)
     result: dict[str, dict[str, int]] = defaultdict(dict)
-    counts = (
-        df.filter(pl.col("rating") == 2)
-        .group_by(["form", "sense_key"])
-        .agg(pl.len().alias("count"))
-    )
     for row in counts.iter_rows(named=True):
-        result[str(row["form"])][str(row["sense_key"])] = int(row["count"])
+        result[str(row["form"])][str(row["sense_key"])] = int(row["n_excellent"])
     return result
 
 
@@ -58,6 +52,9 @@ def sense_weight(
     and morph_base traversal in build_sense_menu.
     """
     variants = store.read_case_variants(alf.form)
+    bases = store.read_many(
+        base for v in variants if (base := morph_base_form(v)) is not None
+    )
     weight = 0.0
     for variant in variants:
         form_counts = quality_counts.get(variant.form, {})
@@ -66,7 +63,7 @@ def sense_weight(
             weight += 1.0 / math.sqrt(n_i + 1)
         base_name = morph_base_form(variant)
         if base_name is not None:
-            base_alf = store.read(base_name)
+            base_alf = bases.get(base_name)
             if base_alf is not None:
                 base_counts = quality_counts.get(base_name, {})
                 for sense in base_alf.senses:
@@ -198,26 +195,16 @@ def run(
     if batch_id is None:
         batch_id = datetime.now().strftime("%Y%m%dT%H%M%S")
 
-    sense_store = SenseStore(Path(senses_db))
+    sense_store = SenseStore(Path(senses_db), cache_size=100_000)
     occ_store = OccurrenceStore(Path(labeled_db))
     quality_counts = compute_sense_quality_counts(occ_store)
 
     # Load corpus counts
-    parquet_files = list(Path(seg_data_dir).glob("*/occurrences.parquet"))
-    if not parquet_files:
-        raise FileNotFoundError(f"No occurrences.parquet files found in {seg_data_dir}")
+    seg_index = SegIndex(Path(seg_data_dir))
     corpus_total: pl.DataFrame = (
-        pl.concat(
-            [
-                pl.scan_parquet(str(f)).select(
-                    pl.col("form").str.to_lowercase().alias("form")
-                )
-                for f in parquet_files
-            ]
-        )
-        .group_by("form")
-        .agg(pl.len().alias("total"))
-        .collect()
+        seg_index.form_counts()
+        .group_by(pl.col("form").str.to_lowercase())
+        .agg(pl.col("total").sum())
     )
     corpus_counts: dict[str, int] = dict(
         zip(
@@ -272,39 +259,29 @@ def run(
     #   stale_pairs — rating >= 1, labeled BEFORE latest sense was added
     #                 → eligible for re-sampling
     max_sense_ts = sense_store.max_sense_updated_at_by_form()
-    all_labeled = occ_store.to_polars()
-    good_pairs: dict[str, set[tuple[str, int]]] = defaultdict(set)
-    stale_pairs: dict[str, list[tuple[str, int]]] = defaultdict(list)
-    if len(all_labeled) > 0:
-        good_labeled_df = all_labeled.filter(pl.col("rating").is_in([1, 2])).select(
-            ["form", "doc_id", "byte_offset", "updated_at"]
-        )
-        good_pairs, stale_pairs = split_labeled_pairs(good_labeled_df, max_sense_ts)
-    else:
-        good_pairs = defaultdict(set)
-        stale_pairs = defaultdict(list)
+    good_labeled_df = occ_store.scan(
+        columns=["form", "doc_id", "byte_offset", "updated_at"],
+        where={"rating": [1, 2]},
+    ).collect()
+    good_pairs, stale_pairs = split_labeled_pairs(good_labeled_df, max_sense_ts)
 
-    # Sample instances per form, grouped by prefix for efficient parquet loading
+    # Sample instances per form, grouped by prefix
     rng = np.random.default_rng(seed)
     sampled: list[dict[str, object]] = []
 
+    sharding = seg_index.sharding
     forms_by_prefix: dict[str, list[str]] = defaultdict(list)
     for form in allocation:
-        forms_by_prefix[form_prefix(form)].append(form)
+        forms_by_prefix[sharding.shard(form)].append(form)
 
     for prefix_key, forms in sorted(forms_by_prefix.items()):
-        occ_path = Path(seg_data_dir) / prefix_key / "occurrences.parquet"
-        if not occ_path.exists():
+        if not seg_index.has_prefix(prefix_key):
             continue
-        lookup_forms = list({f.lower() for f in forms})
-        df = pl.read_parquet(str(occ_path)).filter(
-            pl.col("form").str.to_lowercase().is_in(lookup_forms)
-        )
         for form in forms:
             k = allocation[form]
             if k <= 0:
                 continue
-            form_df = df.filter(pl.col("form").str.to_lowercase() == form.lower())
+            form_df = seg_index.occurrences(form)
 
             # Stale pairs for this form (labeled.db stores under canonical entry form)
             form_stale: list[tuple[str, int]] = stale_pairs.get(form, [])
@@ -345,16 +322,7 @@ def run(
 
     print(f"Sampled {len(sampled)} instances")
 
-    # Load docs needed for context extraction
-    needed_doc_ids = list({str(s["doc_id"]) for s in sampled})
-    docs_df = (
-        pl.scan_parquet(str(docs))
-        .filter(pl.col("doc_id").is_in(needed_doc_ids))
-        .collect(engine="streaming")
-    )
-    docs_map: dict[str, str] = dict(
-        zip(docs_df["doc_id"].to_list(), docs_df["text"].to_list(), strict=False)
-    )
+    doc_store = DocStore.open(Path(docs))
 
     # Sort by form so same-word requests are consecutive (maximises prompt caching)
     sampled.sort(key=lambda x: str(x["form"]))
@@ -368,8 +336,8 @@ def run(
         doc_id = str(item["doc_id"])
         byte_offset = int(item["byte_offset"])  # type: ignore[call-overload]
 
-        text = docs_map.get(doc_id, "")
-        if not text:
+        context = extract_context(doc_store, doc_id, byte_offset, form, context_chars)
+        if context is None:
             continue
 
         if form not in sense_menu_cache:
@@ -380,7 +348,6 @@ def run(
             sense_menu_cache[form] = (menu, key_map)
         sense_menu, key_map = sense_menu_cache[form]
 
-        context = extract_context(text, byte_offset, form, context_chars)
         system_msg = build_system_message(form, sense_menu)
         user_msg = (
             f'The word "{form}" appears here: "...{context}..."\n\nWhich sense applies?'
@@ -445,6 +412,7 @@ def run(
         )
         chunks.append((batch_path, metadata_path))
 
+    sense_store.close()
     print(f"Wrote {total} total requests in {n_chunks} chunk(s) to {out_dir}")
     return chunks
 
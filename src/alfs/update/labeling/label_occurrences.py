@@ -14,11 +14,11 @@ import polars as pl
 
 from alfs.data_models.alf import morph_base_form
 from alfs.data_models.annotated_occurrence import AnnotatedOccurrence, OccurrenceRating
+from alfs.data_models.doc_store import DocStore
 from alfs.data_models.occurrence_store import OccurrenceStore
 from alfs.data_models.sense_store import SenseStore
 from alfs.data_models.update_target import UpdateTarget
-from alfs.encoding import context_window as _context_window
-from alfs.seg.aggregate_occurrences import prefix as form_prefix
+from alfs.seg.token_store import SegIndex
 from alfs.update import llm
 from alfs.update.labeling import prompts
 
@@ -33,9 +33,17 @@ _LABEL_SCHEMA = {
 }
 
 
-def extract_context(text: str, byte_offset: int, form: str, context_chars: int) -> str:
-    snippet, wp = _context_window(text, byte_offset, form, context_chars)
-    return f"{snippet[:wp]}**{snippet[wp:wp + len(form)]}**{snippet[wp + len(form):]}"
+def extract_context(
+    docs: DocStore, doc_id: str, byte_offset: int, form: str, context_chars: int
+) -> str | None:
+    """Context snippet with the occurrence bolded, or None if the doc is absent."""
+    window = docs.context_window(doc_id, byte_offset, form, context_chars)
+    if window is None:
+        return None
+    snippet, wp = window
+    return (
+        f"{snippet[:wp]}**{snippet[wp : wp + len(form)]}**{snippet[wp + len(form) :]}"
+    )
 
 
 def build_sense_menu(store: SenseStore, form: str) -> tuple[str, dict[str, str]]:
@@ -49,6 +57,9 @@ def build_sense_menu(store: SenseStore, form: str) -> tuple[str, dict[str, str]]
     variants = store.read_case_variants(form)
     if not variants:
         raise ValueError(f"No entry for '{form}' in senses.db")
+    bases = store.read_many(
+        base for alf in variants if (base := morph_base_form(alf)) is not None
+    )
     lines: list[str] = []
     key_map: dict[str, str] = {}
     counter = 0
@@ -61,7 +72,7 @@ def build_sense_menu(store: SenseStore, form: str) -> tuple[str, dict[str, str]]
         if is_pure_morph:
             base_name = morph_base_form(alf)
             assert base_name is not None
-            base_alf = store.read(base_name)
+            base_alf = bases.get(base_name)
             if base_alf is not None and base_alf.senses:
                 if len(variants) > 1:
                     lines.append(f"\n[{alf.form}]")
@@ -81,7 +92,7 @@ def build_sense_menu(store: SenseStore, form: str) -> tuple[str, dict[str, str]]
                     lines.append(f"{counter}.{pos_tag} {sense.definition}")
             base_name = morph_base_form(alf)
             if base_name is not None:
-                base_alf = store.read(base_name)
+                base_alf = bases.get(base_name)
                 if base_alf is not None and base_alf.senses:
                     lines.append(f"\nBase form '{base_name}':")
                     for sense in base_alf.senses:
@@ -106,25 +117,26 @@ def run(
     target = UpdateTarget.model_validate_json(Path(target_file).read_text())
     form = target.form
 
-    sense_store = SenseStore(Path(senses_db))
+    sense_store = SenseStore(Path(senses_db), cache_size=256)
     occ_store = OccurrenceStore(Path(labeled_db))
 
     variants = sense_store.read_case_variants(form)
     if not variants or not any(v.senses for v in variants):
+        sense_store.close()
         print(f"No senses for '{form}' in senses.db; skipping labeling.")
         return
 
     sense_menu, key_map = build_sense_menu(sense_store, form)
     # Map sense UUID → owning entry form so labels are stored under the correct form.
     sense_to_form = sense_store.sense_id_to_form()
+    sense_store.close()
 
-    occ_path = Path(seg_data_dir) / form_prefix(form) / "occurrences.parquet"
-    if not occ_path.exists():
-        print(f"No occurrences parquet for '{form}' ({occ_path}); skipping labeling.")
+    seg_index = SegIndex(Path(seg_data_dir))
+    pfx = seg_index.shard(form)
+    if not seg_index.has_prefix(pfx):
+        print(f"No seg data for '{form}' (prefix {pfx!r}); skipping labeling.")
         return
-    df = pl.read_parquet(str(occ_path)).filter(
-        pl.col("form").str.to_lowercase() == form.lower()
-    )
+    df = seg_index.occurrences(form)
 
     labeled_pairs: set[tuple[str, int]] = set()
     existing = occ_store.query_form(form).filter(pl.col("rating").is_in([1, 2]))
@@ -137,15 +149,7 @@ def run(
         if (occ["doc_id"], occ["byte_offset"]) not in labeled_pairs
     ][:max_occurrences]
 
-    needed_doc_ids = list({occ["doc_id"] for occ in to_process})
-    docs_df = (
-        pl.scan_parquet(str(docs))
-        .filter(pl.col("doc_id").is_in(needed_doc_ids))
-        .collect(engine="streaming")
-    )
-    docs_map = dict(
-        zip(docs_df["doc_id"].to_list(), docs_df["text"].to_list(), strict=False)
-    )
+    doc_store = DocStore.open(Path(docs))
 
     # TODO: batch occurrences into a single prompt instead of one LLM call
     # per occurrence
@@ -154,11 +158,10 @@ def run(
         doc_id = occ["doc_id"]
         byte_offset = occ["byte_offset"]
 
-        text = docs_map.get(doc_id, "")
-        if not text:
+        context = extract_context(doc_store, doc_id, byte_offset, form, context_chars)
+        if context is None:
             continue
 
-        context = extract_context(text, byte_offset, form, context_chars)
         prompt = prompts.labeling_prompt(form, context, sense_menu)
         data = llm.chat_json(model, prompt, format=_LABEL_SCHEMA)
         display_key = data["sense_key"]
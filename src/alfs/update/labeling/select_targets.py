@@ -16,6 +16,7 @@ import polars as pl
 
 from alfs.data_models.occurrence_store import OccurrenceStore
 from alfs.data_models.update_target import UpdateTarget
+from alfs.seg.token_store import TokenStore
 
 # Only consider forms that contain at least one letter (skip punctuation, whitespace,
 # etc.)
@@ -91,18 +92,13 @@ def run(
     use_excellent_threshold: bool = False,
 ) -> list[Path]:
     seg_dir = Path(seg_data_dir)
-    parquet_files = list(seg_dir.glob("*/occurrences.parquet"))
-    if not parquet_files:
+    token_store = TokenStore(seg_dir)
+    if not token_store.files():
         raise FileNotFoundError(
             f"No occurrences.parquet files found in {seg_dir}. Run `make seg` first."
         )
 
-    total_counts = (
-        pl.concat([pl.scan_parquet(str(f)).select("form") for f in parquet_files])
-        .group_by("form")
-        .agg(pl.len().alias("total"))
-        .collect()
-    )
+    total_counts = token_store.form_counts()
 
     if labeled_db and Path(labeled_db).exists():
         cbf = OccurrenceStore(Path(labeled_db)).count_by_form()
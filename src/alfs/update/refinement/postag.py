@@ -21,6 +21,7 @@ from alfs.clerk.queue import enqueue
 from alfs.clerk.request import UpdatePosRequest
 from alfs.corpus import fetch_instances
 from alfs.data_models.alf import Alf
+from alfs.data_models.doc_store import DocStore
 from alfs.data_models.occurrence_store import OccurrenceStore
 from alfs.data_models.pos import PartOfSpeech
 from alfs.data_models.sense_store import SenseStore
@@ -33,7 +34,7 @@ from alfs.update.refinement.schemas import POS_SCHEMA as _POS_SCHEMA
 def _make_tagger(
     form: str,
     labeled_df: pl.DataFrame,
-    docs_df: pl.DataFrame,
+    docs: DocStore,
     model: str,
 ) -> Callable[[Alf | None], Alf]:
     def tag_form(existing: Alf | None) -> Alf:
@@ -46,7 +47,7 @@ def _make_tagger(
                 new_senses.append(sense)
                 continue
 
-            instances = fetch_instances(form, sense.id, labeled_df, docs_df)
+            instances = fetch_instances(form, sense.id, labeled_df, docs)
             prompt = prompts.postag_prompt(form, sense.definition, instances)
             data = llm.chat_json(model, prompt, format=_POS_SCHEMA)
             pos_str = data["pos"]
@@ -91,13 +92,13 @@ def main() -> None:
     occ_store = OccurrenceStore(Path(args.labeled_db))
     queue_dir = Path(args.queue_dir)
     labeled_df = occ_store.to_polars()
-    docs_df = pl.read_parquet(args.docs)
+    docs = DocStore.open(Path(args.docs))
 
     for form in sense_store.all_forms():
         existing = sense_store.read(form)
         if existing is None:
             continue
-        tagger = _make_tagger(form, labeled_df, docs_df, args.model)
+        tagger = _make_tagger(form, labeled_df, docs, args.model)
         updated = tagger(existing)
         for before_sense, after_sense in zip(
             existing.senses, updated.senses, strict=False
@@ -3,11 +3,12 @@
 import polars as pl
 
 from alfs.data_models.alf import Alf, Sense
+from alfs.data_models.doc_store import DocStore
 from alfs.data_models.pos import PartOfSpeech
 from alfs.update.refinement.postag import _make_tagger
 
 
-def _empty_dfs() -> tuple[pl.DataFrame, pl.DataFrame]:
+def _empty_inputs() -> tuple[pl.DataFrame, DocStore]:
     labeled_df = pl.DataFrame(
         {
             "form": [],
@@ -30,14 +31,14 @@ def _empty_dfs() -> tuple[pl.DataFrame, pl.DataFrame]:
             "synonyms": pl.String,
         },
     )
-    docs_df = pl.DataFrame(
-        {"doc_id": [], "text": []}, schema={"doc_id": pl.String, "text": pl.String}
+    docs = DocStore.from_frame(
+        pl.DataFrame(schema={"doc_id": pl.String, "text": pl.String})
     )
-    return labeled_df, docs_df
+    return labeled_df, docs
 
 
 def test_make_tagger_skips_senses_with_existing_pos(monkeypatch) -> None:
-    labeled_df, docs_df = _empty_dfs()
+    labeled_df, docs = _empty_inputs()
     calls: list = []
 
     def fake_chat_json(model, prompt, retries=3, format=None):
@@ -50,7 +51,7 @@ def test_make_tagger_skips_senses_with_existing_pos(monkeypatch) -> None:
     sense_without_pos = Sense(definition="a sprint")
     existing = Alf(form="run", senses=[sense_with_pos, sense_without_pos])
 
-    tagger = _make_tagger("run", labeled_df, docs_df, "test-model")
+    tagger = _make_tagger("run", labeled_df, docs, "test-model")
     result = tagger(existing)
 
     # Only the sense without POS should have triggered LLM calls (2: tag + critic)
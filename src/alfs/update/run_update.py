@@ -124,7 +124,11 @@ def main() -> None:
             drain(
                 queue_dir,
                 SenseStore(senses_db),
-                OccurrenceStore(labeled_db) if labeled_db.exists() else None,
+                (
+                    OccurrenceStore(labeled_db, pool_size=args.workers)
+                    if labeled_db.exists()
+                    else None
+                ),
                 workers=args.workers,
             )
             print("Clerk queue drained.")
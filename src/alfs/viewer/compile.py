@@ -22,6 +22,8 @@ import polars as pl
 
 from alfs.corpus import fetch_instances
 from alfs.data_models.alf import Alfs, sense_key
+from alfs.data_models.doc_corpus import read_docs
+from alfs.data_models.doc_store import DocStore
 from alfs.data_models.occurrence_store import OccurrenceStore
 from alfs.data_models.sense_store import SenseStore
 from alfs.viewer.stats import compute_year_buckets
@@ -33,11 +35,17 @@ def compile_entries(
     docs: pl.DataFrame,
     timestamps: dict[str, str | None] | None = None,
     batch_forms: set[str] | None = None,
+    doc_store: DocStore | None = None,
 ) -> dict:
     """Build viewer entries dict for the given forms (all forms if batch_forms is None).
 
+    docs needs doc_id and year; instance contexts come from doc_store, or from
+    a text column in docs when doc_store is None.
+
     Returns entries without percentile — caller assigns percentile after merging.
     """
+    if doc_store is None:
+        doc_store = DocStore.from_frame(docs)
     uuid_to_pos: dict[str, str] = {}
     for _form, alf in alfs.entries.items():
         for i, sense in enumerate(alf.senses):
@@ -130,7 +138,7 @@ def compile_entries(
                 form,
                 sense_key(orig_idx),
                 labeled,
-                docs,
+                doc_store,
                 min_rating=0,
                 context_chars=60,
                 bold_form=True,
@@ -197,7 +205,8 @@ def main() -> None:
 
     occ_store = OccurrenceStore(Path(args.labeled_db))
     labeled = occ_store.to_polars()
-    docs = pl.read_parquet(args.docs)
+    docs = read_docs(Path(args.docs), columns=["doc_id", "year"])
+    doc_store = DocStore.open(Path(args.docs))
 
     corpus_counts: dict[str, int] = json.loads(Path(args.corpus_counts).read_text())
 
@@ -209,7 +218,9 @@ def main() -> None:
         start = args.batch_idx * batch_size
         batch_forms = set(all_forms[start : start + batch_size])
 
-    entries = compile_entries(alfs, labeled, docs, timestamps, batch_forms)
+    entries = compile_entries(
+        alfs, labeled, docs, timestamps, batch_forms, doc_store=doc_store
+    )
 
     # Only assign percentiles in single-process (non-batch) mode
     if batch_forms is None:
@@ -14,6 +14,7 @@ from pathlib import Path
 import polars as pl
 
 from alfs.data_models.sense_store import SenseStore
+from alfs.seg.token_store import TokenStore
 
 
 def main() -> None:
@@ -30,19 +31,12 @@ def main() -> None:
     sense_store = SenseStore(Path(args.senses_db))
     alfs_forms = list(sense_store.all_entries().keys())
 
-    parquet_glob = str(Path(args.by_prefix_dir) / "**" / "*.parquet")
-
-    # Single scan: count all forms in corpus, excluding all-punctuation tokens
+    # Count all forms in corpus, excluding all-punctuation tokens
     all_df = (
-        pl.scan_parquet(
-            parquet_glob,
-            schema={"form": pl.String},
-            extra_columns="ignore",
-        )
+        TokenStore(Path(args.by_prefix_dir))
+        .form_counts()
+        .rename({"total": "count"})
         .filter(pl.col("form").str.contains(r"[a-zA-Z]"))
-        .group_by("form")
-        .agg(pl.len().alias("count"))
-        .collect()
     )
 
     total_tokens = int(all_df["count"].sum())
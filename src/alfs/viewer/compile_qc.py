@@ -24,6 +24,7 @@ import polars as pl
 from alfs.corpus import _extract_context
 from alfs.data_models.alf import Alfs, sense_key
 from alfs.data_models.blocklist import Blocklist
+from alfs.data_models.doc_store import DocStore
 from alfs.data_models.occurrence_store import OccurrenceStore
 from alfs.data_models.sense_store import SenseStore
 
@@ -262,29 +263,18 @@ def compile_qc_coverage(
     }
 
 
-def compile_qc_instances(
-    labeled: pl.DataFrame, docs: pl.DataFrame, rating: int
-) -> dict:
+def compile_qc_instances(labeled: pl.DataFrame, docs: DocStore, rating: int) -> dict:
     filtered = labeled.filter(pl.col("rating") == rating)
     if filtered.is_empty():
         return {"rating": rating, "instances": []}
 
-    needed_ids = filtered["doc_id"].unique().to_list()
-    docs_subset = docs.filter(pl.col("doc_id").is_in(needed_ids))
-    docs_map = dict(
-        zip(
-            docs_subset["doc_id"].to_list(), docs_subset["text"].to_list(), strict=False
-        )
-    )
-
     instances = []
     for row in filtered.iter_rows(named=True):
-        text = docs_map.get(row["doc_id"], "")
-        if not text:
-            continue
         context = _extract_context(
-            text, row["byte_offset"], row["form"], 60, bold_form=True
+            docs, row["doc_id"], row["byte_offset"], row["form"], 60, bold_form=True
         )
+        if context is None:
+            continue
         instances.append(
             {
                 "form": row["form"],
@@ -326,13 +316,14 @@ def main() -> None:
     args = parser.parse_args()
 
     occ_store = OccurrenceStore(Path(args.labeled_db))
-    labeled = occ_store.to_polars()
 
     if args.mode == "stats":
+        labeled = occ_store.scan(columns=["form", "sense_key", "rating"]).collect()
         result = compile_qc_stats(labeled)
     elif args.mode == "lag":
         if args.senses_db is None:
             parser.error("--senses-db is required for lag mode")
+        labeled = occ_store.scan(columns=["form", "updated_at"]).collect()
         result = compile_qc_lag(labeled, SenseStore(Path(args.senses_db)))
     elif args.mode == "coverage":
         if args.corpus_counts is None or args.senses_db is None:
@@ -352,7 +343,7 @@ def main() -> None:
             else set()
         )
         result = compile_qc_coverage(
-            labeled,
+            occ_store.scan(columns=["form", "rating"]).collect(),
             alfs,
             corpus_counts,
             blocklist_forms,
@@ -364,8 +355,12 @@ def main() -> None:
                 "--docs, --senses-db, and --rating are required for instances mode"
             )
         alfs = Alfs(entries=SenseStore(Path(args.senses_db)).all_entries())
+        labeled = occ_store.scan(
+            columns=["form", "doc_id", "byte_offset", "sense_key", "rating"],
+            where={"rating": [args.rating]},
+        ).collect()
         labeled = _translate_uuids(labeled, alfs)
-        docs = pl.read_parquet(args.docs)
+        docs = DocStore.open(Path(args.docs))
         result = compile_qc_instances(labeled, docs, args.rating)
 
     Path(args.output).parent.mkdir(parents=True, exist_ok=True)